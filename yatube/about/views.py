@@ -1,9 +1,11 @@
 from django.views.generic.base import TemplateView
 
+from core.prerender import PrerenderedTemplateMixin
 
-class AboutAuthorView(TemplateView):
+
+class AboutAuthorView(PrerenderedTemplateMixin, TemplateView):
     template_name = 'about/author.html'
 
 
-class AboutTechView(TemplateView):
+class AboutTechView(PrerenderedTemplateMixin, TemplateView):
     template_name = 'about/tech.html'
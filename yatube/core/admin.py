@@ -0,0 +1,30 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Job
+from .paginators import EstimatedCountPaginator
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk', 'name', 'status', 'attempts', 'max_attempts', 'run_at',
+        'finished_at', 'worker',
+    )
+    list_filter = ('status',)
+    search_fields = ('=name',)
+    date_hierarchy = 'run_at'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    readonly_fields = [field.name for field in Job._meta.fields]
+    actions = ('retry_jobs',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def retry_jobs(self, request, queryset):
+        count = queryset.exclude(status=Job.RUNNING).update(
+            status=Job.QUEUED, attempts=0, run_at=timezone.now(), worker='',
+        )
+        self.message_user(request, f'Поставлено в очередь: {count}')
+    retry_jobs.short_description = 'Повторить выбранные задачи'
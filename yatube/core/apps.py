@@ -3,3 +3,14 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from django.contrib.auth.password_validation import (
+            get_default_password_validators)
+
+        from . import checks  # noqa: F401
+
+        # Валидаторы с их словарями загружаются при старте процесса,
+        # а не на первой регистрации; дальше Django берёт их из своего
+        # lru_cache.
+        get_default_password_validators()
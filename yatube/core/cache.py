@@ -0,0 +1,27 @@
+"""Версия контента для сброса кешей страниц.
+
+Любое изменение контента меняет версию; закешированные страницы
+с другой версией считаются устаревшими. Отложенные счётчики
+(комментарии, реакции, горячий счёт) версию не меняют: их значения
+на страницах обновляются по истечении ``PAGE_CACHE_TIMEOUT``.
+"""
+import time
+
+from django.core.cache import cache
+
+CONTENT_VERSION_KEY = 'content_version'
+
+
+def get_content_version():
+    version = cache.get(CONTENT_VERSION_KEY)
+    if version is None:
+        version = bump_content_version()
+    return version
+
+
+def bump_content_version():
+    # Версия по времени, а не счётчик: если кеш вытеснит ключ,
+    # новая версия всё равно не совпадёт ни с одной из старых.
+    version = time.time()
+    cache.set(CONTENT_VERSION_KEY, version, None)
+    return version
@@ -0,0 +1,147 @@
+"""Проверки настроек, заметно замедляющих работу сайта.
+
+Запускаются при старте вместе с остальными системными проверками
+и отдельно командой ``python manage.py check --tag performance``.
+Профиль разработки не проверяется: там эти настройки ожидаемы.
+Отдельно проверяется, что библиотека выбранного хешера паролей
+установлена: иначе не сработает ни вход, ни регистрация.
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.core.checks import Error, Tags, Warning, register
+
+PERFORMANCE = 'performance'
+
+LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+CULLED_CACHES = (
+    'django.core.cache.backends.filebased.FileBasedCache',
+    'django.core.cache.backends.db.DatabaseCache',
+)
+# Меньше записей не хватит даже на страницы и миниатюры.
+MIN_CACHE_ENTRIES = 10000
+CACHED_LOADER = 'django.template.loaders.cached.Loader'
+
+
+def is_production():
+    return getattr(settings, 'ENVIRONMENT', '') == 'prod'
+
+
+@register(PERFORMANCE)
+def check_debug(app_configs, **kwargs):
+    if settings.DEBUG and is_production():
+        return [Warning(
+            'DEBUG включён в боевом профиле.',
+            hint='При DEBUG = True каждый SQL-запрос сохраняется в памяти.',
+            id='core.W001',
+        )]
+    return []
+
+
+@register(PERFORMANCE)
+def check_cache(app_configs, **kwargs):
+    if not is_production():
+        return []
+    config = settings.CACHES.get('default', {})
+    backend = config.get('BACKEND')
+    if backend in LOCAL_CACHES:
+        return [Warning(
+            f'Кеш по умолчанию {backend} не общий для процессов.',
+            hint='Каждый воркер прогревает свой кеш заново.',
+            id='core.W002',
+        )]
+    max_entries = config.get('OPTIONS', {}).get('MAX_ENTRIES', 300)
+    if backend in CULLED_CACHES and max_entries < MIN_CACHE_ENTRIES:
+        return [Warning(
+            f'Кеш по умолчанию хранит не больше {max_entries} записей.',
+            hint='Страницы, миниатюры, рейтинги и лимиты частоты будут '
+                 'вытеснять друг друга; задайте OPTIONS["MAX_ENTRIES"].',
+            id='core.W008',
+        )]
+    return []
+
+
+@register(PERFORMANCE)
+def check_sessions(app_configs, **kwargs):
+    if not is_production():
+        return []
+    engine = settings.SESSION_ENGINE
+    if engine == 'django.contrib.sessions.backends.db':
+        return [Warning(
+            'Сессии хранятся только в базе данных.',
+            hint='Каждый запрос с сессией читает таблицу django_session.',
+            id='core.W003',
+        )]
+    backend = settings.CACHES.get(
+        settings.SESSION_CACHE_ALIAS, {}
+    ).get('BACKEND')
+    if engine.endswith('.cache') and backend in LOCAL_CACHES:
+        return [Warning(
+            f'Сессии хранятся в локальном кеше {backend}.',
+            hint='Сессия, созданная одним воркером, не видна другим.',
+            id='core.W007',
+        )]
+    return []
+
+
+@register(PERFORMANCE)
+def check_databases(app_configs, **kwargs):
+    if not is_production():
+        return []
+    errors = []
+    for alias, database in settings.DATABASES.items():
+        if database['ENGINE'].endswith('sqlite3'):
+            errors.append(Warning(
+                f'База {alias} работает на SQLite.',
+                hint='SQLite выполняет записи строго по очереди.',
+                id='core.W004',
+            ))
+        elif not database.get('CONN_MAX_AGE'):
+            errors.append(Warning(
+                f'Для базы {alias} не включены постоянные соединения.',
+                hint='Задайте CONN_MAX_AGE, чтобы не подключаться заново '
+                     'на каждый запрос.',
+                id='core.W005',
+            ))
+    return errors
+
+
+@register(PERFORMANCE)
+def check_templates(app_configs, **kwargs):
+    if not is_production():
+        return []
+    errors = []
+    for template in settings.TEMPLATES:
+        options = template.get('OPTIONS', {})
+        loaders = options.get('loaders')
+        if options.get('debug') or (
+            loaders and not any(
+                loader == CACHED_LOADER or loader[0] == CACHED_LOADER
+                for loader in loaders
+            )
+        ):
+            errors.append(Warning(
+                'Шаблоны компилируются заново на каждый запрос.',
+                hint=f'Используйте {CACHED_LOADER}.',
+                id='core.W006',
+            ))
+    return errors
+
+
+@register(Tags.security)
+def check_password_hasher(app_configs, **kwargs):
+    hasher = get_hasher()
+    if getattr(hasher, 'library', None) is None:
+        return []
+    try:
+        hasher._load_library()
+    except ValueError:
+        return [Error(
+            f'Для хешера паролей {hasher.algorithm} не установлена '
+            'библиотека.',
+            hint='Установите её или смените PASSWORD_HASHER.',
+            id='core.E001',
+        )]
+    return []
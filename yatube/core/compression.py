@@ -0,0 +1,44 @@
+"""Предварительное сжатие файлов и выбор варианта по Accept-Encoding.
+
+Brotli используется, только если установлен пакет ``brotli``.
+"""
+import gzip
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Расширения сжатых копий в порядке предпочтения.
+SUFFIXES = {
+    'br': '.br',
+    'gzip': '.gz',
+}
+
+
+def compress(data):
+    """Сжатые варианты данных: ``{'gzip': ..., 'br': ...}``."""
+    variants = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(data)
+    return variants
+
+
+def accepted_encodings(request):
+    """Кодировки из Accept-Encoding, которые клиент не запретил через q=0."""
+    accepted = set()
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, _, params = item.strip().partition(';')
+        if params.replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+def select_encoding(request, available):
+    """Лучшая кодировка из ``available``, которую примет клиент."""
+    accepted = accepted_encodings(request)
+    for encoding in SUFFIXES:
+        if encoding in available and encoding in accepted:
+            return encoding
+    return None
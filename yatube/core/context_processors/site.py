@@ -0,0 +1,46 @@
+"""Общие для всех страниц значения, сейчас — год для подвала.
+
+Значения ленивые: считаются, только когда шаблон к ним обращается,
+и запоминаются в процессе на ``SITE_GLOBALS_TIMEOUT`` секунд.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+
+_memo = {}
+_lock = threading.Lock()
+
+
+def memoized(name, compute):
+    """Значение из памяти процесса; устаревшее считается заново."""
+    now = time.monotonic()
+    cached = _memo.get(name)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+    value = compute()
+    with _lock:
+        _memo[name] = (now + settings.SITE_GLOBALS_TIMEOUT, value)
+    return value
+
+
+def clear():
+    with _lock:
+        _memo.clear()
+
+
+def current_year():
+    return timezone.localdate().year
+
+
+def lazy(name, compute):
+    return SimpleLazyObject(lambda: memoized(name, compute))
+
+
+def site_globals(request):
+    """Добавляет год."""
+    return {
+        'year': lazy('year', current_year),
+    }
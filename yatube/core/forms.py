@@ -0,0 +1,25 @@
+"""Отрисовка форм без лишней работы на каждом поле.
+
+Классы CSS виджетов задаются один раз на классе формы, а не фильтром
+шаблона при каждой отрисовке поля.
+"""
+import copy
+
+
+def add_widget_class(widget, css):
+    classes = widget.attrs.get('class', '').split()
+    if css not in classes:
+        widget.attrs['class'] = ' '.join(classes + [css])
+
+
+def widget_class(css):
+    """Декоратор формы: добавляет ``css`` в класс всех её виджетов.
+
+    Поля копируются, чтобы не менять поля родительской формы.
+    """
+    def decorate(form_class):
+        form_class.base_fields = copy.deepcopy(form_class.base_fields)
+        for field in form_class.base_fields.values():
+            add_widget_class(field.widget, css)
+        return form_class
+    return decorate
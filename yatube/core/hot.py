@@ -0,0 +1,29 @@
+"""Счёт «горячего»: активность с экспоненциальным затуханием.
+
+Счёт объекта — ``ln Σ wᵢ·e^{λ(tᵢ − T₀)}`` по всем его событиям,
+где ``λ = ln 2 / HOT_HALF_LIFE``. Реальный затухший вес отличается
+от этой суммы общим для всех множителем ``e^{−λ(now − T₀)}``, который
+не меняет порядок. Поэтому счёт никогда не пересчитывается: новое
+событие только добавляется к нему, а старые объекты опускаются
+относительно новых сами собой. Логарифм не даёт сумме переполниться.
+"""
+import math
+import time
+
+from django.conf import settings
+
+# T₀ — 2000-01-01 UTC: счета всех постов после неё положительны.
+EPOCH = 946684800
+
+
+def event_score(weight, timestamp=None):
+    """Слагаемое счёта для события с весом ``weight`` в ``timestamp``."""
+    if timestamp is None:
+        timestamp = time.time()
+    decay = math.log(2) / settings.HOT_HALF_LIFE
+    return math.log(weight) + decay * (timestamp - EPOCH)
+
+
+def initial_score():
+    """Счёт только что созданного объекта."""
+    return event_score(settings.HOT_WEIGHTS['post'])
@@ -0,0 +1,61 @@
+"""Блокировки между процессами для пересчёта кеша одним запросом.
+
+``cache.add`` атомарен в memcached, redis и кеше в БД, но не
+в ``FileBasedCache``: там проверка и запись идут раздельно, и два
+воркера могут взять блокировку одновременно. Для файлового кеша
+берётся ``flock`` на файл в каталоге кеша; если процесс упал,
+ОС снимает его сама.
+"""
+import fcntl
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.cache import cache
+
+FILE_CACHE = 'django.core.cache.backends.filebased.FileBasedCache'
+# Имена блокировок раскладываются по 16 ** LOCK_STRIPES файлам, чтобы
+# их число не росло с числом адресов.
+LOCK_STRIPES = 3
+
+
+class CacheLock:
+    def __init__(self, key):
+        self.key = key
+
+    def release(self):
+        cache.delete(self.key)
+
+
+class FileLock:
+    def __init__(self, fd):
+        self.fd = fd
+
+    def release(self):
+        # Закрытие дескриптора снимает flock.
+        os.close(self.fd)
+
+
+def lock_dir():
+    config = settings.CACHES['default']
+    if config['BACKEND'] != FILE_CACHE:
+        return None
+    return os.path.join(config['LOCATION'], 'locks')
+
+
+def acquire(key, timeout):
+    """Берёт блокировку ``key`` без ожидания; ``None``, если занята."""
+    directory = lock_dir()
+    if directory is None:
+        return CacheLock(key) if cache.add(key, 1, timeout) else None
+    os.makedirs(directory, exist_ok=True)
+    stripe = hashlib.md5(key.encode()).hexdigest()[:LOCK_STRIPES]
+    fd = os.open(
+        os.path.join(directory, stripe + '.lock'), os.O_CREAT | os.O_RDWR
+    )
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    return FileLock(fd)
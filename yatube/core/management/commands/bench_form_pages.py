@@ -0,0 +1,47 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+
+from posts.forms import PostForm
+from users.forms import CreationForm
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = ('Замеряет время отрисовки страниц с формами: создания поста '
+            'и регистрации. Запросы к БД в замер входят.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--renders', type=int, default=200,
+            help='Сколько раз отрисовать каждую страницу.',
+        )
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        pages = (
+            ('posts/create_post.html', PostForm, User(username='bench')),
+            ('users/signup.html', CreationForm, AnonymousUser()),
+        )
+        for template_name, form_class, user in pages:
+            request = factory.get('/')
+            request.user = user
+            # Первая отрисовка загружает шаблоны и в замер не входит.
+            render_to_string(
+                template_name, {'form': form_class()}, request
+            )
+            count = options['renders']
+            started = time.perf_counter()
+            for _ in range(count):
+                render_to_string(
+                    template_name, {'form': form_class()}, request
+                )
+            elapsed = (time.perf_counter() - started) / count
+            self.stdout.write(
+                f'{template_name}: {elapsed * 1000:.2f} мс на страницу'
+            )
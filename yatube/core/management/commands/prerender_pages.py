@@ -0,0 +1,52 @@
+import json
+import os
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from core.compression import SUFFIXES, compress
+from core.prerender import MANIFEST_NAME, make_etag
+
+
+def write_file(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as output:
+        output.write(content)
+    os.replace(tmp_path, path)
+
+
+class Command(BaseCommand):
+    help = ('Рендерит статические шаблоны из PRERENDER_PAGES '
+            'в PRERENDER_ROOT вместе со сжатыми копиями.')
+
+    def handle(self, *args, **options):
+        root = settings.PRERENDER_ROOT
+        factory = RequestFactory()
+        manifest = {}
+        for template_name, url_name in settings.PRERENDER_PAGES:
+            path = reverse(url_name) if url_name else '/'
+            request = factory.get(path)
+            request.user = AnonymousUser()
+            request.resolver_match = resolve(path)
+            content = render_to_string(
+                template_name, request=request
+            ).encode()
+            output_path = os.path.join(root, template_name)
+            variants = compress(content)
+            for encoding, data in variants.items():
+                write_file(output_path + SUFFIXES[encoding], data)
+            write_file(output_path, content)
+            manifest[template_name] = {
+                'etag': make_etag(content),
+                'encodings': sorted(variants),
+            }
+            self.stdout.write(f'{template_name}: {len(content)} байт')
+        write_file(
+            os.path.join(root, MANIFEST_NAME),
+            json.dumps(manifest, indent=2).encode()
+        )
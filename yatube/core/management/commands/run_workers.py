@@ -0,0 +1,121 @@
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils.module_loading import autodiscover_modules
+
+from core import tasks
+
+
+def run_threads(count, stop, once):
+    prefix = f'{socket.gethostname()}:{os.getpid()}'
+    threads = [
+        threading.Thread(
+            target=tasks.work, args=(f'{prefix}:{number}', stop, once),
+            name=f'tasks-{number}',
+        )
+        for number in range(count)
+    ]
+    finished = threading.Event()
+    beating = threading.Thread(
+        target=tasks.heartbeat, args=(prefix, finished),
+        name='tasks-heartbeat',
+    )
+    beating.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    finished.set()
+    beating.join()
+
+
+class Command(BaseCommand):
+    help = ('Выполняет фоновые задачи из таблицы Job в нескольких потоках '
+            'и процессах. Останавливается по SIGINT/SIGTERM, дождавшись '
+            'текущих задач.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads', type=int, default=settings.TASKS_THREADS,
+            help='Потоков в каждом процессе.',
+        )
+        parser.add_argument(
+            '--processes', type=int, default=settings.TASKS_PROCESSES,
+            help='Сколько процессов запустить.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выйти, когда готовых задач не останется.',
+        )
+        parser.add_argument(
+            '--stats', action='store_true',
+            help='Показать число задач по статусам и выйти.',
+        )
+
+    def handle(self, *args, **options):
+        autodiscover_modules('tasks')
+        if options['stats']:
+            self.show_stats()
+            return
+        stop = threading.Event()
+
+        def shutdown(signum, frame):
+            stop.set()
+
+        # Дочерние процессы наследуют обработчики и свою копию stop.
+        previous = {
+            signum: signal.signal(signum, shutdown)
+            for signum in (signal.SIGINT, signal.SIGTERM)
+        }
+        try:
+            if options['processes'] <= 1:
+                self.run_child(options, stop)
+            else:
+                self.run_processes(options, stop)
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+
+    def run_child(self, options, stop):
+        run_threads(options['threads'], stop, options['once'])
+        self.show_metrics()
+
+    def run_processes(self, options, stop):
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        processes = [
+            context.Process(target=self.run_child, args=(options, stop))
+            for _ in range(options['processes'])
+        ]
+        for process in processes:
+            process.start()
+        stopping = False
+        while any(process.is_alive() for process in processes):
+            if stop.wait(1) and not stopping:
+                stopping = True
+                for process in processes:
+                    process.terminate()
+            for process in processes:
+                process.join(0)
+
+    def show_metrics(self):
+        for name, stats in sorted(tasks.metrics.snapshot().items()):
+            runs = stats['done'] + stats['retried'] + stats['failed']
+            self.stdout.write(
+                f'{name}: выполнено {stats["done"]}, '
+                f'повторов {stats["retried"]}, ошибок {stats["failed"]}, '
+                f'в среднем {stats["seconds"] / runs:.3f} с'
+            )
+
+    def show_stats(self):
+        stats = tasks.queue_stats()
+        if not stats:
+            self.stdout.write('Задач нет.')
+        for (name, status), count in sorted(stats.items()):
+            self.stdout.write(f'{name} {status}: {count}')
@@ -0,0 +1,158 @@
+"""Раздача загруженных картинок и миниатюр в боевом режиме.
+
+Поддерживает ``Range``, условные запросы и передачу отдачи файла
+веб-серверу через ``X-Sendfile`` или ``X-Accel-Redirect``. Без веб-сервера
+файл целиком отдаётся через ``FileResponse`` (``sendfile`` у WSGI-сервера),
+а диапазоны читаются из ``mmap`` блоками, без чтения файла в память.
+Как и статика, медиа отдаются из middleware до ``GZipMiddleware``:
+сжатие ломает ответы на ``Range`` и ослабляет ETag.
+"""
+import mmap
+import mimetypes
+import os
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import (MiddlewareNotUsed,
+                                    SuspiciousFileOperation)
+from django.http import (FileResponse, Http404, HttpResponse,
+                         StreamingHttpResponse)
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags
+
+CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def parse_range(header, size):
+    """Диапазон ``(start, end)`` включительно из заголовка Range.
+
+    Возвращает None, если заголовка нет или в нём несколько диапазонов
+    (тогда отдаётся весь файл), и ``False``, если диапазон невыполним.
+    """
+    match = RANGE_RE.match(header.replace(' ', ''))
+    if not match:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        length = int(end)
+        if not length or not size:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def iter_mmap(path, start, end):
+    """Отдаёт байты ``[start, end]`` файла блоками через mmap."""
+    with open(path, 'rb') as media_file:
+        with mmap.mmap(
+            media_file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mapped:
+            position = start
+            while position <= end:
+                chunk_end = min(position + CHUNK_SIZE, end + 1)
+                yield mapped[position:chunk_end]
+                position = chunk_end
+
+
+def get_media_path(path):
+    path = posixpath.normpath(path)
+    if not any(path.startswith(prefix)
+               for prefix in settings.MEDIA_SERVE_DIRS):
+        raise Http404
+    try:
+        return safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+
+
+def serve_media(request, path):
+    full_path = get_media_path(path)
+    try:
+        stat = os.stat(full_path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    content_type, _ = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+    etag = f'"{stat.st_size:x}-{int(stat.st_mtime):x}"'
+
+    response = HttpResponse(content_type=content_type)
+    set_headers(response, etag, stat)
+    conditional = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime),
+        response=response,
+    )
+    if conditional is not response:
+        return conditional
+
+    # Веб-сервер раскодирует путь сам; без кодирования Django записал бы
+    # не-ASCII имя по RFC 2047, и файл бы не нашёлся.
+    backend = settings.MEDIA_SENDFILE
+    if backend == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = quote(
+            settings.MEDIA_ACCEL_PREFIX + posixpath.normpath(path)
+        )
+        return response
+    if backend == 'x-sendfile':
+        response['X-Sendfile'] = quote(full_path)
+        return response
+
+    byte_range = None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range or etag in parse_etags(if_range):
+        byte_range = parse_range(
+            request.META.get('HTTP_RANGE', ''), stat.st_size
+        )
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return response
+    if byte_range is None:
+        response = FileResponse(
+            open(full_path, 'rb'), content_type=content_type
+        )
+        set_headers(response, etag, stat)
+        return response
+    start, end = byte_range
+    response = StreamingHttpResponse(
+        iter_mmap(full_path, start, end),
+        status=206, content_type=content_type,
+    )
+    set_headers(response, etag, stat)
+    response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    response['Content-Length'] = end - start + 1
+    return response
+
+
+def set_headers(response, etag, stat):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Accept-Ranges'] = 'bytes'
+    response['Cache-Control'] = settings.MEDIA_CACHE_CONTROL
+
+
+class MediaFilesMiddleware:
+    """Отдаёт файлы из ``MEDIA_SERVE_DIRS`` по ``MEDIA_URL``."""
+
+    def __init__(self, get_response):
+        if not settings.MEDIA_SERVE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefix = settings.MEDIA_URL
+
+    def __call__(self, request):
+        if (request.method in ('GET', 'HEAD')
+                and request.path_info.startswith(self.prefix)):
+            return serve_media(request, request.path_info[len(self.prefix):])
+        return self.get_response(request)
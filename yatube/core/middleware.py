@@ -0,0 +1,124 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+
+from . import locks
+from .cache import get_content_version
+
+
+def has_session_cookie(request):
+    return settings.SESSION_COOKIE_NAME in request.COOKIES
+
+
+def get_page_cache_key(host, full_path):
+    url = f'{host}{full_path}'
+    return 'page:' + hashlib.md5(url.encode()).hexdigest()
+
+
+class LazyAuthenticationMiddleware(AuthenticationMiddleware):
+    """Аутентификация без обращения к сессии для анонимных запросов.
+
+    Без cookie сессии пользователь заведомо анонимный: не читаем
+    хранилище сессий и ``auth_user``, а ответ не получает ``Vary: Cookie``.
+    """
+
+    def process_request(self, request):
+        if not has_session_cookie(request):
+            request.user = AnonymousUser()
+            return
+        super().process_request(request)
+
+
+class AnonymousPageCacheMiddleware:
+    """Кеш целых страниц для анонимных GET-запросов.
+
+    Кешируются только представления из ``PAGE_CACHE_VIEWS``; ключ —
+    хост и путь со строкой запроса. Запись хранит версию контента и считается
+    устаревшей после ``PAGE_CACHE_TIMEOUT`` или смены версии.
+    Пересчитывает страницу только тот запрос, что взял блокировку,
+    остальные в это время получают устаревшую копию; блокировка общая
+    для процессов (см. ``core.locks``). Если копии ещё нет,
+    они рендерят страницу сами, не дожидаясь и не записывая её в кеш.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PAGE_CACHE_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.page_cache_key = None
+        request.page_cache_lock = None
+        response = self.get_response(request)
+        key = request.page_cache_key
+        if key and self.is_cacheable(response):
+            self.store(key, request.page_cache_version, response)
+            response['X-Page-Cache'] = 'miss'
+        if request.page_cache_lock:
+            request.page_cache_lock.release()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (request.method not in ('GET', 'HEAD')
+                or has_session_cookie(request)
+                or request.resolver_match.view_name
+                not in settings.PAGE_CACHE_VIEWS):
+            return None
+        key = get_page_cache_key(
+            request.get_host(), request.get_full_path()
+        )
+        version = get_content_version()
+        entry = cache.get(key)
+        if entry and self.is_fresh(entry, version):
+            return self.build_response(entry, 'hit')
+        lock = locks.acquire(key + ':lock', settings.PAGE_CACHE_LOCK_TIMEOUT)
+        if lock:
+            request.page_cache_key = key
+            request.page_cache_lock = lock
+            request.page_cache_version = version
+            return None
+        if entry:
+            return self.build_response(entry, 'stale')
+        return None
+
+    @staticmethod
+    def is_fresh(entry, version):
+        return entry['version'] == version and entry['expires'] > time.time()
+
+    @staticmethod
+    def is_cacheable(response):
+        return (
+            response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+            and 'Cookie' not in response.get('Vary', '')
+            and 'private' not in response.get('Cache-Control', '')
+        )
+
+    @staticmethod
+    def store(key, version, response):
+        entry = {
+            'version': version,
+            'expires': time.time() + settings.PAGE_CACHE_TIMEOUT,
+            'status': response.status_code,
+            'content': response.content,
+            'headers': list(response.items()),
+        }
+        cache.set(
+            key, entry,
+            settings.PAGE_CACHE_TIMEOUT + settings.PAGE_CACHE_STALE_TIMEOUT
+        )
+
+    @staticmethod
+    def build_response(entry, state):
+        response = HttpResponse(entry['content'], status=entry['status'])
+        for header, value in entry['headers']:
+            response[header] = value
+        response['X-Page-Cache'] = state
+        return response
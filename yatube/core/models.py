@@ -0,0 +1,45 @@
+from django.db import models
+
+
+class Job(models.Model):
+    """Задача фоновой очереди (core.tasks)."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Не выполнена'),
+    )
+
+    name = models.CharField('Задача', max_length=200)
+    payload = models.TextField('Аргументы', default='{}')
+    status = models.CharField(
+        'Статус', max_length=16, choices=STATUS_CHOICES, default=QUEUED
+    )
+    attempts = models.IntegerField('Попыток', default=0)
+    max_attempts = models.IntegerField('Попыток всего', default=1)
+    run_at = models.DateTimeField('Выполнить после')
+    created = models.DateTimeField('Создана', auto_now_add=True)
+    started_at = models.DateTimeField('Начата', null=True, blank=True)
+    heartbeat_at = models.DateTimeField(
+        'Исполнитель отвечал', null=True, blank=True
+    )
+    finished_at = models.DateTimeField('Закончена', null=True, blank=True)
+    worker = models.CharField('Исполнитель', max_length=100, blank=True)
+    last_error = models.TextField('Ошибка', blank=True)
+
+    class Meta:
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        indexes = [
+            # Выбор следующих задач и поиск зависших.
+            models.Index(
+                fields=['status', 'run_at'], name='job_status_run_at'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}'
@@ -0,0 +1,97 @@
+"""Пагинатор с оценкой числа строк для больших таблиц.
+
+``COUNT(*)`` по всей таблице на PostgreSQL и SQLite — полный проход.
+Для запроса без условий число строк берётся из статистики планировщика
+(``pg_class.reltuples``, ``sqlite_stat1`` после ``ANALYZE``), если
+она говорит о большой таблице. Отфильтрованные запросы и небольшие
+таблицы считаются точно.
+
+Оценка расходится с таблицей в обе стороны, поэтому для страницы
+по оценке сначала считаются строки окна на одну больше страницы:
+неполное окно — последняя страница, и число строк уточняется по нему.
+Пустая страница за концом данных не ошибка: число строк тогда
+считается точно, а номера страниц сокращаются до настоящих.
+"""
+import contextlib
+
+from django.conf import settings
+from django.core.paginator import EmptyPage, Paginator
+from django.db import DatabaseError, connections, transaction
+from django.utils.functional import cached_property
+
+
+def estimate_rows(model, using='default'):
+    """Оценка числа строк таблицы модели или ``None``."""
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples FROM pg_class WHERE oid = %s::regclass'
+    elif connection.vendor == 'sqlite':
+        sql = 'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1'
+    else:
+        return None
+    # Ошибка в PostgreSQL прерывает транзакцию, поэтому там запрос
+    # идёт в точке сохранения.
+    atomic = (transaction.atomic(using) if connection.vendor == 'postgresql'
+              else contextlib.nullcontext())
+    try:
+        with atomic, connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        # sqlite_stat1 появляется только после первого ANALYZE.
+        return None
+    if row is None:
+        return None
+    # В sqlite_stat1 первое число — строки таблицы.
+    estimate = int(float(str(row[0]).split()[0]))
+    return estimate if estimate >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    estimated = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        query = getattr(queryset, 'query', None)
+        if query is not None and not query.where:
+            estimate = estimate_rows(queryset.model, queryset.db)
+            if (estimate is not None
+                    and estimate >= settings.ESTIMATED_COUNT_THRESHOLD):
+                self.estimated = True
+                return estimate
+        return super().count
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            # По оценке страниц может быть меньше, чем на деле.
+            if not self.estimated or int(number) < 1:
+                raise
+            return int(number)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.estimated:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        found = self.object_list[bottom:top + 1].count()
+        if found > self.per_page:
+            self.set_count(max(self.count, bottom + found))
+        elif found:
+            self.set_count(bottom + found)
+        else:
+            self.set_count(None)
+        return self._get_page(self.object_list[bottom:top], number, self)
+
+    def set_count(self, count):
+        """Уточняет число строк; ``None`` — посчитать точно."""
+        self.__dict__.pop('count', None)
+        self.__dict__.pop('num_pages', None)
+        if count is None:
+            self.estimated = False
+            count = Paginator.count.func(self)
+        self.__dict__['count'] = count
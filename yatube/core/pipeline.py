@@ -0,0 +1,129 @@
+"""Побочные эффекты записи, выполняемые после коммита транзакции.
+
+``defer()`` добавляет задачу в пачку текущей точки сохранения; задачи
+с одинаковым ``key`` внутри транзакции схлопываются в одну, так что
+повторные сбросы кешей выполняются один раз. После коммита пачки
+уходят в ограниченный пул потоков (``PIPELINE_ASYNC``) или выполняются
+сразу; при откате транзакции или точки сохранения её пачка
+отбрасывается вместе с ней. Упавшая
+задача повторяется до ``PIPELINE_RETRIES`` раз с растущей паузой.
+Когда очередь пула заполнена, задача выполняется в потоке запроса.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+RETRY_DELAY = 0.1
+
+_executor = None
+_slots = None
+_queue_size = 0
+_lock = threading.Lock()
+
+
+class Batch:
+    """Задачи одной точки сохранения в порядке первого добавления.
+
+    ``done`` общий для всех пачек транзакции: задача с ключом,
+    уже выполненным другой пачкой, пропускается.
+    """
+
+    def __init__(self, savepoint_ids, done):
+        self.savepoint_ids = savepoint_ids
+        self.done = done
+        self.tasks = {}
+
+    def add(self, key, func, args):
+        self.tasks[key] = (func, args)
+
+    def __call__(self):
+        for key, (func, args) in self.tasks.items():
+            if key not in self.done:
+                self.done.add(key)
+                dispatch(func, args)
+
+
+def defer(func, *args, key=None, using=DEFAULT_DB_ALIAS):
+    """Выполняет ``func(*args)`` после коммита текущей транзакции."""
+    if key is None:
+        key = object()
+    conn = connections[using]
+    if not conn.in_atomic_block:
+        dispatch(func, args)
+        return
+    # Django убирает колбэки отменённой точки сохранения из
+    # run_on_commit; пачки, которых там нет, уже не выполнятся.
+    batches = [
+        callback for _, callback in conn.run_on_commit
+        if isinstance(callback, Batch)
+    ]
+    savepoint_ids = set(conn.savepoint_ids)
+    for batch in batches:
+        # Во внешней точке задача откатится только вместе с текущей.
+        if key in batch.tasks and batch.savepoint_ids < savepoint_ids:
+            return
+    for batch in batches:
+        if batch.savepoint_ids == savepoint_ids:
+            break
+    else:
+        batch = Batch(savepoint_ids, batches[0].done if batches else set())
+        transaction.on_commit(batch, using=using)
+    batch.add(key, func, args)
+
+
+def get_executor():
+    global _executor, _slots, _queue_size
+    with _lock:
+        if _executor is None:
+            _queue_size = settings.PIPELINE_QUEUE_SIZE
+            _slots = threading.BoundedSemaphore(_queue_size)
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.PIPELINE_WORKERS,
+                thread_name_prefix='pipeline',
+            )
+    return _executor
+
+
+def dispatch(func, args):
+    if settings.PIPELINE_ASYNC:
+        executor = get_executor()
+        if _slots.acquire(blocking=False):
+            executor.submit(run_in_pool, func, args)
+            return
+    run(func, args)
+
+
+def run(func, args):
+    for attempt in range(settings.PIPELINE_RETRIES + 1):
+        try:
+            func(*args)
+            return
+        except Exception:
+            if attempt == settings.PIPELINE_RETRIES:
+                logger.exception('Задача %r не выполнена', func)
+                return
+            time.sleep(RETRY_DELAY * 2 ** attempt)
+
+
+def run_in_pool(func, args):
+    try:
+        run(func, args)
+    finally:
+        _slots.release()
+        connection.close()
+
+
+def drain():
+    """Ждёт, пока пул выполнит все поставленные задачи."""
+    if _executor is None:
+        return
+    for _ in range(_queue_size):
+        _slots.acquire()
+    for _ in range(_queue_size):
+        _slots.release()
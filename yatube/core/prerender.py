@@ -0,0 +1,101 @@
+"""Статические страницы, отрендеренные заранее при деплое.
+
+Команда ``prerender_pages`` складывает HTML и его сжатые копии
+в ``PRERENDER_ROOT``; при ``SERVE_PRERENDERED = True`` представления
+отдают готовые байты из памяти процесса. Страницы перечитываются,
+когда меняется время изменения манифеста (его команда пишет последним).
+"""
+import hashlib
+import json
+import os
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+
+from .compression import SUFFIXES, select_encoding
+from .middleware import has_session_cookie
+
+MANIFEST_NAME = 'manifest.json'
+
+_loaded = {}
+_lock = threading.Lock()
+
+
+def make_etag(content):
+    return '"{}"'.format(hashlib.sha256(content).hexdigest()[:32])
+
+
+class PrerenderedPage:
+    def __init__(self, etag, variants):
+        self.etag = etag
+        self.variants = variants
+
+    def response(self, request):
+        encoding = select_encoding(request, self.variants)
+        response = HttpResponse(
+            self.variants[encoding or 'identity'],
+            content_type='text/html; charset=utf-8',
+        )
+        response['ETag'] = self.etag
+        response['Content-Length'] = len(response.content)
+        if encoding:
+            response['Content-Encoding'] = encoding
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return get_conditional_response(
+            request, etag=self.etag, response=response
+        )
+
+
+def load_pages(root):
+    """Все страницы из ``root`` в виде ``{шаблон: PrerenderedPage}``.
+
+    Отсутствие манифеста не запоминается: страницы появятся,
+    как только отработает ``prerender_pages``.
+    """
+    manifest_path = os.path.join(root, MANIFEST_NAME)
+    try:
+        mtime = os.stat(manifest_path).st_mtime_ns
+    except FileNotFoundError:
+        return {}
+    loaded = _loaded.get(root)
+    if loaded is not None and loaded[0] == mtime:
+        return loaded[1]
+    try:
+        pages = read_pages(root, manifest_path)
+    except FileNotFoundError:
+        # Команда ещё пишет файлы; прочитаем в следующий раз.
+        return {}
+    with _lock:
+        _loaded[root] = (mtime, pages)
+    return pages
+
+
+def read_pages(root, manifest_path):
+    with open(manifest_path) as manifest_file:
+        manifest = json.load(manifest_file)
+    pages = {}
+    for template_name, meta in manifest.items():
+        path = os.path.join(root, template_name)
+        variants = {}
+        for encoding in ['identity'] + meta['encodings']:
+            with open(path + SUFFIXES.get(encoding, ''), 'rb') as page_file:
+                variants[encoding] = page_file.read()
+        pages[template_name] = PrerenderedPage(meta['etag'], variants)
+    return pages
+
+
+def get_page(template_name):
+    return load_pages(settings.PRERENDER_ROOT).get(template_name)
+
+
+class PrerenderedTemplateMixin:
+    """Отдаёт анонимам заранее отрендеренный ``template_name``."""
+
+    def get(self, request, *args, **kwargs):
+        if settings.SERVE_PRERENDERED and not has_session_cookie(request):
+            page = get_page(self.template_name)
+            if page is not None:
+                return page.response(request)
+        return super().get(request, *args, **kwargs)
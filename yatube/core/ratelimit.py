@@ -0,0 +1,40 @@
+"""Ограничение частоты действий по алгоритму token bucket.
+
+Состояние корзины хранится в общем кеше, поэтому лимит действует
+на все процессы. Чтение и запись не атомарны: при одновременных
+запросах одного пользователя лимит может быть превышен на пару
+действий, для защиты от всплесков этого достаточно.
+"""
+import math
+import time
+
+from django.core.cache import cache
+
+
+class TokenBucket:
+    """``burst`` действий подряд, дальше ``rate`` действий в секунду."""
+
+    def __init__(self, scope, rate, burst):
+        self.scope = scope
+        self.rate = rate
+        self.burst = burst
+
+    def get_key(self, ident):
+        return f'ratelimit:{self.scope}:{ident}'
+
+    def take(self, ident, tokens=1):
+        """Забирает токены; возвращает 0 или сколько секунд ждать."""
+        key = self.get_key(ident)
+        now = time.time()
+        available, updated = cache.get(key) or (self.burst, now)
+        available = min(
+            self.burst, available + (now - updated) * self.rate
+        )
+        if available < tokens:
+            return (tokens - available) / self.rate
+        # Полная корзина и отсутствие ключа равнозначны.
+        cache.set(
+            key, (available - tokens, now),
+            math.ceil(self.burst / self.rate),
+        )
+        return 0
@@ -0,0 +1,34 @@
+"""Полнотекстовый поиск по текстовому полю на PostgreSQL.
+
+Условие ``to_tsvector(конфигурация, поле) @@ plainto_tsquery(...)``
+совпадает с выражением GIN-индекса из ``text_index_sql``, поэтому
+поиск идёт по индексу, а не перебором строк. На других БД функции
+возвращают ``None``, и используется обычный ``icontains``.
+"""
+from django.contrib.postgres.search import SearchQuery, SearchVectorField
+from django.db import connections
+from django.db.models import Func
+
+SEARCH_CONFIG = 'russian'
+
+
+class TSVector(Func):
+    function = 'to_tsvector'
+    template = f"%(function)s('{SEARCH_CONFIG}'::regconfig, %(expressions)s)"
+    output_field = SearchVectorField()
+
+
+def text_index_sql(model, field, name):
+    return (
+        f'CREATE INDEX IF NOT EXISTS {name} ON {model._meta.db_table} '
+        f"USING gin (to_tsvector('{SEARCH_CONFIG}'::regconfig, {field}))"
+    )
+
+
+def search_text(queryset, field, term):
+    """Строки, где ``field`` содержит слова ``term``, или ``None``."""
+    if connections[queryset.db].vendor != 'postgresql':
+        return None
+    return queryset.annotate(search_document=TSVector(field)).filter(
+        search_document=SearchQuery(term, config=SEARCH_CONFIG)
+    )
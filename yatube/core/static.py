@@ -0,0 +1,133 @@
+"""Раздача собранной статики самим приложением.
+
+Подходит для установки на одну машину без отдельного веб-сервера.
+Содержимое ``STATIC_ROOT`` индексируется один раз при старте; файлы
+отдаются через ``FileResponse``, поэтому WSGI-сервер с
+``wsgi.file_wrapper`` (gunicorn, uWSGI) пересылает их через ``sendfile``
+без копирования в Python.
+"""
+import json
+import logging
+import mimetypes
+import os
+import posixpath
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from .compression import SUFFIXES, select_encoding
+
+logger = logging.getLogger(__name__)
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'public, max-age=60'
+MANIFEST_NAME = 'staticfiles.json'
+
+
+class StaticFile:
+    def __init__(self, path, stat, immutable):
+        self.path = path
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime
+        self.immutable = immutable
+        content_type, _ = mimetypes.guess_type(path)
+        self.content_type = content_type or 'application/octet-stream'
+        self.variants = {}
+
+    def etag(self, encoding):
+        suffix = f'-{encoding}' if encoding else ''
+        return f'"{self.size:x}-{int(self.mtime):x}{suffix}"'
+
+    def response(self, request):
+        encoding = select_encoding(request, self.variants)
+        path = self.variants[encoding] if encoding else self.path
+        etag = self.etag(encoding)
+        response = FileResponse(
+            open(path, 'rb'), content_type=self.content_type
+        )
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(self.mtime)
+        response['Cache-Control'] = (
+            IMMUTABLE if self.immutable else REVALIDATE
+        )
+        if encoding:
+            response['Content-Encoding'] = encoding
+        if self.variants:
+            patch_vary_headers(response, ('Accept-Encoding',))
+        conditional = get_conditional_response(
+            request, etag=etag, last_modified=int(self.mtime),
+            response=response,
+        )
+        if conditional is not response:
+            response.close()
+        return conditional
+
+
+def scan(root):
+    """Рекурсивный обход каталога: пары (относительный путь, DirEntry)."""
+    stack = ['']
+    while stack:
+        relative_dir = stack.pop()
+        with os.scandir(os.path.join(root, relative_dir)) as entries:
+            for entry in entries:
+                relative = posixpath.join(relative_dir, entry.name)
+                if entry.is_dir():
+                    stack.append(relative)
+                else:
+                    yield relative, entry
+
+
+def build_index(root):
+    try:
+        with open(os.path.join(root, MANIFEST_NAME)) as manifest_file:
+            hashed = set(json.load(manifest_file)['paths'].values())
+    except (FileNotFoundError, ValueError, KeyError):
+        hashed = set()
+    suffixes = {suffix: encoding for encoding, suffix in SUFFIXES.items()}
+    files, compressed = {}, []
+    for relative, entry in scan(root):
+        base, suffix = os.path.splitext(relative)
+        if suffix in suffixes:
+            compressed.append((base, suffixes[suffix], entry.path))
+        files[relative] = StaticFile(
+            entry.path, entry.stat(), relative in hashed
+        )
+    for base, encoding, path in compressed:
+        if base in files:
+            files[base].variants[encoding] = path
+            files.pop(base + SUFFIXES[encoding], None)
+    return files
+
+
+class StaticFilesMiddleware:
+    """Отдаёт файлы из ``STATIC_ROOT`` по ``STATIC_URL``.
+
+    Файлы с хешем в имени кешируются браузером навсегда, сжатая копия
+    выбирается по Accept-Encoding. Если ``STATIC_ROOT`` ещё не создан,
+    middleware отключается с предупреждением.
+    """
+
+    def __init__(self, get_response):
+        if not settings.STATIC_SERVE or not settings.STATIC_ROOT:
+            raise MiddlewareNotUsed
+        if not os.path.isdir(settings.STATIC_ROOT):
+            logger.warning(
+                'Каталог STATIC_ROOT %s не найден, статика не раздаётся. '
+                'Выполните python manage.py collectstatic.',
+                settings.STATIC_ROOT,
+            )
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL
+        self.files = build_index(settings.STATIC_ROOT)
+
+    def __call__(self, request):
+        if (request.method in ('GET', 'HEAD')
+                and request.path_info.startswith(self.prefix)):
+            static_file = self.files.get(request.path_info[len(self.prefix):])
+            if static_file is not None:
+                return static_file.response(request)
+        return self.get_response(request)
@@ -0,0 +1,101 @@
+import hashlib
+import mimetypes
+import os
+import posixpath
+import tempfile
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+
+from .compression import SUFFIXES, compress
+
+COMPRESSIBLE_TYPES = (
+    'application/javascript',
+    'application/json',
+    'application/xml',
+    'image/svg+xml',
+    'image/vnd.microsoft.icon',
+    'image/x-icon',
+)
+# Сжатая копия не нужна, если экономит меньше 5 %.
+MIN_RATIO = 0.95
+
+
+def is_compressible(name):
+    content_type, encoding = mimetypes.guess_type(name)
+    if content_type is None or encoding is not None:
+        return False
+    return (content_type.startswith('text/')
+            or content_type in COMPRESSIBLE_TYPES)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хешем в имени и заранее сжатыми копиями ``.gz``/``.br``."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in set(self.hashed_files.values()):
+            if is_compressible(name):
+                self.compress_file(name)
+
+    def compress_file(self, name):
+        with self.open(name) as source:
+            content = source.read()
+        for encoding, data in compress(content).items():
+            compressed_name = name + SUFFIXES[encoding]
+            if self.exists(compressed_name):
+                self.delete(compressed_name)
+            if len(data) < len(content) * MIN_RATIO:
+                self._save(compressed_name, ContentFile(data))
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Загрузки под именем из SHA-256 содержимого.
+
+    Одинаковые файлы хранятся один раз: ``posts/ab/ab12….jpg``. Хеш
+    считается во время записи во временный файл, без повторного чтения.
+    При ``MEDIA_CONTENT_ADDRESSED = False`` работает как обычное хранилище.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        if settings.MEDIA_CONTENT_ADDRESSED:
+            return name
+        return super().get_available_name(name, max_length)
+
+    def _save(self, name, content):
+        if not settings.MEDIA_CONTENT_ADDRESSED:
+            return super()._save(name, content)
+        directory, basename = posixpath.split(name)
+        extension = os.path.splitext(basename)[1].lower()
+        os.makedirs(self.path(directory), exist_ok=True)
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.path(directory), suffix='.upload'
+        )
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    tmp_file.write(chunk)
+            hexdigest = digest.hexdigest()
+            name = posixpath.join(
+                directory, hexdigest[:2], hexdigest + extension
+            )
+            path = self.path(name)
+            if os.path.exists(path):
+                # Свежая дата защищает файл от сборщика, пока пост
+                # с новой ссылкой на него ещё не сохранён.
+                os.utime(path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                if self.file_permissions_mode is not None:
+                    os.chmod(tmp_path, self.file_permissions_mode)
+                os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return name
@@ -0,0 +1,271 @@
+"""Фоновые задачи в таблице ``Job`` основной БД, без внешнего брокера.
+
+Функция с ``@task`` ставится в очередь вызовом ``.delay()``: строка
+``Job`` пишется в текущей транзакции, поэтому задача появится, только
+если транзакция закоммитится. ``manage.py run_workers`` выполняет
+задачи в нескольких потоках и процессах. Задача захватывается условным
+``UPDATE`` по статусу, так что её выполняет один исполнитель. Упавшая
+задача повторяется с растущей паузой. Процесс ``run_workers`` раз
+в ``TASKS_HEARTBEAT_INTERVAL`` отмечает свои задачи живыми; задача
+без отметки дольше ``TASKS_LOCK_TIMEOUT`` возвращается в очередь,
+а результат её прежнего исполнителя уже не записывается.
+"""
+import datetime
+import functools
+import json
+import logging
+import threading
+import time
+import traceback
+
+from django.conf import settings
+from django.db import DatabaseError, OperationalError, connection
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# Сколько задач-кандидатов читать за раз: их могут перехватить
+# другие исполнители.
+CLAIM_BATCH = 10
+MAINTENANCE_INTERVAL = 60
+# Повторы запроса к захваченной задаче при блокировке БД и первая
+# пауза, с.
+LOCKED_RETRIES = 3
+LOCKED_RETRY_DELAY = 0.05
+
+_registry = {}
+_maintained_at = 0
+_lock = threading.Lock()
+
+
+class Task:
+    def __init__(self, func, name, retries):
+        functools.update_wrapper(self, func)
+        self.func = func
+        self.name = name
+        self.retries = retries
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        """Ставит задачу в очередь; аргументы должны сериализоваться
+        в JSON."""
+        return self.schedule(args, kwargs)
+
+    def schedule(self, args=(), kwargs=None, countdown=0):
+        retries = (settings.TASKS_RETRIES if self.retries is None
+                   else self.retries)
+        return Job.objects.create(
+            name=self.name,
+            payload=json.dumps({'args': list(args), 'kwargs': kwargs or {}}),
+            max_attempts=retries + 1,
+            run_at=timezone.now() + datetime.timedelta(seconds=countdown),
+        )
+
+
+def task(func=None, *, name=None, retries=None):
+    """Регистрирует функцию как фоновую задачу.
+
+    ``retries`` — сколько раз повторить упавшую задачу, по умолчанию
+    ``TASKS_RETRIES``.
+    """
+    def register(func):
+        task_name = name or f'{func.__module__}.{func.__qualname__}'
+        if task_name in _registry:
+            raise ValueError(f'Задача {task_name} уже зарегистрирована')
+        _registry[task_name] = Task(func, task_name, retries)
+        return _registry[task_name]
+    if func is not None:
+        return register(func)
+    return register
+
+
+class Metrics:
+    """Счётчики выполненных задач процесса по именам."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.tasks = {}
+
+    def add(self, name, outcome, seconds):
+        with self.lock:
+            stats = self.tasks.setdefault(name, {
+                'done': 0, 'retried': 0, 'failed': 0, 'seconds': 0.0,
+            })
+            stats[outcome] += 1
+            stats['seconds'] += seconds
+
+    def snapshot(self):
+        with self.lock:
+            return {name: dict(stats) for name, stats in self.tasks.items()}
+
+
+metrics = Metrics()
+
+
+def retry_locked(func, *args, **kwargs):
+    """Вызывает ``func``, переживая кратковременную блокировку БД.
+
+    Для запросов к уже захваченной задаче: иначе она осталась бы
+    ``RUNNING`` и по ``TASKS_LOCK_TIMEOUT`` выполнилась бы ещё раз.
+    """
+    for attempt in range(LOCKED_RETRIES):
+        try:
+            return func(*args, **kwargs)
+        except OperationalError:
+            if attempt == LOCKED_RETRIES - 1:
+                raise
+            time.sleep(LOCKED_RETRY_DELAY * 2 ** attempt)
+
+
+def claim(worker):
+    """Захватывает ближайшую готовую задачу или возвращает ``None``."""
+    now = timezone.now()
+    candidates = Job.objects.filter(
+        status=Job.QUEUED, run_at__lte=now
+    ).order_by('run_at', 'pk').values_list('pk', flat=True)[:CLAIM_BATCH]
+    for pk in list(candidates):
+        claimed = Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+            status=Job.RUNNING, worker=worker, started_at=now,
+            heartbeat_at=now, attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return retry_locked(Job.objects.get, pk=pk)
+    return None
+
+
+def execute(job):
+    started = time.monotonic()
+    # Задачу, возвращённую в очередь, мог захватить другой исполнитель.
+    jobs = Job.objects.filter(
+        pk=job.pk, status=Job.RUNNING, worker=job.worker
+    )
+    try:
+        task = _registry.get(job.name)
+        if task is None:
+            raise LookupError(f'Неизвестная задача {job.name}')
+        data = json.loads(job.payload)
+        task.func(*data['args'], **data['kwargs'])
+    except Exception:
+        error = traceback.format_exc()
+        seconds = time.monotonic() - started
+        if job.attempts < job.max_attempts:
+            delay = settings.TASKS_RETRY_BACKOFF * 2 ** (job.attempts - 1)
+            retry_locked(
+                jobs.update, status=Job.QUEUED, worker='', last_error=error,
+                run_at=timezone.now() + datetime.timedelta(seconds=delay),
+            )
+            metrics.add(job.name, 'retried', seconds)
+            logger.warning('Задача %s упала, повтор через %s с', job, delay)
+        else:
+            retry_locked(
+                jobs.update, status=Job.FAILED, finished_at=timezone.now(),
+                last_error=error,
+            )
+            metrics.add(job.name, 'failed', seconds)
+            logger.error('Задача %s не выполнена:\n%s', job, error)
+        return
+    seconds = time.monotonic() - started
+    retry_locked(jobs.update, status=Job.DONE, finished_at=timezone.now())
+    metrics.add(job.name, 'done', seconds)
+    logger.info('Задача %s выполнена за %.3f с', job, seconds)
+
+
+def beat(prefix):
+    """Отмечает живыми задачи исполнителей с именем ``prefix:…``."""
+    return Job.objects.filter(
+        status=Job.RUNNING, worker__startswith=f'{prefix}:'
+    ).update(heartbeat_at=timezone.now())
+
+
+def heartbeat(prefix, stop):
+    """Отмечает задачи процесса, пока не выставлен ``stop``."""
+    try:
+        while not stop.wait(settings.TASKS_HEARTBEAT_INTERVAL):
+            beat(prefix)
+    finally:
+        connection.close()
+
+
+def stale_jobs():
+    """Выполняемые задачи без отметки дольше ``TASKS_LOCK_TIMEOUT``."""
+    deadline = timezone.now() - datetime.timedelta(
+        seconds=settings.TASKS_LOCK_TIMEOUT
+    )
+    return Job.objects.filter(
+        Q(heartbeat_at__lt=deadline)
+        | Q(heartbeat_at=None, started_at__lt=deadline),
+        status=Job.RUNNING,
+    )
+
+
+def requeue_stale():
+    """Возвращает в очередь задачи исполнителей, которые не ответили."""
+    stale = stale_jobs()
+    error = 'Исполнитель не завершил задачу'
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, finished_at=timezone.now(), last_error=error,
+    )
+    return failed + stale.update(
+        status=Job.QUEUED, worker='', last_error=error,
+    )
+
+
+def purge_finished():
+    """Удаляет выполненные задачи старше ``TASKS_KEEP_DONE`` секунд."""
+    deleted, _ = Job.objects.filter(
+        status=Job.DONE,
+        finished_at__lt=timezone.now() - datetime.timedelta(
+            seconds=settings.TASKS_KEEP_DONE
+        ),
+    ).delete()
+    return deleted
+
+
+def maintain():
+    global _maintained_at
+    with _lock:
+        if time.monotonic() - _maintained_at < MAINTENANCE_INTERVAL:
+            return
+        _maintained_at = time.monotonic()
+    requeue_stale()
+    purge_finished()
+
+
+def work(worker, stop, once=False):
+    """Выполняет задачи, пока не выставлен ``stop``.
+
+    С ``once`` возвращается, когда готовых задач не осталось.
+    """
+    try:
+        while not stop.is_set():
+            try:
+                job = claim(worker)
+                if job is not None:
+                    execute(job)
+                    continue
+                if once:
+                    return
+                maintain()
+            except DatabaseError:
+                # Поток не должен умирать из-за сбоя БД: задача вернётся
+                # в очередь по TASKS_LOCK_TIMEOUT.
+                logger.exception('Ошибка БД в исполнителе %s', worker)
+                connection.close()
+            stop.wait(settings.TASKS_POLL_INTERVAL)
+    finally:
+        connection.close()
+
+
+def queue_stats():
+    """Число задач по статусам и именам: ``{(name, status): count}``."""
+    return {
+        (row['name'], row['status']): row['count']
+        for row in Job.objects.order_by().values('name', 'status').annotate(
+            count=Count('pk')
+        )
+    }
@@ -0,0 +1,137 @@
+import importlib
+import os
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from core import checks
+
+PROD_TEMPLATES = [{
+    'BACKEND': 'django.template.backends.django.DjangoTemplates',
+    'OPTIONS': {
+        'loaders': ['django.template.loaders.filesystem.Loader'],
+    },
+}]
+
+
+def prod_settings():
+    """Модуль боевых настроек, загруженный заново."""
+    with mock.patch.dict(os.environ, {'SECRET_KEY': 'test'}):
+        return importlib.reload(
+            importlib.import_module('yatube.settings.prod')
+        )
+
+
+class PerformanceChecksTest(SimpleTestCase):
+    @override_settings(DEBUG=True, ENVIRONMENT='prod')
+    def test_debug_in_prod(self):
+        """DEBUG в боевом профиле даёт предупреждение."""
+        self.assertEqual(
+            [error.id for error in checks.check_debug(None)], ['core.W001']
+        )
+
+    @override_settings(DEBUG=True, ENVIRONMENT='dev')
+    def test_debug_in_dev(self):
+        """В профиле разработки DEBUG допустим."""
+        self.assertEqual(checks.check_debug(None), [])
+
+    @override_settings(DEBUG=False, ENVIRONMENT='prod')
+    def test_local_cache(self):
+        """Локальный кеш процесса не подходит для боевого режима."""
+        self.assertEqual(
+            [error.id for error in checks.check_cache(None)], ['core.W002']
+        )
+
+    @override_settings(DEBUG=False, ENVIRONMENT='prod', CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': '/var/tmp/yatube_cache',
+        },
+    })
+    def test_small_file_cache(self):
+        """Файловому кешу мало 300 записей по умолчанию."""
+        self.assertEqual(
+            [error.id for error in checks.check_cache(None)], ['core.W008']
+        )
+
+    @override_settings(
+        DEBUG=False,
+        ENVIRONMENT='prod',
+        SESSION_ENGINE='django.contrib.sessions.backends.db',
+    )
+    def test_db_sessions(self):
+        self.assertEqual(
+            [error.id for error in checks.check_sessions(None)],
+            ['core.W003']
+        )
+
+    @override_settings(DEBUG=False, ENVIRONMENT='prod', DATABASES={
+        'default': {'ENGINE': 'django.db.backends.postgresql'},
+    })
+    def test_no_persistent_connections(self):
+        self.assertEqual(
+            [error.id for error in checks.check_databases(None)],
+            ['core.W005']
+        )
+
+    @override_settings(
+        DEBUG=False, ENVIRONMENT='prod', TEMPLATES=PROD_TEMPLATES
+    )
+    def test_templates_without_cached_loader(self):
+        self.assertEqual(
+            [error.id for error in checks.check_templates(None)],
+            ['core.W006']
+        )
+
+    @override_settings(
+        DEBUG=False,
+        ENVIRONMENT='prod',
+        SESSION_ENGINE='django.contrib.sessions.backends.cache',
+    )
+    def test_local_cache_sessions(self):
+        """Сессии в локальном кеше не видны другим воркерам."""
+        self.assertEqual(
+            [error.id for error in checks.check_sessions(None)],
+            ['core.W007']
+        )
+
+
+class ProdSettingsTest(SimpleTestCase):
+    def test_prod_passes_checks(self):
+        """Боевой профиль не вызывает предупреждений о производительности."""
+        prod = prod_settings()
+        with override_settings(
+            DEBUG=False, ENVIRONMENT='prod', TEMPLATES=prod.TEMPLATES,
+            CACHES=prod.CACHES, SESSION_ENGINE=prod.SESSION_ENGINE,
+        ):
+            for check in (checks.check_cache, checks.check_sessions,
+                          checks.check_templates):
+                self.assertEqual(check(None), [])
+
+    def test_prod_derived_from_base(self):
+        """Боевые шаблоны и БД копируют базовые, не меняя их."""
+        from yatube.settings import base
+
+        prod = prod_settings()
+        template = prod.TEMPLATES[0]
+        self.assertFalse(template['APP_DIRS'])
+        self.assertEqual(
+            template['OPTIONS']['context_processors'],
+            base.TEMPLATES[0]['OPTIONS']['context_processors'],
+        )
+        self.assertTrue(base.TEMPLATES[0]['APP_DIRS'])
+        self.assertNotIn('loaders', base.TEMPLATES[0]['OPTIONS'])
+        self.assertEqual(prod.DATABASES['default']['CONN_MAX_AGE'], 60)
+        self.assertEqual(base.DATABASES['default'].get('CONN_MAX_AGE', 0), 0)
+
+    def test_cache_options_by_backend(self):
+        """Лимит записей задаётся только кешам, которые его понимают."""
+        prod = prod_settings()
+        self.assertEqual(
+            prod.CACHES['default']['OPTIONS'],
+            {'MAX_ENTRIES': 50000, 'CULL_FREQUENCY': 10},
+        )
+        memcached = 'django.core.cache.backends.memcached.MemcachedCache'
+        with mock.patch.dict(os.environ, {'CACHE_BACKEND': memcached}):
+            prod = prod_settings()
+        self.assertEqual(prod.CACHES['default']['OPTIONS'], {})
@@ -0,0 +1,26 @@
+import math
+
+from django.test import SimpleTestCase, override_settings
+
+from core.counters import log_add
+from core.hot import event_score
+
+
+@override_settings(HOT_HALF_LIFE=3600)
+class HotScoreTest(SimpleTestCase):
+    def test_log_add(self):
+        self.assertAlmostEqual(log_add(math.log(2), math.log(3)),
+                               math.log(5))
+        self.assertAlmostEqual(log_add(2000, 0), 2000)
+
+    def test_half_life(self):
+        """Через период полураспада вес события вдвое меньше."""
+        self.assertAlmostEqual(
+            event_score(2, 1_700_000_000), event_score(1, 1_700_003_600)
+        )
+
+    def test_old_activity_decays(self):
+        old = log_add(event_score(1, 1_700_000_000),
+                      event_score(3, 1_700_000_000))
+        self.assertAlmostEqual(old, event_score(1, 1_700_007_200))
+        self.assertLess(old, event_score(2, 1_700_003_600))
@@ -0,0 +1,142 @@
+import os
+import shutil
+import tempfile
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import Http404
+from django.test import (Client, RequestFactory, SimpleTestCase,
+                         override_settings)
+
+from core.media import parse_range, serve_media
+from core.tests.test_checks import prod_settings
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+CONTENT = bytes(range(256)) * 1024
+
+
+def read(response):
+    if response.streaming:
+        return b''.join(response.streaming_content)
+    return response.content
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ServeMediaTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(TEMP_MEDIA_ROOT, 'posts'))
+        with open(os.path.join(TEMP_MEDIA_ROOT, 'posts', 'a.jpg'), 'wb') as f:
+            f.write(CONTENT)
+        with open(os.path.join(TEMP_MEDIA_ROOT, 'posts', 'кот 1.jpg'),
+                  'wb') as f:
+            f.write(CONTENT)
+        with open(os.path.join(TEMP_MEDIA_ROOT, 'secret.txt'), 'wb') as f:
+            f.write(b'secret')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def get(self, path='posts/a.jpg', **headers):
+        request = RequestFactory().get('/media/' + path, **headers)
+        return serve_media(request, path)
+
+    def test_full_file(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(read(response), CONTENT)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+
+    def test_range(self):
+        """Диапазон отдаётся со статусом 206."""
+        response = self.get(HTTP_RANGE='bytes=100-70000')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(read(response), CONTENT[100:70001])
+        self.assertEqual(
+            response['Content-Range'], f'bytes 100-70000/{len(CONTENT)}'
+        )
+
+    def test_suffix_range(self):
+        response = self.get(HTTP_RANGE='bytes=-10')
+        self.assertEqual(read(response), CONTENT[-10:])
+
+    def test_unsatisfiable_range(self):
+        response = self.get(HTTP_RANGE=f'bytes={len(CONTENT)}-')
+        self.assertEqual(response.status_code, 416)
+
+    def test_if_range_mismatch_returns_full_file(self):
+        response = self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"old"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_not_modified(self):
+        etag = self.get()['ETag']
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_only_allowed_dirs(self):
+        """Файлы вне posts/ и cache/ не раздаются."""
+        for path in ('secret.txt', 'posts/../secret.txt', 'posts/none.jpg'):
+            with self.subTest(path=path):
+                with self.assertRaises(Http404):
+                    self.get(path)
+
+    @override_settings(MEDIA_SENDFILE='x-accel-redirect')
+    def test_accel_redirect(self):
+        response = self.get()
+        self.assertEqual(
+            response['X-Accel-Redirect'], '/protected-media/posts/a.jpg'
+        )
+        self.assertEqual(response.content, b'')
+
+    @override_settings(MEDIA_SENDFILE='x-accel-redirect')
+    def test_accel_redirect_quoted(self):
+        """Не-ASCII имя передаётся веб-серверу в URL-кодировке."""
+        response = self.get('posts/кот 1.jpg')
+        self.assertEqual(
+            response['X-Accel-Redirect'],
+            '/protected-media/posts/%D0%BA%D0%BE%D1%82%201.jpg',
+        )
+
+    @override_settings(MEDIA_SENDFILE='x-sendfile')
+    def test_sendfile_quoted(self):
+        response = self.get('posts/кот 1.jpg')
+        self.assertEqual(
+            response['X-Sendfile'],
+            quote(os.path.join(TEMP_MEDIA_ROOT, 'posts', 'кот 1.jpg')),
+        )
+
+    def test_parse_range(self):
+        self.assertEqual(parse_range('bytes=0-0', 10), (0, 0))
+        self.assertEqual(parse_range('bytes=5-100', 10), (5, 9))
+        self.assertIsNone(parse_range('bytes=0-1,3-4', 10))
+        self.assertIs(parse_range('bytes=-5', 0), False)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, MEDIA_SERVE=True)
+class ProdMiddlewareMediaTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(TEMP_MEDIA_ROOT, 'posts'), exist_ok=True)
+        with open(os.path.join(TEMP_MEDIA_ROOT, 'posts', 'b.txt'), 'wb') as f:
+            f.write(CONTENT)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_range_not_gzipped(self):
+        """В боевом стеке middleware ответ 206 не сжимается."""
+        with override_settings(MIDDLEWARE=prod_settings().MIDDLEWARE):
+            response = Client().get(
+                '/media/posts/b.txt', HTTP_RANGE='bytes=100-70000',
+                HTTP_ACCEPT_ENCODING='gzip',
+            )
+        self.assertEqual(response.status_code, 206)
+        self.assertNotIn('Content-Encoding', response)
+        self.assertFalse(response['ETag'].startswith('W/'))
+        self.assertEqual(read(response), CONTENT[100:70001])
@@ -0,0 +1,41 @@
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Post, User
+
+
+class LazyAuthenticationTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        Post.objects.create(text='Тестовый пост', author=cls.user)
+
+    def test_anonymous_without_cookie(self):
+        """Аноним без cookie не трогает сессии и таблицу пользователей."""
+        with CaptureQueriesContext(connection) as context:
+            response = Client().get(reverse('about:author'))
+        self.assertEqual(context.captured_queries, [])
+        self.assertFalse(response.wsgi_request.user.is_authenticated)
+        self.assertNotIn('Cookie', response.get('Vary', ''))
+
+    def test_authenticated_user(self):
+        """С cookie сессии пользователь определяется как обычно."""
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(reverse('about:author'))
+        self.assertEqual(response.wsgi_request.user, self.user)
+        self.assertContains(response, self.user.username)
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cache')
+    def test_cache_sessions(self):
+        """Сессии в кеше не обращаются к таблице django_session."""
+        client = Client()
+        client.force_login(self.user)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(reverse('about:author'))
+        self.assertEqual(response.wsgi_request.user, self.user)
+        for query in context.captured_queries:
+            self.assertNotIn('django_session', query['sql'])
@@ -0,0 +1,130 @@
+import shutil
+import tempfile
+import time
+
+from django.core.cache import cache
+from django.test import (Client, TestCase, TransactionTestCase,
+                         override_settings)
+from django.urls import reverse
+
+from core import locks
+from core.cache import get_content_version
+from core.middleware import get_page_cache_key
+from posts.comments import comments_counter
+from posts.models import Post, User
+
+
+@override_settings(PAGE_CACHE_ENABLED=True)
+class AnonymousPageCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='writer')
+        cls.post = Post.objects.create(text='Первый пост', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.index = reverse('posts:index')
+
+    def test_second_request_is_served_from_cache(self):
+        """Повторный анонимный запрос не доходит до представления."""
+        response = self.guest_client.get(self.index)
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(self.index)
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertContains(response, self.post.text)
+
+    def test_query_string_is_part_of_key(self):
+        self.guest_client.get(self.index)
+        response = self.guest_client.get(self.index + '?page=2')
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+
+    @override_settings(ALLOWED_HOSTS=['testserver', 'mirror.testserver'])
+    def test_host_is_part_of_key(self):
+        self.guest_client.get(self.index)
+        response = self.guest_client.get(
+            self.index, HTTP_HOST='mirror.testserver'
+        )
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+
+    def test_session_cookie_bypasses_cache(self):
+        """С cookie сессии страница всегда рендерится заново."""
+        self.guest_client.get(self.index)
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(self.index)
+        self.assertNotIn('X-Page-Cache', response)
+
+    def test_private_views_are_not_cached(self):
+        response = self.guest_client.get(reverse('posts:post_create'))
+        self.assertNotIn('X-Page-Cache', response)
+
+    def test_stale_page_served_while_recomputed(self):
+        """Пока один запрос пересчитывает страницу, другие получают старую."""
+        url = reverse('about:author')
+        key = get_page_cache_key('testserver', url)
+        self.guest_client.get(url)
+        entry = cache.get(key)
+        entry['expires'] = time.time() - 1
+        cache.set(key, entry)
+        cache.set(key + ':lock', 1)
+        response = self.guest_client.get(url)
+        self.assertEqual(response['X-Page-Cache'], 'stale')
+        cache.delete(key + ':lock')
+        response = self.guest_client.get(url)
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertEqual(cache.get(key)['version'], get_content_version())
+
+    def test_no_entry_rendered_without_waiting(self):
+        """Без копии в кеше запрос не ждёт чужой блокировки."""
+        url = reverse('about:author')
+        key = get_page_cache_key('testserver', url)
+        cache.set(key + ':lock', 1)
+        response = self.guest_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Page-Cache', response)
+        self.assertIsNone(cache.get(key))
+
+
+@override_settings(PAGE_CACHE_ENABLED=True)
+class ContentChangePageCacheTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='writer')
+        self.guest_client = Client()
+        self.index = reverse('posts:index')
+
+    def test_content_change_invalidates_page(self):
+        """Новый пост меняет версию контента после коммита."""
+        self.guest_client.get(self.index)
+        Post.objects.create(text='Новый пост', author=self.user)
+        response = self.guest_client.get(self.index)
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+
+    @override_settings(COUNTER_FLUSH_INTERVAL=0)
+    def test_counter_flush_keeps_page(self):
+        """Запись счётчика комментариев не сбрасывает кеш страниц."""
+        post = Post.objects.create(text='Пост', author=self.user)
+        self.guest_client.get(self.index)
+        comments_counter.add(post.pk)
+        response = self.guest_client.get(self.index)
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+
+
+class FileLockTest(TestCase):
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location, ignore_errors=True)
+
+    def test_file_cache_lock_exclusive(self):
+        """С файловым кешем блокировка держится flock, а не cache.add."""
+        with override_settings(CACHES={'default': {
+            'BACKEND': locks.FILE_CACHE, 'LOCATION': self.location,
+        }}):
+            lock = locks.acquire('page:1:lock', 10)
+            self.assertIsInstance(lock, locks.FileLock)
+            self.assertIsNone(locks.acquire('page:1:lock', 10))
+            lock.release()
+            locks.acquire('page:1:lock', 10).release()
@@ -0,0 +1,77 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core.paginators import EstimatedCountPaginator, estimate_rows
+from posts.models import Post, User
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Статистика SQLite')
+class EstimatedCountPaginatorTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create(username='writer')
+        Post.objects.bulk_create(
+            Post(author=user, text=f'Пост {number}') for number in range(5)
+        )
+
+    def analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def test_exact_without_statistics(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TABLE IF EXISTS sqlite_stat1')
+        self.assertIsNone(estimate_rows(Post))
+        self.assertEqual(EstimatedCountPaginator(Post.objects.all(), 2).count,
+                         5)
+
+    @override_settings(ESTIMATED_COUNT_THRESHOLD=1)
+    def test_estimate_used_for_unfiltered(self):
+        self.analyze()
+        Post.objects.filter(text='Пост 0').delete()
+        with CaptureQueriesContext(connection) as queries:
+            count = EstimatedCountPaginator(Post.objects.all(), 2).count
+        self.assertEqual(count, 5)
+        self.assertFalse(
+            [query for query in queries if 'COUNT(' in query['sql']]
+        )
+        filtered = Post.objects.filter(text__startswith='Пост')
+        self.assertEqual(EstimatedCountPaginator(filtered, 2).count, 4)
+
+    @override_settings(ESTIMATED_COUNT_THRESHOLD=100)
+    def test_small_table_counted(self):
+        self.analyze()
+        Post.objects.filter(text='Пост 0').delete()
+        self.assertEqual(EstimatedCountPaginator(Post.objects.all(), 2).count,
+                         4)
+
+    @override_settings(ESTIMATED_COUNT_THRESHOLD=1)
+    def test_overestimate_capped(self):
+        """Пустая страница за концом данных не ошибка, страниц меньше."""
+        self.analyze()
+        Post.objects.exclude(text__in=['Пост 0', 'Пост 1', 'Пост 2']).delete()
+        paginator = EstimatedCountPaginator(Post.objects.order_by('pk'), 2)
+        self.assertEqual(paginator.num_pages, 3)
+        page = paginator.page(3)
+        self.assertEqual(len(page), 0)
+        self.assertEqual((paginator.count, paginator.num_pages), (3, 2))
+        paginator = EstimatedCountPaginator(Post.objects.order_by('pk'), 2)
+        self.assertEqual(len(paginator.page(2)), 1)
+        self.assertEqual((paginator.count, paginator.num_pages), (3, 2))
+        self.assertFalse(paginator.page(2).has_next())
+
+    @override_settings(ESTIMATED_COUNT_THRESHOLD=1)
+    def test_underestimate_extended(self):
+        self.analyze()
+        user = User.objects.get()
+        Post.objects.bulk_create(
+            Post(author=user, text=f'Ещё {number}') for number in range(3)
+        )
+        paginator = EstimatedCountPaginator(Post.objects.order_by('pk'), 2)
+        self.assertEqual(paginator.num_pages, 3)
+        self.assertTrue(paginator.page(3).has_next())
+        self.assertEqual(len(paginator.page(4)), 2)
+        self.assertEqual((paginator.count, paginator.num_pages), (8, 4))
@@ -0,0 +1,77 @@
+from django.apps import apps
+from django.contrib.auth.hashers import (check_password, get_hasher,
+                                         identify_hasher, make_password)
+from django.contrib.auth.password_validation import (
+    CommonPasswordValidator, get_default_password_validators)
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import checks
+from posts.models import User
+
+PBKDF2 = 'core.passwords.PBKDF2PasswordHasher'
+SCRYPT = 'core.passwords.ScryptPasswordHasher'
+ARGON2 = 'django.contrib.auth.hashers.Argon2PasswordHasher'
+
+
+@override_settings(PASSWORD_SCRYPT_WORK_FACTOR=2 ** 10,
+                   PASSWORD_PBKDF2_ITERATIONS=1000)
+class PasswordHasherTest(TestCase):
+    @override_settings(PASSWORD_HASHERS=[SCRYPT])
+    def test_scrypt_roundtrip(self):
+        encoded = make_password('секрет')
+        self.assertTrue(encoded.startswith('scrypt$1024$'))
+        self.assertTrue(check_password('секрет', encoded))
+        self.assertFalse(check_password('другой', encoded))
+        self.assertFalse(get_hasher().must_update(encoded))
+
+    def login(self, password='секрет'):
+        return self.client.post(reverse('users:login'), {
+            'username': 'reader', 'password': password,
+        })
+
+    def test_rehash_on_login(self):
+        """После смены хешера или стоимости хеш обновляется при входе."""
+        with self.settings(PASSWORD_HASHERS=[PBKDF2, SCRYPT]):
+            User.objects.create_user('reader', password='секрет')
+        with self.settings(PASSWORD_HASHERS=[SCRYPT, PBKDF2]):
+            self.assertEqual(self.login().status_code, 302)
+            encoded = User.objects.get().password
+            self.assertEqual(identify_hasher(encoded).algorithm, 'scrypt')
+            with self.settings(PASSWORD_SCRYPT_WORK_FACTOR=2 ** 11):
+                self.login()
+            self.assertTrue(
+                User.objects.get().password.startswith('scrypt$2048$')
+            )
+            self.assertEqual(self.login('другой').status_code, 200)
+
+    @override_settings(PASSWORD_HASHERS=[ARGON2, PBKDF2])
+    def test_missing_library_reported(self):
+        try:
+            get_hasher()._load_library()
+        except ValueError:
+            expected = ['core.E001']
+        else:
+            expected = []
+        self.assertEqual(
+            [error.id for error in checks.check_password_hasher(None)],
+            expected,
+        )
+
+
+class CommonPasswordValidatorTest(TestCase):
+    def test_loaded_at_startup(self):
+        """Готовое приложение уже создало валидаторы со словарём."""
+        get_default_password_validators.cache_clear()
+        apps.get_app_config('core').ready()
+        self.assertEqual(
+            get_default_password_validators.cache_info().currsize, 1
+        )
+        validator, = [
+            validator for validator in get_default_password_validators()
+            if isinstance(validator, CommonPasswordValidator)
+        ]
+        with self.assertRaises(ValidationError):
+            validator.validate('Password')
+        validator.validate('Xq7-very-unusual')
@@ -0,0 +1,88 @@
+import threading
+from unittest import mock
+
+from django.db import transaction
+from django.test import TransactionTestCase, override_settings
+
+from core import pipeline
+
+
+class PipelineTest(TransactionTestCase):
+    def setUp(self):
+        self.calls = []
+        patcher = mock.patch.object(pipeline, 'RETRY_DELAY', 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def record(self, value):
+        self.calls.append((value, threading.current_thread().name))
+
+    def values(self):
+        return [value for value, _ in self.calls]
+
+    def test_runs_after_commit_once_per_key(self):
+        with transaction.atomic():
+            for number in range(3):
+                pipeline.defer(self.record, number, key='invalidate')
+            pipeline.defer(self.record, 'other')
+            self.assertEqual(self.calls, [])
+        self.assertEqual(self.values(), [2, 'other'])
+
+    def test_rollback_discards(self):
+        with self.assertRaises(ZeroDivisionError):
+            with transaction.atomic():
+                pipeline.defer(self.record, 'lost', key='invalidate')
+                1 / 0
+        with transaction.atomic():
+            pipeline.defer(self.record, 'kept', key='invalidate')
+        self.assertEqual(self.values(), ['kept'])
+
+    def test_savepoint_rollback_discards(self):
+        """Задачи отменённой точки сохранения не выполняются."""
+        with transaction.atomic():
+            pipeline.defer(self.record, 'outer')
+            with self.assertRaises(ZeroDivisionError):
+                with transaction.atomic():
+                    pipeline.defer(self.record, 'lost')
+                    1 / 0
+            with transaction.atomic():
+                pipeline.defer(self.record, 'kept', key='inner')
+                pipeline.defer(self.record, 'again', key='inner')
+            pipeline.defer(self.record, 'last', key='inner')
+        self.assertEqual(self.values(), ['outer', 'last'])
+
+    def test_key_in_outer_batch_runs_once(self):
+        with transaction.atomic():
+            pipeline.defer(self.record, 'outer', key='invalidate')
+            with transaction.atomic():
+                pipeline.defer(self.record, 'inner', key='invalidate')
+        self.assertEqual(self.values(), ['outer'])
+
+    def test_autocommit_runs_immediately(self):
+        pipeline.defer(self.record, 'now')
+        self.assertEqual(self.values(), ['now'])
+
+    @override_settings(PIPELINE_RETRIES=2)
+    def test_failed_task_retried(self):
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise ValueError
+            self.record('done')
+
+        pipeline.defer(flaky)
+        self.assertEqual(self.values(), ['done'])
+        attempts.clear()
+        with self.assertLogs('core.pipeline', 'ERROR'):
+            pipeline.defer(lambda: attempts.append(1) or 1 / 0)
+        self.assertEqual(len(attempts), 3)
+
+    @override_settings(PIPELINE_ASYNC=True)
+    def test_async_runs_in_pool(self):
+        with transaction.atomic():
+            pipeline.defer(self.record, 'pooled')
+        pipeline.drain()
+        self.assertEqual(self.values(), ['pooled'])
+        self.assertTrue(self.calls[0][1].startswith('pipeline'))
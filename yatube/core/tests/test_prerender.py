@@ -0,0 +1,107 @@
+import gzip
+import io
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.prerender import get_page
+from posts.models import User
+
+TEMP_PRERENDER_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(
+    PRERENDER_ROOT=TEMP_PRERENDER_ROOT, SERVE_PRERENDERED=True
+)
+class PrerenderedPagesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command('prerender_pages', stdout=io.StringIO())
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_PRERENDER_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.url = reverse('about:author')
+        with open(os.path.join(
+            TEMP_PRERENDER_ROOT, 'about', 'author.html'
+        ), 'rb') as page_file:
+            self.content = page_file.read()
+
+    def test_files_are_written(self):
+        """Для каждой страницы есть HTML и его gzip-копия."""
+        for template_name, _ in settings.PRERENDER_PAGES:
+            with self.subTest(template_name=template_name):
+                path = os.path.join(TEMP_PRERENDER_ROOT, template_name)
+                self.assertTrue(os.path.isfile(path))
+                self.assertTrue(os.path.isfile(path + '.gz'))
+
+    def test_prerendered_page_is_served(self):
+        """Аноним получает готовую страницу без рендеринга шаблонов."""
+        response = self.guest_client.get(self.url)
+        self.assertEqual(response.content, self.content)
+        self.assertEqual(response.templates, [])
+        self.assertIn('ETag', response)
+
+    def test_gzip_variant(self):
+        response = self.guest_client.get(
+            self.url, HTTP_ACCEPT_ENCODING='gzip, deflate'
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), self.content)
+
+    def test_not_modified(self):
+        etag = self.guest_client.get(self.url)['ETag']
+        response = self.guest_client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_authorized_user_gets_rendered_page(self):
+        client = Client()
+        client.force_login(User.objects.create_user(username='reader'))
+        response = client.get(self.url)
+        self.assertTemplateUsed(response, 'about/author.html')
+
+    def test_error_pages_without_path(self):
+        """Страницы ошибок для веб-сервера не содержат пустого адреса."""
+        for template_name, text in (
+            ('core/403.html', 'Доступ к этой странице запрещён'),
+            ('core/404.html', 'Такой страницы не существует'),
+        ):
+            with self.subTest(template_name=template_name):
+                with open(os.path.join(
+                    TEMP_PRERENDER_ROOT, template_name
+                ), encoding='utf-8') as page_file:
+                    self.assertIn(text, page_file.read())
+
+
+@override_settings(SERVE_PRERENDERED=True)
+class LoadPagesTest(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+
+    def test_pages_appear_after_prerender(self):
+        """Отсутствие манифеста не запоминается навсегда."""
+        with override_settings(PRERENDER_ROOT=self.root):
+            self.assertIsNone(get_page('about/author.html'))
+            call_command('prerender_pages', stdout=io.StringIO())
+            self.assertIsNotNone(get_page('about/author.html'))
+
+    def test_pages_reloaded_when_manifest_changes(self):
+        with override_settings(PRERENDER_ROOT=self.root):
+            call_command('prerender_pages', stdout=io.StringIO())
+            page = get_page('about/author.html')
+            self.assertIs(get_page('about/author.html'), page)
+            manifest = os.path.join(self.root, 'manifest.json')
+            mtime = os.stat(manifest).st_mtime_ns + 10 ** 9
+            os.utime(manifest, ns=(mtime, mtime))
+            self.assertIsNot(get_page('about/author.html'), page)
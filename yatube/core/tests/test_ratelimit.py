@@ -0,0 +1,36 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from core.ratelimit import TokenBucket
+
+
+class TokenBucketTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.bucket = TokenBucket('test', rate=0.5, burst=2)
+
+    def take_at(self, now):
+        with mock.patch('core.ratelimit.time.time', return_value=now):
+            return self.bucket.take('user')
+
+    def test_burst_then_refill(self):
+        self.assertEqual(self.take_at(100), 0)
+        self.assertEqual(self.take_at(100), 0)
+        self.assertAlmostEqual(self.take_at(100), 2)
+        self.assertAlmostEqual(self.take_at(101), 1)
+        self.assertEqual(self.take_at(102), 0)
+
+    def test_idle_bucket_is_full(self):
+        self.take_at(100)
+        self.take_at(100)
+        self.assertEqual(self.take_at(1000), 0)
+        self.assertEqual(self.take_at(1000), 0)
+        self.assertGreater(self.take_at(1000), 0)
+
+    def test_keys_are_per_user(self):
+        for _ in range(2):
+            self.take_at(100)
+        with mock.patch('core.ratelimit.time.time', return_value=100):
+            self.assertEqual(self.bucket.take('other'), 0)
@@ -0,0 +1,42 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.context_processors import site
+
+
+class SiteGlobalsTest(TestCase):
+    def setUp(self):
+        site.clear()
+        self.addCleanup(site.clear)
+
+    def test_unused_values_not_computed(self):
+        with mock.patch.object(site, 'current_year') as current_year:
+            site.site_globals(None)
+        current_year.assert_not_called()
+
+    def test_values_memoized(self):
+        with mock.patch.object(
+            site, 'current_year', return_value=2000
+        ) as current_year:
+            self.assertEqual(str(site.site_globals(None)['year']), '2000')
+            self.assertEqual(str(site.site_globals(None)['year']), '2000')
+        current_year.assert_called_once()
+
+    @override_settings(SITE_GLOBALS_TIMEOUT=60)
+    def test_expired_value_recomputed(self):
+        str(site.site_globals(None)['year'])
+        later = site.time.monotonic() + 61
+        with mock.patch.object(site.time, 'monotonic', return_value=later):
+            with mock.patch.object(
+                site, 'current_year', return_value=2000
+            ) as current_year:
+                year = str(site.site_globals(None)['year'])
+        self.assertEqual(year, '2000')
+        current_year.assert_called_once()
+
+    def test_footer_shows_year(self):
+        response = self.client.get(reverse('about:author'))
+        self.assertContains(response, f'{timezone.now().year} Copyright')
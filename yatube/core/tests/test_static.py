@@ -0,0 +1,86 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.core.exceptions import MiddlewareNotUsed
+from django.test import Client, SimpleTestCase, override_settings
+
+from core.static import StaticFilesMiddleware
+
+TEMP_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SOURCE_DIR = os.path.join(TEMP_DIR, 'static')
+STATIC_ROOT = os.path.join(TEMP_DIR, 'static_root')
+CSS = b'body { color: black; }\n' * 50
+
+
+@override_settings(
+    STATICFILES_DIRS=[SOURCE_DIR],
+    STATICFILES_FINDERS=[
+        'django.contrib.staticfiles.finders.FileSystemFinder',
+    ],
+    STATICFILES_STORAGE='core.storage.CompressedManifestStaticFilesStorage',
+    STATIC_ROOT=STATIC_ROOT,
+    STATIC_SERVE=True,
+)
+class StaticPipelineTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(SOURCE_DIR, 'css'))
+        with open(os.path.join(SOURCE_DIR, 'css', 'site.css'), 'wb') as css:
+            css.write(CSS)
+        call_command('collectstatic', interactive=False, verbosity=0)
+        cls.url = staticfiles_storage.url('css/site.css')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_DIR, ignore_errors=True)
+
+    def get(self, **headers):
+        return Client().get(self.url, **headers)
+
+    def test_hashed_and_compressed_copies(self):
+        """collectstatic создаёт файл с хешем в имени и его gzip-копию."""
+        self.assertNotEqual(self.url, '/static/css/site.css')
+        path = os.path.join(STATIC_ROOT, self.url[len('/static/'):])
+        self.assertTrue(os.path.isfile(path))
+        self.assertTrue(os.path.isfile(path + '.gz'))
+
+    def test_hashed_file_is_immutable(self):
+        response = self.get()
+        self.assertEqual(b''.join(response.streaming_content), CSS)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(response['Content-Type'], 'text/css')
+
+    def test_precompressed_variant(self):
+        response = self.get(HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            gzip.decompress(b''.join(response.streaming_content)), CSS
+        )
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_not_modified(self):
+        etag = self.get()['ETag']
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_unhashed_name_revalidates(self):
+        response = Client().get('/static/css/site.css')
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+
+class MissingStaticRootTest(SimpleTestCase):
+    @override_settings(
+        STATIC_SERVE=True, STATIC_ROOT=os.path.join(TEMP_DIR, 'missing')
+    )
+    def test_missing_root_disables_middleware(self):
+        """Без collectstatic приложение стартует, а не падает."""
+        with self.assertLogs('core.static', 'WARNING'):
+            with self.assertRaises(MiddlewareNotUsed):
+                StaticFilesMiddleware(lambda request: None)
@@ -0,0 +1,155 @@
+import datetime
+import io
+import threading
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core import tasks
+from core.models import Job
+
+User = get_user_model()
+CALLS = []
+
+
+@tasks.task(name='test.record')
+def record(*args, **kwargs):
+    CALLS.append((args, kwargs))
+
+
+@tasks.task(name='test.broken', retries=1)
+def broken():
+    raise ValueError('сломано')
+
+
+class TaskQueueTest(TestCase):
+    def setUp(self):
+        CALLS.clear()
+        self.stop = threading.Event()
+
+    def work(self):
+        tasks.work('test', self.stop, once=True)
+
+    def test_delay_runs_once(self):
+        job = record.delay(1, 'два', key='три')
+        self.assertEqual(job.status, Job.QUEUED)
+        self.work()
+        self.assertEqual(CALLS, [((1, 'два'), {'key': 'три'})])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.DONE, 1))
+        self.work()
+        self.assertEqual(len(CALLS), 1)
+
+    def test_claimed_by_one_worker(self):
+        record.delay()
+        self.assertIsNotNone(tasks.claim('first'))
+        self.assertIsNone(tasks.claim('second'))
+
+    def test_countdown_respected(self):
+        record.schedule(countdown=60)
+        self.work()
+        self.assertEqual(CALLS, [])
+
+    @override_settings(TASKS_RETRY_BACKOFF=30)
+    def test_retry_with_backoff_then_fail(self):
+        job = broken.delay()
+        with self.assertLogs('core.tasks', 'WARNING'):
+            self.work()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+        self.assertGreater(
+            job.run_at, timezone.now() + datetime.timedelta(seconds=25)
+        )
+        self.assertIn('сломано', job.last_error)
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        with self.assertLogs('core.tasks', 'ERROR'):
+            self.work()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+        stats = tasks.metrics.snapshot()['test.broken']
+        self.assertGreaterEqual(stats['retried'], 1)
+        self.assertGreaterEqual(stats['failed'], 1)
+
+    def test_unknown_task_fails(self):
+        job = Job.objects.create(name='test.missing', run_at=timezone.now())
+        with self.assertLogs('core.tasks', 'ERROR'):
+            self.work()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+
+    @override_settings(TASKS_LOCK_TIMEOUT=60, TASKS_KEEP_DONE=60)
+    def test_stale_requeued_and_done_purged(self):
+        long_ago = timezone.now() - datetime.timedelta(minutes=5)
+        stale = record.delay()
+        Job.objects.filter(pk=stale.pk).update(
+            status=Job.RUNNING, started_at=long_ago, attempts=1,
+            max_attempts=2,
+        )
+        old = record.delay()
+        Job.objects.filter(pk=old.pk).update(
+            status=Job.DONE, finished_at=long_ago
+        )
+        self.assertEqual(tasks.requeue_stale(), 1)
+        self.assertEqual(tasks.purge_finished(), 1)
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, Job.QUEUED)
+        self.assertFalse(Job.objects.filter(pk=old.pk).exists())
+
+    @override_settings(TASKS_LOCK_TIMEOUT=60)
+    def test_heartbeat_keeps_job(self):
+        """Задачу живого процесса не возвращают в очередь."""
+        record.delay()
+        job = tasks.claim('host:1:0')
+        long_ago = timezone.now() - datetime.timedelta(minutes=5)
+        Job.objects.filter(pk=job.pk).update(
+            started_at=long_ago, heartbeat_at=long_ago
+        )
+        self.assertEqual(tasks.beat('host:1'), 1)
+        self.assertEqual(tasks.beat('host:10'), 0)
+        self.assertEqual(tasks.requeue_stale(), 0)
+
+    def test_requeued_job_not_finished_by_old_worker(self):
+        """Результат прежнего исполнителя не перезаписывает задачу."""
+        record.delay()
+        job = tasks.claim('old')
+        Job.objects.filter(pk=job.pk).update(worker='new')
+        tasks.execute(job)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker), (Job.RUNNING, 'new'))
+
+
+class RunWorkersTest(TransactionTestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_threads_drain_queue(self):
+        for number in range(5):
+            record.delay(number)
+        out = io.StringIO()
+        call_command('run_workers', '--threads=2', '--once', stdout=out)
+        self.assertEqual(
+            sorted(args for args, _ in CALLS), [(n,) for n in range(5)]
+        )
+        self.assertFalse(Job.objects.exclude(status=Job.DONE).exists())
+        self.assertIn('test.record: выполнено', out.getvalue())
+        out = io.StringIO()
+        call_command('run_workers', '--stats', stdout=out)
+        self.assertIn('test.record done: 5', out.getvalue())
+
+
+class JobAdminTest(TestCase):
+    def test_retry_action(self):
+        admin = User.objects.create_superuser('root', 'root@ya.ru', 'pass')
+        self.client.force_login(admin)
+        job = broken.delay()
+        Job.objects.filter(pk=job.pk).update(status=Job.FAILED, attempts=2)
+        url = reverse('admin:core_job_changelist')
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.client.post(url, {
+            'action': 'retry_jobs', '_selected_action': [job.pk],
+        })
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.QUEUED, 0))
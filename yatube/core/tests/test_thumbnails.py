@@ -0,0 +1,88 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from sorl.thumbnail import default, get_thumbnail
+
+from posts.models import Post, User
+from posts.utils import attach_thumbnails
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailBatchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='painter')
+        for number in range(3):
+            Post.objects.create(
+                author=cls.user,
+                text=f'Пост {number}',
+                image=SimpleUploadedFile(
+                    f'pic{number}.gif', SMALL_GIF, content_type='image/gif'
+                ),
+            )
+        Post.objects.create(author=cls.user, text='Без картинки')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_names_match_template_tag(self):
+        posts = list(Post.objects.all())
+        attach_thumbnails(posts)
+        for post in posts:
+            with self.subTest(post=post.text):
+                if not post.image:
+                    self.assertIsNone(post.card_thumbnail)
+                    continue
+                expected = get_thumbnail(
+                    post.image, '100x100', crop='center'
+                )
+                self.assertEqual(post.card_thumbnail.name, expected.name)
+                self.assertEqual(post.card_thumbnail.width, expected.width)
+
+    def test_warm_page_needs_no_queries(self):
+        posts = list(Post.objects.all())
+        attach_thumbnails(posts)
+        with self.assertNumQueries(0):
+            attach_thumbnails(posts)
+
+    def test_cache_miss_reads_db_once(self):
+        posts = list(Post.objects.all())
+        attach_thumbnails(posts)
+        cache.clear()
+        with self.assertNumQueries(1):
+            attach_thumbnails(posts)
+        with self.assertNumQueries(0):
+            attach_thumbnails(posts)
+
+    def test_get_many_skips_unknown(self):
+        image = Post.objects.exclude(image='').first().image
+        thumbnail = get_thumbnail(image, '50x50')
+        found = default.kvstore.get_many([thumbnail])
+        self.assertEqual(list(found), [thumbnail.key])
+        default.kvstore.delete(thumbnail)
+        self.assertEqual(default.kvstore.get_many([thumbnail]), {})
+
+    def test_missing_source_is_skipped(self):
+        post = Post(author=self.user, text='Потерянный', image='posts/no.gif')
+        attach_thumbnails([post])
+        self.assertIsNone(post.card_thumbnail)
@@ -0,0 +1,49 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from core.topk import TopK
+
+
+class TopKTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.scores = {1: 10, 2: 8, 3: 5, 4: 3, 5: 1}
+        self.loads = 0
+        self.ranking = TopK('topk:test', 3, self.load)
+
+    def load(self, size):
+        self.loads += 1
+        return sorted(
+            ((pk, score) for pk, score in self.scores.items() if score > 0),
+            key=lambda item: -item[1],
+        )[:size]
+
+    def test_built_once(self):
+        self.assertEqual(self.ranking.ids(), [1, 2, 3])
+        self.assertEqual(self.ranking.ids(), [1, 2, 3])
+        self.assertEqual(self.loads, 1)
+
+    def test_incremental_update(self):
+        self.ranking.get()
+        self.ranking.update({4: 9, 2: 12})
+        self.assertEqual(self.ranking.get(), [(2, 12), (1, 10), (4, 9)])
+        self.assertEqual(self.loads, 1)
+
+    def test_outsider_below_boundary_ignored(self):
+        self.ranking.get()
+        self.ranking.update({5: 4})
+        self.assertEqual(self.ranking.ids(), [1, 2, 3])
+        self.assertEqual(self.loads, 1)
+
+    def test_member_falling_below_boundary_rebuilds(self):
+        self.ranking.get()
+        self.scores[1] = 2
+        self.ranking.update({1: 2})
+        self.assertEqual(self.ranking.ids(), [2, 3, 4])
+        self.assertEqual(self.loads, 2)
+
+    def test_zero_score_removed_from_partial_ranking(self):
+        self.scores = {1: 2, 2: 1}
+        self.ranking.get()
+        self.ranking.update({2: 0})
+        self.assertEqual(self.ranking.ids(), [1])
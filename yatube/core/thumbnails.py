@@ -0,0 +1,139 @@
+"""Пакетное получение миниатюр sorl-thumbnail.
+
+Для страницы ленты все миниатюры ищутся в хранилище ключей одним
+запросом к кешу вместо отдельного запроса на каждую карточку.
+"""
+from django.core.cache import InvalidCacheBackendError, cache, caches
+from sorl.thumbnail import default
+from sorl.thumbnail.base import ThumbnailBackend as BaseThumbnailBackend
+from sorl.thumbnail.conf import defaults as default_settings
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile, deserialize_image_file
+from sorl.thumbnail.kvstores.base import KVStoreBase, add_prefix
+from sorl.thumbnail.kvstores.cached_db_kvstore import (
+    EMPTY_VALUE, KVStore as BaseCachedDBKVStore)
+from sorl.thumbnail.models import KVStore as KVStoreModel
+
+
+def get_many(kvstore, image_files):
+    """Записи хранилища для файлов: ``{ключ файла: ImageFile}``."""
+    if hasattr(kvstore, 'get_many'):
+        return kvstore.get_many(image_files)
+    found = {}
+    for image_file in image_files:
+        cached = kvstore.get(image_file)
+        if cached is not None:
+            found[image_file.key] = cached
+    return found
+
+
+class ThumbnailBackend(BaseThumbnailBackend):
+    def get_options(self, source, options):
+        """Опции миниатюры так же, как их дополняет ``get_thumbnail``."""
+        options = dict(options)
+        if thumbnail_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(thumbnail_settings, attr)
+            if value != getattr(default_settings, attr):
+                options.setdefault(key, value)
+        return options
+
+    def get_thumbnails(self, files, geometry_string, **options):
+        """Миниатюры для нескольких файлов: ``{имя файла: ImageFile}``.
+
+        Имена миниатюр вычисляются без обращения к диску, готовые
+        ищутся одним запросом; недостающие создаются как обычно.
+        Файлы, для которых миниатюру получить не удалось, пропускаются.
+        """
+        thumbnails = {}
+        for file_ in files:
+            source = ImageFile(file_)
+            name = self._get_thumbnail_filename(
+                source, geometry_string, self.get_options(source, options)
+            )
+            thumbnails[file_.name] = ImageFile(name, default.storage)
+        cached = get_many(default.kvstore, thumbnails.values())
+        result = {}
+        for file_ in files:
+            thumbnail = cached.get(thumbnails[file_.name].key)
+            if thumbnail is None:
+                thumbnail = self.get_thumbnail(
+                    file_, geometry_string, **options
+                )
+            if thumbnail.size is not None:
+                result[file_.name] = thumbnail
+        return result
+
+
+class BatchKVStoreMixin:
+    def get_many(self, image_files):
+        keys = {add_prefix(image_file.key): image_file.key
+                for image_file in image_files}
+        if not keys:
+            return {}
+        return {
+            keys[raw_key]: deserialize_image_file(value)
+            for raw_key, value in self._get_many_raw(list(keys)).items()
+        }
+
+    @property
+    def cache(self):
+        try:
+            return caches[thumbnail_settings.THUMBNAIL_CACHE]
+        except InvalidCacheBackendError:
+            return cache
+
+
+class CacheKVStore(BatchKVStoreMixin, KVStoreBase):
+    """Хранилище ключей только в общем кеше, без таблицы в БД.
+
+    Потеря записи при вытеснении из кеша стоит одной проверки
+    существования файла миниатюры. Кеш не перечисляет ключи, поэтому
+    ``thumbnail cleanup`` и ``thumbnail clear`` для него ничего не делают.
+    """
+
+    def _get_raw(self, key):
+        return self.cache.get(key)
+
+    def _get_many_raw(self, keys):
+        return self.cache.get_many(keys)
+
+    def _set_raw(self, key, value):
+        self.cache.set(
+            key, value, thumbnail_settings.THUMBNAIL_CACHE_TIMEOUT
+        )
+
+    def _delete_raw(self, *keys):
+        self.cache.delete_many(keys)
+
+    def _find_keys_raw(self, prefix):
+        return []
+
+
+class CachedDBKVStore(BatchKVStoreMixin, BaseCachedDBKVStore):
+    """Стандартное хранилище sorl с пакетным чтением.
+
+    Промахи кеша дочитываются из БД одним запросом.
+    """
+
+    def _get_many_raw(self, keys):
+        values = self.cache.get_many(keys)
+        missing = [key for key in keys if key not in values]
+        if missing:
+            rows = dict(
+                KVStoreModel.objects.filter(
+                    key__in=missing
+                ).values_list('key', 'value')
+            )
+            loaded = {key: rows.get(key, EMPTY_VALUE) for key in missing}
+            self.cache.set_many(
+                loaded, thumbnail_settings.THUMBNAIL_CACHE_TIMEOUT
+            )
+            values.update(loaded)
+        return {
+            key: value for key, value in values.items()
+            if value != EMPTY_VALUE
+        }
@@ -0,0 +1,64 @@
+"""Ограниченные рейтинги «лучших» объектов в общем кеше.
+
+Рейтинг хранит до ``size`` пар ``(id, счёт)`` с положительным счётом
+по убыванию и обновляется точечно при изменении счётов, без пересчёта
+по всей таблице. Полный пересчёт (``loader``) нужен, только когда ключ
+вытеснен из кеша или рейтинг перестал быть достоверным: участник
+опустился ниже прежней границы, и неизвестно, кто должен занять его
+место. Одновременные обновления из разных процессов могут потерять
+изменение; ``timeout`` ограничивает, как долго такая ошибка живёт.
+"""
+from django.core.cache import cache
+
+
+class TopK:
+    def __init__(self, key, size, loader, timeout=None):
+        self.key = key
+        self.size = size
+        self.loader = loader
+        self.timeout = timeout
+
+    def get(self):
+        """Пары ``(id, счёт)`` по убыванию счёта."""
+        items = cache.get(self.key)
+        if items is None:
+            items = self.rebuild()
+        return items
+
+    def ids(self):
+        return [pk for pk, _ in self.get()]
+
+    def rebuild(self):
+        items = [tuple(item) for item in self.loader(self.size)]
+        cache.set(self.key, items, self.timeout)
+        return items
+
+    def update(self, scores):
+        """Учитывает новые счёты ``{id: счёт}``."""
+        items = cache.get(self.key)
+        if items is None:
+            return
+        ranking = dict(items)
+        full = len(ranking) >= self.size
+        boundary = items[-1][1] if items else 0
+        for pk, score in scores.items():
+            if pk in ranking and full and score < boundary:
+                # За границей могут быть объекты выше этого.
+                self.invalidate()
+                return
+            if score <= 0:
+                ranking.pop(pk, None)
+            elif pk in ranking or not full or score > boundary:
+                ranking[pk] = score
+        items = sorted(
+            ranking.items(), key=lambda item: (-item[1], -item[0])
+        )[:self.size]
+        cache.set(self.key, items, self.timeout)
+
+    def discard(self, pk):
+        """Убирает объект: рейтинг без него пересчитается при чтении."""
+        if pk in dict(cache.get(self.key) or ()):
+            self.invalidate()
+
+    def invalidate(self):
+        cache.delete(self.key)
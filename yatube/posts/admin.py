@@ -1,22 +1,266 @@
+from django import forms
 from django.contrib import admin
+from django.contrib.admin import helpers
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.db.models import Q
+from django.http import Http404, JsonResponse
+from django.template.response import TemplateResponse
+from django.test import RequestFactory
+from django.urls import path, reverse
+from django.utils.html import format_html
+from django.utils.text import Truncator
 
-from .models import Post, Group
+from core.paginators import EstimatedCountPaginator
+from core.search import search_text
+from .models import Comment, Follow, Group, Post, User
+from .moderation import (delete_posts, get_progress, move_to_group,
+                         purge_authors, start)
+
+
+class KnownAutocompleteSelect(AutocompleteSelect):
+    """Автодополнение, которому выбранный объект передают заранее.
+
+    Обычный виджет читает выбранный объект отдельным запросом, то есть
+    по запросу на каждую строку списка в админке.
+    """
+    selected_object = None
+
+    def optgroups(self, name, value, attr=None):
+        selected = [str(item) for item in value if item not in ('', None)]
+        obj = self.selected_object
+        if obj is None or selected != [str(obj.pk)]:
+            return super().optgroups(name, value, attr)
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, '', '', False, 0))
+        options.append(self.create_option(
+            name, obj.pk, self.choices.field.label_from_instance(obj),
+            True, len(options),
+        ))
+        return [(None, options, 0)]
+
+
+class PostChangeListForm(forms.ModelForm):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Группа уже загружена через list_select_related.
+        if 'group' in self.fields and self.instance.group_id:
+            widget = self.fields['group'].widget
+            getattr(widget, 'widget', widget).selected_object = (
+                self.instance.group
+            )
+
+
+class MoveToGroupForm(forms.Form):
+    group = forms.ModelChoiceField(
+        Group.objects.all(),
+        required=False,
+        label='Группа',
+        empty_label='Без группы',
+    )
 
 
 class PostAdmin(admin.ModelAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group')
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
     list_editable = ('group',)
+    date_hierarchy = 'pub_date'
+    raw_id_fields = ('author',)
+    # Выбор группы подгружается поиском, а не списком всех групп
+    # в каждой строке.
+    autocomplete_fields = ('group',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = '-пусто-'
+    actions = ('move_to_group', 'delete_with_media', 'purge_authors')
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name in self.autocomplete_fields:
+            kwargs['widget'] = KnownAutocompleteSelect(
+                db_field.remote_field, self.admin_site,
+                using=kwargs.get('using'),
+            )
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_changelist_form(self, request, **kwargs):
+        kwargs.setdefault('form', PostChangeListForm)
+        return super().get_changelist_form(request, **kwargs)
+
+    def get_urls(self):
+        return [
+            path(
+                'moderation/<slug:job_id>/',
+                self.admin_site.admin_view(self.moderation_progress),
+                name='posts_post_moderation',
+            ),
+        ] + super().get_urls()
+
+    def moderation_progress(self, request, job_id):
+        progress = get_progress(job_id)
+        if progress is None:
+            raise Http404('Задача не найдена.')
+        return JsonResponse(progress)
+
+    def confirm(self, request, title, total, form=None):
+        """Страница подтверждения массовой операции."""
+        context = {
+            **self.admin_site.each_context(request),
+            'title': title,
+            'opts': self.model._meta,
+            'form': form,
+            'total': total,
+            'action': request.POST['action'],
+            'select_across': request.POST.get('select_across', '0'),
+            'selected': request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        }
+        return TemplateResponse(
+            request, 'admin/posts/post/moderation_confirm.html', context
+        )
+
+    def get_selection(self, request):
+        """Выборка действия: строка запроса списка и отмеченные id.
+
+        При «выбрать все» id не передаются, и размер задачи не зависит
+        от числа строк.
+        """
+        select_across = request.POST.get('select_across') == '1'
+        return {
+            'user': request.user.pk,
+            'query': request.GET.urlencode(),
+            'selected': None if select_across else request.POST.getlist(
+                helpers.ACTION_CHECKBOX_NAME
+            ),
+        }
+
+    def get_selection_queryset(self, selection):
+        """Выборка действия, восстановленная по ``get_selection``."""
+        url = reverse('admin:posts_post_changelist')
+        request = RequestFactory().get(f'{url}?{selection["query"]}')
+        request.user = User.objects.get(pk=selection['user'])
+        queryset = self.get_changelist_instance(request).get_queryset(
+            request
+        )
+        if selection['selected'] is not None:
+            queryset = queryset.filter(pk__in=selection['selected'])
+        return queryset
+
+    def run(self, request, operation, title, queryset, total, *args):
+        job_id = start(
+            operation, title, queryset, self.get_selection(request), total,
+            *args
+        )
+        if job_id is None:
+            self.message_user(request, f'{title}: обработано {total}.')
+            return
+        url = reverse('admin:posts_post_moderation', args=(job_id,))
+        self.message_user(request, format_html(
+            '{}: {} строк обрабатываются в фоне, ход работы: '
+            '<a href="{}">{}</a>', title, total, url, url,
+        ))
+
+    def move_to_group(self, request, queryset):
+        form = MoveToGroupForm(
+            request.POST if 'apply' in request.POST else None
+        )
+        total = queryset.count()
+        if not form.is_valid():
+            return self.confirm(
+                request, 'Перенести посты в группу', total, form
+            )
+        group = form.cleaned_data['group']
+        self.run(
+            request, move_to_group, 'Перенос постов', queryset, total,
+            group.pk if group else None,
+        )
+    move_to_group.short_description = 'Перенести в группу'
+    move_to_group.allowed_permissions = ('change',)
+
+    def delete_with_media(self, request, queryset):
+        total = queryset.count()
+        if 'apply' not in request.POST:
+            return self.confirm(
+                request, 'Удалить посты с комментариями и картинками', total
+            )
+        self.run(request, delete_posts, 'Удаление постов', queryset, total)
+    delete_with_media.short_description = 'Удалить вместе с картинками'
+    delete_with_media.allowed_permissions = ('delete',)
+
+    def purge_authors(self, request, queryset):
+        authors = User.objects.filter(
+            pk__in=list(queryset.values_list('author', flat=True).distinct())
+        )
+        total = (Post.objects.filter(author__in=authors).count()
+                 + Comment.objects.filter(author__in=authors).count())
+        if 'apply' not in request.POST:
+            names = ', '.join(authors.values_list('username', flat=True))
+            return self.confirm(
+                request, f'Удалить все посты и комментарии авторов: {names}',
+                total,
+            )
+        self.run(
+            request, purge_authors, 'Удаление постов и комментариев авторов',
+            queryset, total,
+        )
+    purge_authors.short_description = (
+        'Удалить все посты и комментарии авторов'
+    )
+    purge_authors.allowed_permissions = ('delete',)
 
 
 class GroupAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'title', 'slug', 'description')
+    list_display = (
+        'pk', 'title', 'slug', 'description', 'posts_count', 'last_post_at'
+    )
     search_fields = ('title', 'slug')
     list_filter = ('slug',)
     empty_value_display = '-пусто-'
 
 
+class CommentAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'short_text', 'post', 'author', 'pub_date')
+    list_select_related = ('post', 'author')
+    search_fields = ('text',)
+    list_filter = ('pub_date',)
+    date_hierarchy = 'pub_date'
+    autocomplete_fields = ('post', 'author')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def short_text(self, comment):
+        return Truncator(comment.text).chars(50)
+    short_text.short_description = 'Текст'
+
+    def get_search_results(self, request, queryset, search_term):
+        if search_term:
+            found = search_text(queryset, 'text', search_term)
+            if found is not None:
+                return found, False
+        return super().get_search_results(request, queryset, search_term)
+
+
+class FollowAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'user', 'author')
+    list_select_related = ('user', 'author')
+    search_fields = ('user__username', 'author__username')
+    autocomplete_fields = ('user', 'author')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        # Имя ищется точно: так запрос идёт по уникальному индексу,
+        # а не перебором с LIKE/UPPER.
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        return queryset.filter(
+            Q(user__username=search_term) | Q(author__username=search_term)
+        ), False
+
+
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
+admin.site.register(Comment, CommentAdmin)
+admin.site.register(Follow, FollowAdmin)
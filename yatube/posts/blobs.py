@@ -0,0 +1,118 @@
+"""Счётчики ссылок постов на файлы картинок.
+
+При хранении по хешу (``core.storage.ContentAddressedStorage``) один файл
+может принадлежать нескольким постам. Файлы, на которые больше никто
+не ссылается, удаляет команда ``gc_media_blobs`` вместе с миниатюрами
+и размерами. Массовые ``QuerySet.update()`` счётчики не меняют, поэтому
+перед удалением сборщик ещё раз проверяет таблицу постов.
+
+Файлы, которые остались от постов до появления счётчиков, находит обход
+каталога в ``gc_orphan_media``.
+"""
+import datetime
+import itertools
+import os
+import posixpath
+import time
+
+from django.core.files.storage import default_storage
+from django.db.models import F
+from django.utils import timezone
+from sorl.thumbnail import delete as delete_thumbnails
+
+from core.static import scan
+from .images import variants_prefix
+from .models import MediaBlob, Post
+
+
+def acquire(name):
+    blob, created = MediaBlob.objects.get_or_create(
+        name=name, defaults={'refs': 1}
+    )
+    if not created:
+        MediaBlob.objects.filter(pk=blob.pk).update(refs=F('refs') + 1)
+
+
+def release(name):
+    MediaBlob.objects.filter(name=name, refs__gt=0).update(
+        refs=F('refs') - 1
+    )
+
+
+def is_referenced(name):
+    return Post.objects.filter(image=name).exists()
+
+
+def delete_blob(name):
+    """Удаляет файл, его миниатюры sorl и адаптивные размеры.
+
+    Каталог размеров назван полным именем файла, поэтому файлы
+    с тем же именем без расширения не затрагиваются.
+    """
+    delete_thumbnails(name)
+    directory = variants_prefix(name)
+    if default_storage.exists(directory):
+        for file_name in default_storage.listdir(directory)[1]:
+            default_storage.delete(directory + file_name)
+
+
+def collect(grace, dry_run=False):
+    """Удаляет файлы без ссылок старше ``grace`` секунд, отдаёт их имена."""
+    cutoff = timezone.now() - datetime.timedelta(seconds=grace)
+    blobs = MediaBlob.objects.filter(refs__lte=0, updated__lt=cutoff)
+    for blob in blobs.iterator():
+        refs = Post.objects.filter(image=blob.name).count()
+        if refs:
+            MediaBlob.objects.filter(pk=blob.pk).update(refs=refs)
+            continue
+        if (default_storage.exists(blob.name)
+                and default_storage.get_modified_time(blob.name) > cutoff):
+            continue
+        if not dry_run:
+            delete_blob(blob.name)
+            blob.delete()
+        yield blob.name
+
+
+def iter_chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_orphans(directory, grace, chunk_size):
+    """Обходит ``directory`` в MEDIA_ROOT и ищет файлы без постов.
+
+    Для каждой пачки из ``chunk_size`` файлов отдаёт пару
+    ``(число файлов, [(имя, размер), ...])``: ссылки проверяются одним
+    запросом на пачку, поэтому память не растёт с числом файлов.
+    """
+    root = default_storage.path(directory)
+    if not os.path.isdir(root):
+        return
+    cutoff = time.time() - grace
+    files = (
+        (posixpath.join(directory, relative), entry)
+        for relative, entry in scan(root)
+    )
+    for chunk in iter_chunks(files, chunk_size):
+        referenced = set(Post.objects.filter(
+            image__in=[name for name, _ in chunk]
+        ).order_by().values_list('image', flat=True))
+        orphans = []
+        for name, entry in chunk:
+            if name in referenced:
+                continue
+            stat = entry.stat()
+            if stat.st_mtime <= cutoff:
+                orphans.append((name, stat.st_size))
+        yield len(chunk), orphans
+
+
+def delete_orphans(names):
+    for name in names:
+        delete_blob(name)
+    MediaBlob.objects.filter(name__in=names).delete()
@@ -0,0 +1,63 @@
+"""Приём комментариев: проверка поста, лимит частоты и счётчик."""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from core.counters import BufferedCounter
+from core.ratelimit import TokenBucket
+from .models import Comment, Post
+
+POST_EXISTS_KEY = 'post_exists:{}'
+# Несуществующий id кешируется ненадолго: пост с ним может появиться.
+MISSING_POST_TIMEOUT = 60
+
+# Запись счётчика не меняет версию контента: иначе при потоке
+# комментариев кеш страниц сбрасывался бы каждые несколько секунд.
+# Страницы покажут новое число после ``PAGE_CACHE_TIMEOUT``.
+comments_counter = BufferedCounter(Post, 'comments_count')
+
+
+def post_exists(post_id):
+    key = POST_EXISTS_KEY.format(post_id)
+    exists = cache.get(key)
+    if exists is None:
+        exists = Post.objects.filter(pk=post_id).exists()
+        cache.set(
+            key, exists,
+            settings.POST_EXISTS_TIMEOUT if exists else MISSING_POST_TIMEOUT,
+        )
+    return exists
+
+
+def forget_post(post_id):
+    cache.delete(POST_EXISTS_KEY.format(post_id))
+
+
+def forget_posts(post_ids):
+    cache.delete_many([POST_EXISTS_KEY.format(pk) for pk in post_ids])
+
+
+def comment_wait_time(user):
+    """0, если пользователь может комментировать, иначе секунды ожидания."""
+    bucket = TokenBucket(
+        'comment',
+        rate=settings.COMMENT_RATE_PER_MINUTE / 60,
+        burst=settings.COMMENT_RATE_BURST,
+    )
+    return bucket.take(user.pk)
+
+
+def recount_comments(posts=None):
+    """Пересчитывает ``Post.comments_count`` по таблице комментариев.
+
+    Отложенные приращения теряются, если процесс убит (SIGKILL)
+    до записи; пересчёт возвращает точные значения.
+    """
+    if posts is None:
+        posts = Post.objects.all()
+    return posts.update(comments_count=Coalesce(Subquery(
+        Comment.objects.filter(post=OuterRef('pk')).order_by().values(
+            'post'
+        ).annotate(count=Count('pk')).values('count')[:1]
+    ), 0))
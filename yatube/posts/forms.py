@@ -1,14 +1,72 @@
 from django import forms
+from django.db import models
 
-from .models import Post, Comment
+from core.forms import widget_class
 
+from .groups import group_choices
+from .models import Post, Comment, Group
 
+
+class GroupChoices:
+    """Варианты выбора группы, читаемые из кеша при отрисовке."""
+
+    def __init__(self, field):
+        self.field = field
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        yield from group_choices()
+
+    def __len__(self):
+        return len(group_choices()) + (self.field.empty_label is not None)
+
+
+class CachedGroupQuerySet(models.QuerySet):
+    """Группы, которые ``get(pk=...)`` ищет в кешированном списке.
+
+    Возвращается группа с загруженными ``id`` и ``title``; остальные
+    поля отложены и читаются из БД при обращении.
+    """
+
+    def get(self, *args, **kwargs):
+        # Поле формы ищет по ``id``: так задаёт ``ForeignKey.formfield``.
+        if args or self.query.where or list(kwargs) not in (
+            ['pk'], [self.model._meta.pk.name]
+        ):
+            return super().get(*args, **kwargs)
+        pk = int(*kwargs.values())
+        titles = dict(group_choices())
+        if pk not in titles:
+            raise self.model.DoesNotExist(
+                f'{self.model._meta.object_name} matching query '
+                'does not exist.'
+            )
+        return self.model.from_db(self.db, ['id', 'title'], [pk, titles[pk]])
+
+
+def cache_group_choices(field):
+    """Поле выбора группы без запросов к таблице групп."""
+    field.iterator = GroupChoices
+    field.queryset = CachedGroupQuerySet(Group)
+
+
+@widget_class('form-control')
 class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         fields = ('text', 'group', 'image')
 
+    def _get_validation_exclusions(self):
+        # Группа уже проверена полем по кешу; проверка модели
+        # повторила бы её запросом к БД.
+        return super()._get_validation_exclusions() + ['group']
+
+
+cache_group_choices(PostForm.base_fields['group'])
+
 
+@widget_class('form-control')
 class CommentForm(forms.ModelForm):
     class Meta:
         model = Comment
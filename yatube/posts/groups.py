@@ -0,0 +1,117 @@
+"""Сводки по группам для каталога: число постов, последний пост, авторы.
+
+Значения хранятся в ``Group`` и ``GroupAuthor`` и меняются сигналами
+при создании, переносе и удалении поста, поэтому каталог не считает
+``COUNT``/``MAX`` по постам. При удалении группы её сводки удаляются
+вместе с ней, а посты просто остаются без группы (``SET_NULL``).
+Массовый ``update()`` постов сигналов не вызывает; после него сводки
+пересчитывает ``manage.py recount_group_stats``.
+
+Список групп для выбора в форме поста хранится в кеше и сбрасывается
+при сохранении и удалении группы.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import (Case, Count, DateTimeField, F, OuterRef, Q,
+                              Subquery, Value, When)
+from django.db.models.functions import Coalesce
+
+from .models import Group, GroupAuthor, Post
+
+ACTIVE_AUTHORS = 3
+GROUP_CHOICES_KEY = 'group_choices'
+
+
+def latest_pub_date():
+    return Subquery(
+        Post.objects.filter(group=OuterRef('pk')).order_by(
+            '-pub_date'
+        ).values('pub_date')[:1]
+    )
+
+
+def post_added(group_id, author_id, pub_date):
+    Group.objects.filter(pk=group_id).update(
+        posts_count=F('posts_count') + 1,
+        last_post_at=Case(
+            When(
+                Q(last_post_at__isnull=True) | Q(last_post_at__lt=pub_date),
+                then=Value(pub_date, output_field=DateTimeField()),
+            ),
+            default=F('last_post_at'),
+        ),
+    )
+    stats, _ = GroupAuthor.objects.get_or_create(
+        group_id=group_id, author_id=author_id
+    )
+    GroupAuthor.objects.filter(pk=stats.pk).update(
+        posts_count=F('posts_count') + 1
+    )
+
+
+def post_removed(group_id, author_id, pub_date):
+    """Учитывает пост, уже удалённый из группы или из таблицы."""
+    groups = Group.objects.filter(pk=group_id)
+    groups.update(posts_count=F('posts_count') - 1)
+    # Дата пересчитывается, только если ушёл последний пост группы.
+    groups.filter(last_post_at__lte=pub_date).update(
+        last_post_at=latest_pub_date()
+    )
+    stats = GroupAuthor.objects.filter(group_id=group_id, author_id=author_id)
+    stats.update(posts_count=F('posts_count') - 1)
+    stats.filter(posts_count__lte=0).delete()
+
+
+def recount(groups=None):
+    """Пересчитывает сводки групп целиком."""
+    if groups is None:
+        groups = Group.objects.all()
+    groups.update(
+        posts_count=Coalesce(Subquery(
+            Post.objects.filter(group=OuterRef('pk')).order_by().values(
+                'group'
+            ).annotate(count=Count('pk')).values('count')[:1]
+        ), 0),
+        last_post_at=latest_pub_date(),
+    )
+    GroupAuthor.objects.filter(group__in=groups).delete()
+    GroupAuthor.objects.bulk_create(
+        GroupAuthor(
+            group_id=row['group'], author_id=row['author'],
+            posts_count=row['count'],
+        )
+        for row in Post.objects.filter(group__in=groups).order_by().values(
+            'group', 'author'
+        ).annotate(count=Count('pk'))
+    )
+
+
+def attach_active_authors(groups):
+    """Самые активные авторы групп страницы одним запросом."""
+    top = GroupAuthor.objects.filter(group=OuterRef('group')).order_by(
+        '-posts_count', 'pk'
+    ).values('pk')[:ACTIVE_AUTHORS]
+    by_group = {}
+    for stats in GroupAuthor.objects.filter(
+        group__in=groups, pk__in=Subquery(top)
+    ).select_related('author').order_by('-posts_count', 'pk'):
+        by_group.setdefault(stats.group_id, []).append(stats)
+    for group in groups:
+        group.active_authors = by_group.get(group.pk, [])
+
+
+def group_choices():
+    """Пары ``(id, название)`` всех групп по названию."""
+    choices = cache.get(GROUP_CHOICES_KEY)
+    if choices is None:
+        choices = [
+            (pk, title) for pk, title in Group.objects.order_by(
+                'title', 'pk'
+            ).values_list('pk', 'title')
+        ]
+        cache.set(GROUP_CHOICES_KEY, choices, settings.GROUP_CHOICES_TIMEOUT)
+    return choices
+
+
+def forget_group_choices(**kwargs):
+    cache.delete(GROUP_CHOICES_KEY)
@@ -0,0 +1,71 @@
+"""Лента «горячего»: счёт постов и рейтинги по группам и общий.
+
+Счёт ``Post.hot_score`` (см. ``core.hot``) растёт от создания поста,
+комментариев, реакций и новых подписчиков автора. Слагаемые копятся
+в памяти и пишутся пачкой; после записи те же значения точечно
+обновляют ограниченные рейтинги ``TopK`` в кеше.
+"""
+from django.conf import settings
+
+from core.counters import BufferedLogSum
+from core.hot import event_score
+from core.topk import TopK
+from .models import Post
+
+HOT_KEY = 'topk:hot'
+GROUP_HOT_KEY = 'topk:hot:group:{}'
+# Счета только растут, поэтому полный пересчёт нужен лишь после
+# вытеснения из кеша или удаления поста.
+HOT_TIMEOUT = 60 * 60
+
+
+def load_hot(posts):
+    def loader(size):
+        return posts.order_by('-hot_score', '-pk').values_list(
+            'pk', 'hot_score'
+        )[:size]
+    return loader
+
+
+def get_ranking(group_id=None):
+    if group_id is None:
+        return TopK(
+            HOT_KEY, settings.HOT_RANKING_SIZE,
+            load_hot(Post.objects.all()), HOT_TIMEOUT,
+        )
+    return TopK(
+        GROUP_HOT_KEY.format(group_id), settings.HOT_RANKING_SIZE,
+        load_hot(Post.objects.filter(group_id=group_id)), HOT_TIMEOUT,
+    )
+
+
+def update_rankings(rows):
+    """Обновляет рейтинги по строкам ``(pk, group_id, hot_score)``."""
+    by_group = {}
+    for pk, group_id, score in rows:
+        if group_id is not None:
+            by_group.setdefault(group_id, {})[pk] = score
+    get_ranking().update({pk: score for pk, _, score in rows})
+    for group_id, scores in by_group.items():
+        get_ranking(group_id).update(scores)
+
+
+def scores_flushed(pks):
+    update_rankings(Post.objects.filter(pk__in=pks).values_list(
+        'pk', 'group_id', 'hot_score'
+    ))
+
+
+hot_scores = BufferedLogSum(Post, 'hot_score', on_flush=scores_flushed)
+
+
+def record_event(post_id, kind):
+    """Учитывает событие ``kind`` из ``HOT_WEIGHTS`` для поста."""
+    hot_scores.add(post_id, event_score(settings.HOT_WEIGHTS[kind]))
+
+
+def forget_post(post):
+    """Убирает удалённый пост из рейтингов."""
+    get_ranking().discard(post.pk)
+    if post.group_id is not None:
+        get_ranking(post.group_id).discard(post.pk)
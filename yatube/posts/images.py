@@ -0,0 +1,213 @@
+"""Адаптивные размеры картинок постов.
+
+Для каждой загруженной картинки один раз, в фоновом пуле, создаётся набор
+размеров и форматов из ``VARIANTS``. Их адреса сохраняются в
+``Post.image_variants``, и шаблоны выводят ``srcset`` без обращения
+к sorl-thumbnail на каждом запросе.
+"""
+import io
+import json
+import logging
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from PIL import Image, ImageOps
+
+from core.cache import bump_content_version
+
+logger = logging.getLogger(__name__)
+
+Variant = namedtuple('Variant', 'role width height widths')
+
+# Роли картинки: размер в вёрстке и ширины файлов для srcset.
+VARIANTS = (
+    Variant('card', 100, 100, (100, 200, 300)),
+    Variant('detail', 960, 339, (480, 960, 1440, 1920)),
+)
+# Форматы в порядке предпочтения; недоступные в Pillow пропускаются.
+FORMATS = (
+    ('AVIF', 'image/avif', '.avif'),
+    ('WEBP', 'image/webp', '.webp'),
+)
+SAVE_OPTIONS = {
+    'AVIF': {'quality': 60},
+    'WEBP': {'quality': 80, 'method': 6},
+    'JPEG': {'quality': 85, 'optimize': True, 'progressive': True},
+    'PNG': {'optimize': True},
+}
+VARIANTS_DIR = 'variants/'
+
+_executor = None
+
+
+def available_formats():
+    Image.init()
+    return [fmt for fmt in FORMATS if fmt[0] in Image.SAVE]
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.IMAGE_VARIANT_WORKERS,
+            thread_name_prefix='image-variants',
+        )
+    return _executor
+
+
+def drain():
+    """Ждёт, пока фоновый пул создаст все поставленные размеры."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+
+def get_widths(variant, source_width):
+    """Ширины без увеличения картинки; самая маленькая есть всегда."""
+    widths = [width for width in variant.widths if width <= source_width]
+    return widths or list(variant.widths[:1])
+
+
+def variants_prefix(image_name):
+    """Каталог размеров картинки по её полному имени.
+
+    ``posts/cat.jpg`` и ``posts/cat.png`` получают разные каталоги;
+    при хранении по хешу каталог общий у одинаковых файлов.
+    """
+    return f'{VARIANTS_DIR}{image_name}/'
+
+
+def save_image(image, name, fmt):
+    buffer = io.BytesIO()
+    image.save(buffer, fmt, **SAVE_OPTIONS.get(fmt, {}))
+    if default_storage.exists(name):
+        default_storage.delete(name)
+    return default_storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def build_variants(image_name):
+    """Создаёт файлы всех ролей и возвращает их описание для поста."""
+    with default_storage.open(image_name) as image_file:
+        source = Image.open(image_file)
+        source.load()
+    source = ImageOps.exif_transpose(source)
+    has_alpha = source.mode in ('RGBA', 'LA') or (
+        source.mode == 'P' and 'transparency' in source.info
+    )
+    source = source.convert('RGBA' if has_alpha else 'RGB')
+    fallback = ('PNG', 'image/png', '.png') if has_alpha else (
+        'JPEG', 'image/jpeg', '.jpg'
+    )
+    prefix = variants_prefix(image_name)
+    files = []
+    roles = {}
+    for variant in VARIANTS:
+        sources = []
+        src = None
+        for fmt, mime, ext in available_formats() + [fallback]:
+            srcset = []
+            for width in get_widths(variant, source.width):
+                height = round(width * variant.height / variant.width)
+                resized = ImageOps.fit(
+                    source, (width, height), Image.LANCZOS
+                )
+                name = save_image(
+                    resized, f'{prefix}{variant.role}-{width}{ext}', fmt
+                )
+                files.append(name)
+                url = default_storage.url(name)
+                srcset.append(f'{url} {width}w')
+                if src is None or width == variant.width:
+                    src = url
+            sources.append({'type': mime, 'srcset': ', '.join(srcset)})
+        roles[variant.role] = {
+            'src': src,
+            'width': variant.width,
+            'height': variant.height,
+            'sources': sources,
+        }
+    return {'source': image_name, 'files': files, 'roles': roles}
+
+
+def find_shared(post_id, image_name):
+    """Размеры той же картинки, уже созданные для другого поста."""
+    from .models import Post
+
+    shared = Post.objects.filter(image=image_name).exclude(
+        pk=post_id
+    ).exclude(image_variants='').values_list('image_variants', flat=True)
+    for value in shared:
+        data = json.loads(value)
+        if data.get('source') == image_name:
+            return data
+    return None
+
+
+def generate_variants(post_id, image_name):
+    """Создаёт размеры и записывает их в пост, если картинка не сменилась."""
+    from .models import Post
+
+    data = find_shared(post_id, image_name)
+    if data is None:
+        try:
+            data = build_variants(image_name)
+        except Exception:
+            logger.exception('Не удалось создать размеры для %s', image_name)
+            return
+        created = data['files']
+    else:
+        created = []
+    posts = Post.objects.filter(pk=post_id, image=image_name)
+    old = posts.values_list('image_variants', flat=True).first()
+    if old is None or not posts.update(image_variants=json.dumps(data)):
+        delete_files(created)
+        return
+    bump_content_version()
+    if old:
+        old = json.loads(old)
+        if not Post.objects.filter(image=old['source']).exists():
+            delete_files(set(old['files']) - set(data['files']))
+
+
+def generate_in_pool(post_id, image_name):
+    try:
+        generate_variants(post_id, image_name)
+    finally:
+        connection.close()
+
+
+def delete_files(names):
+    for name in names:
+        default_storage.delete(name)
+
+
+def delete_variants(post):
+    """Удаляет размеры удалённого поста, если картинка больше ничья."""
+    from .models import Post
+
+    data = post.variants_data
+    if data and not Post.objects.filter(image=data['source']).exists():
+        delete_files(data['files'])
+
+
+def schedule_variants(post):
+    """Ставит создание размеров в очередь задач или в фоновый пул
+    после коммита транзакции."""
+    post_id, image_name = post.pk, post.image.name
+    if settings.IMAGE_VARIANTS_QUEUE:
+        from .tasks import build_image_variants
+
+        build_image_variants.delay(post_id, image_name)
+    elif settings.IMAGE_VARIANTS_ASYNC:
+        transaction.on_commit(lambda: get_executor().submit(
+            generate_in_pool, post_id, image_name
+        ))
+    else:
+        transaction.on_commit(
+            lambda: generate_variants(post_id, image_name)
+        )
@@ -0,0 +1,91 @@
+import heapq
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from core.counters import log_add
+from core.hot import event_score
+from core.topk import TopK
+
+
+class Command(BaseCommand):
+    help = ('Замеряет в памяти стоимость обновления и чтения рейтингов '
+            '«горячего» по сравнению с сортировкой всех постов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1_000_000)
+        parser.add_argument('--groups', type=int, default=100)
+        parser.add_argument(
+            '--events', type=int, default=100_000,
+            help='Сколько событий активности обработать.',
+        )
+        parser.add_argument(
+            '--reads', type=int, default=10,
+            help='Сколько раз прочитать ленту каждым способом.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        size = settings.HOT_RANKING_SIZE
+        now = time.time()
+        period = 30 * 24 * 60 * 60
+        weights = list(settings.HOT_WEIGHTS.values())
+        scores = {}
+        groups = {}
+        for pk in range(1, options['posts'] + 1):
+            scores[pk] = event_score(1, now - rng.random() * period)
+            groups[pk] = rng.randrange(options['groups'])
+
+        def loader(group=None):
+            def load(size):
+                return heapq.nlargest(
+                    size,
+                    ((pk, score) for pk, score in scores.items()
+                     if group is None or groups[pk] == group),
+                    key=lambda item: (item[1], item[0]),
+                )
+            return load
+
+        rankings = {None: TopK('bench:hot', size, loader())}
+        for group in range(options['groups']):
+            rankings[group] = TopK(f'bench:hot:{group}', size, loader(group))
+        started = time.perf_counter()
+        for ranking in rankings.values():
+            ranking.rebuild()
+        self.report('Построение рейтингов', started, 1)
+
+        # Активность сосредоточена на немногих постах.
+        events = [
+            (
+                min(int(rng.paretovariate(1.2)), options['posts']),
+                rng.choice(weights),
+            )
+            for _ in range(options['events'])
+        ]
+        started = time.perf_counter()
+        for pk, weight in events:
+            scores[pk] = log_add(scores[pk], event_score(weight, now))
+            rankings[None].update({pk: scores[pk]})
+            rankings[groups[pk]].update({pk: scores[pk]})
+        self.report('Обновление на событие', started, len(events))
+
+        started = time.perf_counter()
+        for _ in range(options['reads']):
+            rankings[None].ids()
+        self.report('Чтение рейтинга', started, options['reads'])
+
+        started = time.perf_counter()
+        for _ in range(options['reads']):
+            naive = loader()(size)
+        self.report('Сортировка всех постов', started, options['reads'])
+        if [pk for pk, _ in naive] != rankings[None].ids():
+            self.stderr.write('Рейтинг разошёлся с полной сортировкой.')
+        cache.delete_many([ranking.key for ranking in rankings.values()])
+
+    def report(self, label, started, count):
+        elapsed = (time.perf_counter() - started) / count
+        self.stdout.write(f'{label}: {elapsed * 1e6:.1f} мкс')
@@ -0,0 +1,101 @@
+import io
+import shutil
+import tempfile
+import time
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+from PIL import Image
+
+from core import pipeline
+from ... import images
+from ...models import Group, User
+
+BENCH_USERNAME = 'bench-writer'
+BENCH_SLUG = 'bench-group'
+LOCAL_CACHES = {
+    alias: {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': f'bench-{alias}',
+    }
+    for alias in ('default', 'sessions')
+}
+
+
+def make_image():
+    buffer = io.BytesIO()
+    Image.new('RGB', (640, 480), (40, 120, 200)).save(buffer, 'JPEG')
+    return SimpleUploadedFile('bench.jpg', buffer.getvalue(), 'image/jpeg')
+
+
+class Command(BaseCommand):
+    help = ('Замеряет, сколько постов в секунду создаёт post_create со '
+            'всеми побочными эффектами: сводками группы, рейтингами, '
+            'сбросом кешей и размерами картинок. Побочные эффекты '
+            'выполняются сразу и в фоновом пуле. Замер идёт во временных '
+            'базе, каталоге медиа и кеше; рабочие данные не меняются.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts', type=int, default=100,
+            help='Сколько постов создать в каждом режиме.',
+        )
+        parser.add_argument(
+            '--image', action='store_true',
+            help='Загружать картинку с каждым постом.',
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        media_root = tempfile.mkdtemp()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            with override_settings(
+                MEDIA_ROOT=media_root, CACHES=LOCAL_CACHES
+            ):
+                self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            shutil.rmtree(media_root, ignore_errors=True)
+
+    def run(self, options):
+        user = User.objects.create(username=BENCH_USERNAME)
+        group = Group.objects.create(
+            title='Замер', slug=BENCH_SLUG, description='Замер'
+        )
+        client = Client()
+        client.force_login(user)
+        for asynchronous in (False, True):
+            with override_settings(
+                PIPELINE_ASYNC=asynchronous,
+                IMAGE_VARIANTS_ASYNC=asynchronous,
+            ):
+                created, drained = self.measure(
+                    client, group, options['posts'], options['image']
+                )
+            mode = 'в пуле' if asynchronous else 'сразу'
+            self.stdout.write(
+                f'Побочные эффекты {mode}: {created:.1f} постов/с, '
+                f'с ожиданием пулов {drained:.1f} постов/с'
+            )
+
+    def measure(self, client, group, count, image):
+        started = time.perf_counter()
+        for number in range(count):
+            data = {'text': f'Замер {number}', 'group': group.pk}
+            if image:
+                data['image'] = make_image()
+            response = client.post(reverse('posts:post_create'), data)
+            if response.status_code != 302:
+                self.stderr.write('Пост не создан.')
+        created = time.perf_counter() - started
+        pipeline.drain()
+        images.drain()
+        drained = time.perf_counter() - started
+        return count / created, count / drained
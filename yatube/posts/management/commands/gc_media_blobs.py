@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.blobs import collect
+
+
+class Command(BaseCommand):
+    help = ('Удаляет картинки постов, на которые больше не ссылается '
+            'ни один пост, вместе с миниатюрами и размерами.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, что будет удалено.',
+        )
+        parser.add_argument(
+            '--grace', type=int, default=settings.MEDIA_BLOB_GRACE,
+            help='Не трогать файлы, изменённые за последние N секунд.',
+        )
+
+    def handle(self, *args, **options):
+        deleted = 0
+        for name in collect(options['grace'], options['dry_run']):
+            deleted += 1
+            if options['verbosity'] > 1:
+                self.stdout.write(name)
+        action = 'Будет удалено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(f'{action} файлов: {deleted}')
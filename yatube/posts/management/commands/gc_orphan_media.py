@@ -0,0 +1,54 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.blobs import delete_orphans, iter_orphans
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = ('Обходит каталог картинок постов и удаляет файлы, на которые '
+            'не ссылается ни один пост, вместе с их миниатюрами.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, что будет удалено.',
+        )
+        parser.add_argument(
+            '--grace', type=int, default=settings.MEDIA_BLOB_GRACE,
+            help='Не трогать файлы, изменённые за последние N секунд.',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Сколько файлов проверять одним запросом.',
+        )
+
+    def handle(self, *args, **options):
+        directory = Post.image.field.upload_to.rstrip('/')
+        started = time.monotonic()
+        scanned = deleted = freed = 0
+        for count, orphans in iter_orphans(
+            directory, options['grace'], options['chunk_size']
+        ):
+            scanned += count
+            names = [name for name, _ in orphans]
+            if names and not options['dry_run']:
+                delete_orphans(names)
+            deleted += len(names)
+            freed += sum(size for _, size in orphans)
+            if options['verbosity'] > 1:
+                for name in names:
+                    self.stdout.write(name)
+                self.stdout.write(self.progress(scanned, started))
+        action = 'Будет удалено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(
+            f'{action} файлов: {deleted} ({freed / 2 ** 20:.1f} МиБ). '
+            + self.progress(scanned, started)
+        )
+
+    def progress(self, scanned, started):
+        elapsed = max(time.monotonic() - started, 1e-6)
+        return (f'Проверено файлов: {scanned} за {elapsed:.1f} с, '
+                f'{scanned / elapsed:.0f} файлов/с')
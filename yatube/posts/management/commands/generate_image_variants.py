@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from posts.images import generate_variants
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Создаёт адаптивные размеры для картинок постов, где их ещё нет.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересоздать размеры для всех картинок.',
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').only('image', 'image_variants')
+        created = 0
+        for post in posts.iterator():
+            if options['all'] or not post.variants:
+                generate_variants(post.pk, post.image.name)
+                created += 1
+        self.stdout.write(f'Обработано картинок: {created}')
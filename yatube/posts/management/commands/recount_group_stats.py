@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from posts.groups import recount
+from posts.models import Group
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает сводки групп для каталога: число постов, '
+            'дату последнего поста и активных авторов.')
+
+    def handle(self, *args, **options):
+        recount()
+        self.stdout.write(f'Пересчитано групп: {Group.objects.count()}')
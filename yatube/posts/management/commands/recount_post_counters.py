@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from core.cache import bump_content_version
+from posts.comments import recount_comments
+from posts.reactions import recount_reactions
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает счётчики постов по таблицам: число '
+            'комментариев и реакций. Нужна после аварийной остановки '
+            'процессов, когда отложенные приращения счётчиков не записаны.')
+
+    def handle(self, *args, **options):
+        updated = recount_comments()
+        recount_reactions()
+        bump_content_version()
+        self.stdout.write(f'Пересчитано постов: {updated}')
@@ -0,0 +1,52 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:22
+
+import math
+
+import core.hot
+from django.db import migrations, models
+
+# Формула и константы core.hot на момент миграции: их будущие
+# изменения не должны менять результат уже написанной миграции.
+# Сам core.hot нужен только как ссылка на default поля.
+EPOCH = 946684800
+HALF_LIFE = 12 * 60 * 60
+WEIGHTS = {'post': 1, 'comment': 2, 'reaction': 1}
+
+
+def event_score(weight, timestamp):
+    return math.log(weight) + math.log(2) / HALF_LIFE * (timestamp - EPOCH)
+
+
+def score_posts(apps, schema_editor):
+    # Прошлая активность считается случившейся в момент публикации.
+    Post = apps.get_model('posts', 'Post')
+    weights = WEIGHTS
+    posts = []
+    for post in Post.objects.only(
+        'pub_date', 'comments_count', 'reactions_count'
+    ).iterator():
+        weight = (weights['post']
+                  + weights['comment'] * post.comments_count
+                  + weights['reaction'] * post.reactions_count)
+        post.hot_score = event_score(weight, post.pub_date.timestamp())
+        posts.append(post)
+        if len(posts) >= 1000:
+            Post.objects.bulk_update(posts, ['hot_score'])
+            posts = []
+    Post.objects.bulk_update(posts, ['hot_score'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_reaction'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='hot_score',
+            field=models.FloatField(db_index=True, default=core.hot.initial_score, editable=False, verbose_name='Горячесть'),
+        ),
+        migrations.RunPython(score_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:26
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def count_group_stats(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    GroupAuthor = apps.get_model('posts', 'GroupAuthor')
+    Post = apps.get_model('posts', 'Post')
+    groups = {}
+    authors = []
+    for row in Post.objects.exclude(group=None).order_by().values(
+        'group', 'author'
+    ).annotate(count=models.Count('pk'), latest=models.Max('pub_date')):
+        count, latest = groups.get(row['group'], (0, None))
+        if latest is None or row['latest'] > latest:
+            latest = row['latest']
+        groups[row['group']] = (count + row['count'], latest)
+        authors.append(GroupAuthor(
+            group_id=row['group'], author_id=row['author'],
+            posts_count=row['count'],
+        ))
+    for group_id, (count, latest) in groups.items():
+        Group.objects.filter(pk=group_id).update(
+            posts_count=count, last_post_at=latest
+        )
+    GroupAuthor.objects.bulk_create(authors, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0019_post_hot_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='last_post_at',
+            field=models.DateTimeField(db_index=True, editable=False, null=True, verbose_name='Последний пост'),
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='posts_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Постов'),
+        ),
+        migrations.CreateModel(
+            name='GroupAuthor',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('posts_count', models.IntegerField(default=0, verbose_name='Постов')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='group_stats', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='author_stats', to='posts.Group', verbose_name='Группа')),
+            ],
+            options={
+                'verbose_name': 'Автор в группе',
+                'verbose_name_plural': 'Авторы в группах',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='groupauthor',
+            index=models.Index(fields=['group', '-posts_count'], name='group_author_active'),
+        ),
+        migrations.AddConstraint(
+            model_name='groupauthor',
+            constraint=models.UniqueConstraint(fields=('group', 'author'), name='unique group author'),
+        ),
+        migrations.RunPython(count_group_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:32
+
+from django.db import migrations, models
+
+from core.search import text_index_sql
+
+
+def create_text_index(apps, schema_editor):
+    # GIN-индекс для полнотекстового поиска есть только в PostgreSQL.
+    if schema_editor.connection.vendor == 'postgresql':
+        Comment = apps.get_model('posts', 'Comment')
+        schema_editor.execute(
+            text_index_sql(Comment, 'text', 'comment_text_search')
+        )
+
+
+def drop_text_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS comment_text_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0021_post_pub_date_id'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='comment',
+            options={'ordering': ['-pub_date'], 'verbose_name': 'Комментарий', 'verbose_name_plural': 'Комментарии'},
+        ),
+        migrations.AlterModelOptions(
+            name='follow',
+            options={'verbose_name': 'Подписка', 'verbose_name_plural': 'Подписки'},
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['-pub_date', '-id'], name='comment_pub_date_id'),
+        ),
+        migrations.RunPython(create_text_index, drop_text_index),
+    ]
@@ -1,5 +1,11 @@
+import json
+
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils.functional import cached_property
+
+from core.hot import initial_score
+from core.storage import ContentAddressedStorage
 
 
 User = get_user_model()
@@ -9,11 +15,51 @@ class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
     description = models.TextField()
+    posts_count = models.IntegerField(
+        'Постов',
+        default=0,
+        editable=False
+    )
+    last_post_at = models.DateTimeField(
+        'Последний пост',
+        null=True,
+        editable=False,
+        db_index=True
+    )
 
     def __str__(self):
         return self.title
 
 
+class GroupAuthor(models.Model):
+    """Сколько постов автор опубликовал в группе, см. posts.groups."""
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        related_name='author_stats',
+        verbose_name='Группа'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='group_stats',
+        verbose_name='Автор'
+    )
+    posts_count = models.IntegerField('Постов', default=0)
+
+    class Meta:
+        verbose_name = 'Автор в группе'
+        verbose_name_plural = 'Авторы в группах'
+        constraints = [
+            models.UniqueConstraint(fields=['group', 'author'],
+                                    name='unique group author')]
+        indexes = [
+            models.Index(
+                fields=['group', '-posts_count'], name='group_author_active'
+            ),
+        ]
+
+
 class Post(models.Model):
     text = models.TextField(verbose_name='Текст поста')
     pub_date = models.DateTimeField(auto_now_add=True, verbose_name='Дата')
@@ -34,17 +80,79 @@ class Post(models.Model):
     image = models.ImageField(
         'Картинка',
         upload_to='posts/',
+        storage=ContentAddressedStorage(),
         blank=True
     )
+    comments_count = models.IntegerField(
+        'Комментариев',
+        default=0,
+        editable=False
+    )
+    reactions_count = models.IntegerField(
+        'Реакций',
+        default=0,
+        editable=False,
+        db_index=True
+    )
+    hot_score = models.FloatField(
+        'Горячесть',
+        default=initial_score,
+        editable=False,
+        db_index=True
+    )
+    image_variants = models.TextField(
+        'Размеры картинки',
+        blank=True,
+        default='',
+        editable=False
+    )
 
     class Meta:
         ordering = ['-pub_date']
+        # Порядок ленты и списка в админке: -pub_date и -pk.
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'], name='post_pub_date_id'
+            ),
+        ]
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
 
     def __str__(self):
         return self.text[:15]
 
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.__dict__.pop('variants_data', None)
+
+    @cached_property
+    def variants_data(self):
+        if not self.image_variants:
+            return {}
+        return json.loads(self.image_variants)
+
+    @property
+    def variants(self):
+        """Готовые размеры текущей картинки по ролям, см. posts.images."""
+        data = self.variants_data
+        if not self.image or data.get('source') != self.image.name:
+            return {}
+        return data['roles']
+
+
+class MediaBlob(models.Model):
+    """Файл картинки и число постов, которые на него ссылаются."""
+    name = models.CharField('Файл', max_length=255, unique=True)
+    refs = models.IntegerField('Ссылок', default=0)
+    updated = models.DateTimeField('Изменён', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Файл картинки'
+        verbose_name_plural = 'Файлы картинок'
+
+    def __str__(self):
+        return self.name
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
@@ -69,6 +177,46 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['-pub_date']
+        verbose_name = 'Комментарий'
+        verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['post', '-pub_date'], name='comment_post_latest'
+            ),
+            models.Index(
+                fields=['-pub_date', '-id'], name='comment_pub_date_id'
+            ),
+        ]
+
+
+class Reaction(models.Model):
+    KIND_CHOICES = (
+        ('like', '👍'),
+        ('heart', '❤️'),
+        ('laugh', '😂'),
+        ('sad', '😢'),
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='reactions',
+        verbose_name='Пост'
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='reactions',
+        verbose_name='Пользователь'
+    )
+    kind = models.CharField('Реакция', max_length=16, choices=KIND_CHOICES)
+    created = models.DateTimeField('Дата', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Реакция'
+        verbose_name_plural = 'Реакции'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'post'],
+                                    name='unique reaction')]
 
 
 class Follow(models.Model):
@@ -86,6 +234,8 @@ class Follow(models.Model):
     )
 
     class Meta:
+        verbose_name = 'Подписка'
+        verbose_name_plural = 'Подписки'
         constraints = [
             models.UniqueConstraint(fields=['user', 'author'],
                                     name='unique following')]
@@ -0,0 +1,234 @@
+"""Массовая модерация постов из админки.
+
+Операции выполняются пачками по ``MODERATION_CHUNK_SIZE`` строк
+одним ``UPDATE``/``DELETE`` на пачку, без загрузки объектов и сигналов
+на каждый из них. Сводки групп, счётчики, рейтинги и версия контента
+обновляются один раз для всех затронутых строк. Выборки больше
+``MODERATION_BACKGROUND_THRESHOLD`` уходят задачей в очередь
+``core.tasks``: в задаче хранится не список id, а условие выборки
+(см. ``PostAdmin.get_selection``), и строки обходятся пачками уже
+в задаче. Ход работы хранится в кеше (см. ``get_progress``); задача,
+чей исполнитель перестал отвечать, показывается упавшей.
+"""
+import collections
+import logging
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from core.cache import bump_content_version
+from core.models import Job
+from core.tasks import stale_jobs
+from .blobs import delete_orphans
+from .comments import forget_posts
+from .groups import recount
+from .hot import get_ranking
+from .models import Comment, Group, MediaBlob, Post, Reaction
+from .reactions import most_liked
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_KEY = 'moderation:{}'
+PROGRESS_TIMEOUT = 24 * 60 * 60
+
+
+class Progress:
+    def __init__(self, title, total, job_id=None, task_id=None):
+        self.title = title
+        self.total = total
+        self.job_id = job_id
+        self.task_id = task_id
+        self.done = 0
+        self.state = 'running'
+        self.save()
+
+    def advance(self, count):
+        self.done += count
+        logger.info('%s: %s из %s', self.title, self.done, self.total)
+        self.save()
+
+    def finish(self, state='finished'):
+        self.state = state
+        self.save()
+
+    def save(self):
+        if self.job_id is not None:
+            cache.set(PROGRESS_KEY.format(self.job_id), {
+                'title': self.title,
+                'total': self.total,
+                'done': self.done,
+                'state': self.state,
+                'task': self.task_id,
+            }, PROGRESS_TIMEOUT)
+
+
+def get_progress(job_id):
+    """Ход фоновой операции с учётом состояния её задачи в очереди."""
+    progress = cache.get(PROGRESS_KEY.format(job_id))
+    if (progress is None or progress['state'] != 'running'
+            or progress['task'] is None):
+        return progress
+    job = Job.objects.filter(pk=progress['task']).first()
+    if job is None or job.status == Job.FAILED:
+        progress['state'] = 'failed'
+    elif job.status == Job.QUEUED:
+        progress['state'] = 'queued'
+    elif job.status == Job.DONE:
+        progress['state'] = 'finished'
+    elif stale_jobs().filter(pk=job.pk).exists():
+        progress['state'] = 'failed'
+    return progress
+
+
+def iter_pk_chunks(queryset):
+    """Id строк выборки пачками; удалённые строки не мешают обходу."""
+    pks = queryset.order_by('pk').values_list('pk', flat=True)
+    last = 0
+    while True:
+        chunk = list(pks.filter(pk__gt=last)[:settings.MODERATION_CHUNK_SIZE])
+        if not chunk:
+            return
+        yield chunk
+        last = chunk[-1]
+
+
+def raw_delete(model, field, values):
+    """``DELETE … WHERE field IN (…)`` без сбора объектов и сигналов."""
+    quote = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(values))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {quote(model._meta.db_table)} '
+            f'WHERE {quote(model._meta.get_field(field).column)} '
+            f'IN ({placeholders})',
+            list(values),
+        )
+
+
+def move_to_group(queryset, progress, group_id):
+    """Переносит посты в группу (``None`` — убирает из групп)."""
+    groups = {group_id} - {None}
+    for pks in iter_pk_chunks(queryset):
+        posts = Post.objects.filter(pk__in=pks)
+        groups.update(
+            posts.exclude(group=None).order_by().values_list(
+                'group', flat=True
+            ).distinct()
+        )
+        posts.update(group_id=group_id)
+        progress.advance(len(pks))
+    recount(Group.objects.filter(pk__in=groups))
+    for group in groups:
+        get_ranking(group).invalidate()
+    bump_content_version()
+
+
+def release_images(names):
+    """Снимает ссылки удалённых постов и удаляет ничьи файлы."""
+    by_count = collections.defaultdict(list)
+    for name, count in collections.Counter(names).items():
+        by_count[count].append(name)
+    for count, group in by_count.items():
+        MediaBlob.objects.filter(name__in=group).update(
+            refs=F('refs') - count
+        )
+    MediaBlob.objects.filter(refs__lt=0).update(refs=0)
+    referenced = set(Post.objects.filter(
+        image__in=list(set(names))
+    ).values_list('image', flat=True))
+    delete_orphans([name for name in set(names) if name not in referenced])
+
+
+def delete_posts(queryset, progress):
+    """Удаляет посты с комментариями, реакциями и картинками."""
+    groups = set()
+    for pks in iter_pk_chunks(queryset):
+        with transaction.atomic():
+            posts = Post.objects.filter(pk__in=pks)
+            rows = list(posts.values_list('group', 'image'))
+            # Без сбора объектов и сигналов на каждую строку; зависимые
+            # строки удаляются явно, до постов.
+            raw_delete(Comment, 'post', pks)
+            raw_delete(Reaction, 'post', pks)
+            raw_delete(Post, 'id', pks)
+        groups.update(group for group, _ in rows if group is not None)
+        release_images([image for _, image in rows if image])
+        forget_posts(pks)
+        progress.advance(len(pks))
+    recount(Group.objects.filter(pk__in=groups))
+    most_liked.invalidate()
+    for group in [None, *groups]:
+        get_ranking(group).invalidate()
+    bump_content_version()
+
+
+def purge_authors(queryset, progress):
+    """Удаляет все посты и комментарии авторов выбранных постов."""
+    author_ids = list(
+        queryset.order_by().values_list('author', flat=True).distinct()
+    )
+    delete_posts(Post.objects.filter(author__in=author_ids), progress)
+    comments = Comment.objects.filter(author__in=author_ids)
+    for pks in iter_pk_chunks(comments):
+        with transaction.atomic():
+            chunk = Comment.objects.filter(pk__in=pks)
+            post_ids = list(
+                chunk.order_by().values_list('post', flat=True).distinct()
+            )
+            raw_delete(Comment, 'id', pks)
+            Post.objects.filter(pk__in=post_ids).update(
+                comments_count=Coalesce(Subquery(
+                    Comment.objects.filter(post=OuterRef('pk')).order_by(
+                    ).values('post').annotate(
+                        count=Count('pk')
+                    ).values('count')[:1]
+                ), 0)
+            )
+        progress.advance(len(pks))
+    bump_content_version()
+
+
+# Операции, которые можно поставить в очередь.
+OPERATIONS = {
+    operation.__name__: operation
+    for operation in (move_to_group, delete_posts, purge_authors)
+}
+
+
+def run_job(name, queryset, job_id, title, total, args):
+    """Выполняет операцию ``name`` над выборкой в задаче очереди."""
+    saved = get_progress(job_id) or {}
+    progress = Progress(title, total, job_id, saved.get('task'))
+    try:
+        OPERATIONS[name](queryset, progress, *args)
+    except Exception:
+        progress.finish('failed')
+        raise
+    progress.finish()
+
+
+def start(operation, title, queryset, selection, total, *args):
+    """Выполняет операцию сразу или ставит её в очередь задач.
+
+    ``selection`` — условие выборки ``queryset``, которое задача
+    превратит обратно в выборку. Возвращает id фоновой операции
+    или ``None``, если всё уже сделано.
+    """
+    if total <= settings.MODERATION_BACKGROUND_THRESHOLD:
+        operation(queryset, Progress(title, total), *args)
+        return None
+    from .tasks import run_moderation
+
+    progress = Progress(title, total, uuid.uuid4().hex)
+    # Задача пишется в транзакции запроса и появится после коммита.
+    job = run_moderation.delay(
+        operation.__name__, selection, progress.job_id, title, total,
+        list(args),
+    )
+    progress.task_id = job.pk
+    progress.save()
+    return progress.job_id
@@ -0,0 +1,84 @@
+"""Реакции на посты: счётчик, рейтинг популярных и состояние пользователя."""
+from django.conf import settings
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from core.counters import BufferedCounter
+from core.ratelimit import TokenBucket
+from core.topk import TopK
+from .models import Post, Reaction
+
+REACTION_KINDS = dict(Reaction.KIND_CHOICES)
+MOST_LIKED_SIZE = 100
+# Рейтинг периодически пересчитывается целиком, чтобы изменения,
+# потерянные при одновременных обновлениях, не жили вечно.
+MOST_LIKED_TIMEOUT = 10 * 60
+
+
+def load_most_liked(size):
+    return Post.objects.filter(reactions_count__gt=0).order_by(
+        '-reactions_count', '-pk'
+    ).values_list('pk', 'reactions_count')[:size]
+
+
+most_liked = TopK(
+    'topk:most_liked', MOST_LIKED_SIZE, load_most_liked, MOST_LIKED_TIMEOUT
+)
+
+
+def reactions_flushed(pks):
+    most_liked.update(dict(
+        Post.objects.filter(pk__in=pks).values_list('pk', 'reactions_count')
+    ))
+
+
+reactions_counter = BufferedCounter(
+    Post, 'reactions_count', on_flush=reactions_flushed
+)
+
+
+def toggle_reaction(user, post_id, kind):
+    """Ставит реакцию; повторная такая же реакция снимается."""
+    reaction = Reaction.objects.filter(user=user, post_id=post_id).first()
+    if reaction is None:
+        Reaction.objects.get_or_create(
+            user=user, post_id=post_id, defaults={'kind': kind}
+        )
+    elif reaction.kind == kind:
+        reaction.delete()
+    else:
+        Reaction.objects.filter(pk=reaction.pk).update(kind=kind)
+
+
+def attach_reactions(user, posts):
+    """Реакции пользователя на посты страницы одним запросом."""
+    mine = {}
+    if user.is_authenticated and posts:
+        mine = dict(Reaction.objects.filter(
+            user=user, post__in=[post.pk for post in posts]
+        ).values_list('post_id', 'kind'))
+    for post in posts:
+        post.my_reaction = mine.get(post.pk)
+
+
+def reaction_wait_time(user):
+    """0, если пользователь может поставить реакцию, иначе секунды."""
+    bucket = TokenBucket(
+        'reaction',
+        rate=settings.REACTION_RATE_PER_MINUTE / 60,
+        burst=settings.REACTION_RATE_BURST,
+    )
+    return bucket.take(user.pk)
+
+
+def recount_reactions(posts=None):
+    """Пересчитывает ``Post.reactions_count`` и рейтинг популярных."""
+    if posts is None:
+        posts = Post.objects.all()
+    updated = posts.update(reactions_count=Coalesce(Subquery(
+        Reaction.objects.filter(post=OuterRef('pk')).order_by().values(
+            'post'
+        ).annotate(count=Count('pk')).values('count')[:1]
+    ), 0))
+    most_liked.invalidate()
+    return updated
@@ -0,0 +1,148 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+
+from core.cache import bump_content_version
+from core.pipeline import defer
+from .blobs import acquire, release
+from .comments import comments_counter, forget_post
+from .groups import forget_group_choices, post_added, post_removed
+from .images import delete_variants, schedule_variants
+from .hot import forget_post as forget_hot_post
+from .hot import record_event, update_rankings
+from .models import Comment, Follow, Group, Post, Reaction
+from .reactions import most_liked, reactions_counter
+
+
+def content_changed(sender, **kwargs):
+    defer(bump_content_version, key='content_version')
+
+
+for model in (Post, Comment, Group):
+    post_save.connect(content_changed, sender=model)
+    post_delete.connect(content_changed, sender=model)
+
+
+def remember_image(sender, instance, **kwargs):
+    # Отложенное поле не читаем, чтобы не делать лишний запрос.
+    value = instance.__dict__.get('image')
+    instance._saved_image = getattr(value, 'name', value)
+
+
+def image_saved(sender, instance, created, **kwargs):
+    if 'image' not in instance.__dict__:
+        return
+    name = instance.image.name or None
+    saved = None if created else instance._saved_image or None
+    if name != saved:
+        if name:
+            acquire(name)
+        if saved:
+            release(saved)
+        instance._saved_image = name
+        # Только при смене картинки: повторные сохранения, пока размеры
+        # создаются, не ставят задачу заново.
+        if name and not instance.variants:
+            schedule_variants(instance)
+
+
+def image_deleted(sender, instance, **kwargs):
+    if instance._saved_image:
+        release(instance._saved_image)
+    delete_variants(instance)
+
+
+post_init.connect(remember_image, sender=Post)
+post_save.connect(image_saved, sender=Post)
+post_delete.connect(image_deleted, sender=Post)
+
+
+def remember_group(sender, instance, **kwargs):
+    instance._saved_group_id = instance.__dict__.get('group_id')
+
+
+def group_saved(sender, instance, created, **kwargs):
+    if 'group_id' not in instance.__dict__:
+        return
+    saved = None if created else instance._saved_group_id
+    if instance.group_id != saved:
+        if saved is not None:
+            post_removed(saved, instance.author_id, instance.pub_date)
+        if instance.group_id is not None:
+            post_added(
+                instance.group_id, instance.author_id, instance.pub_date
+            )
+        instance._saved_group_id = instance.group_id
+
+
+def group_deleted(sender, instance, **kwargs):
+    if instance._saved_group_id is not None:
+        post_removed(
+            instance._saved_group_id, instance.author_id, instance.pub_date
+        )
+
+
+post_save.connect(forget_group_choices, sender=Group)
+post_delete.connect(forget_group_choices, sender=Group)
+post_init.connect(remember_group, sender=Post)
+post_save.connect(group_saved, sender=Post)
+post_delete.connect(group_deleted, sender=Post)
+
+
+def post_saved(sender, instance, created, **kwargs):
+    if created:
+        defer(forget_post, instance.pk, key=('post_exists', instance.pk))
+    if 'hot_score' in instance.__dict__:
+        defer(
+            update_rankings,
+            [(instance.pk, instance.group_id, instance.hot_score)],
+            key=('hot', instance.pk),
+        )
+
+
+def post_deleted(sender, instance, **kwargs):
+    forget_post(instance.pk)
+    most_liked.discard(instance.pk)
+    forget_hot_post(instance)
+
+
+def comment_saved(sender, instance, created, **kwargs):
+    if created:
+        post_id = instance.post_id
+        transaction.on_commit(lambda: comments_counter.add(post_id))
+        transaction.on_commit(lambda: record_event(post_id, 'comment'))
+
+
+def comment_deleted(sender, instance, **kwargs):
+    post_id = instance.post_id
+    transaction.on_commit(lambda: comments_counter.add(post_id, -1))
+
+
+def reaction_saved(sender, instance, created, **kwargs):
+    if created:
+        post_id = instance.post_id
+        transaction.on_commit(lambda: reactions_counter.add(post_id))
+        transaction.on_commit(lambda: record_event(post_id, 'reaction'))
+
+
+def follow_saved(sender, instance, created, **kwargs):
+    # Новый подписчик поднимает последний пост автора.
+    if created:
+        post_id = Post.objects.filter(
+            author_id=instance.author_id
+        ).values_list('pk', flat=True).first()
+        if post_id is not None:
+            transaction.on_commit(lambda: record_event(post_id, 'follow'))
+
+
+def reaction_deleted(sender, instance, **kwargs):
+    post_id = instance.post_id
+    transaction.on_commit(lambda: reactions_counter.add(post_id, -1))
+
+
+post_save.connect(post_saved, sender=Post)
+post_delete.connect(post_deleted, sender=Post)
+post_save.connect(comment_saved, sender=Comment)
+post_delete.connect(comment_deleted, sender=Comment)
+post_save.connect(reaction_saved, sender=Reaction)
+post_delete.connect(reaction_deleted, sender=Reaction)
+post_save.connect(follow_saved, sender=Follow)
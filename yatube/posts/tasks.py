@@ -0,0 +1,20 @@
+"""Фоновые задачи постов (core.tasks)."""
+from django.contrib import admin
+
+from core.tasks import task
+from .admin import PostAdmin
+from .images import generate_variants
+from .models import Post
+from .moderation import run_job
+
+
+@task
+def build_image_variants(post_id, image_name):
+    generate_variants(post_id, image_name)
+
+
+@task(retries=0)
+def run_moderation(name, selection, job_id, title, total, args):
+    """Массовая операция из админки (posts.moderation)."""
+    queryset = PostAdmin(Post, admin.site).get_selection_queryset(selection)
+    run_job(name, queryset, job_id, title, total, args)
@@ -0,0 +1,10 @@
+from django import template
+
+from posts.models import Reaction
+
+register = template.Library()
+
+
+@register.simple_tag
+def reaction_kinds():
+    return Reaction.KIND_CHOICES
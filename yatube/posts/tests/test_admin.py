@@ -0,0 +1,350 @@
+import datetime
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.contrib.admin import helpers
+from django.contrib.postgres.search import SearchQuery
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core import tasks
+from core.models import Job
+from core.search import SEARCH_CONFIG, TSVector, text_index_sql
+from ..admin import PostAdmin
+from ..models import (Comment, Follow, Group, MediaBlob, Post, Reaction,
+                      User)
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+def upload(name='meme.gif', content=SMALL_GIF):
+    return SimpleUploadedFile(name, content, content_type='image/gif')
+
+
+class PostAdminTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        cls.groups = [
+            Group.objects.create(
+                title=f'Группа {number}', slug=f'group{number}',
+                description='Описание',
+            )
+            for number in range(3)
+        ]
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def create_posts(self, count):
+        start = Post.objects.count()
+        for number in range(start, start + count):
+            author = User.objects.create(username=f'author{number}')
+            Post.objects.create(
+                author=author, text='Пост', group=self.groups[number % 3]
+            )
+
+    def changelist(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse('admin:posts_post_changelist')
+            )
+        self.assertEqual(response.status_code, 200)
+        return response, [query['sql'] for query in queries]
+
+    def test_queries_do_not_grow_with_rows(self):
+        self.create_posts(2)
+        _, few = self.changelist()
+        self.create_posts(10)
+        _, many = self.changelist()
+        self.assertEqual(len(few), len(many))
+
+    def test_no_full_count(self):
+        self.create_posts(2)
+        _, queries = self.changelist()
+        counts = [sql for sql in queries if 'COUNT(' in sql]
+        self.assertEqual(len(counts), 1)
+
+    @skipUnless(connection.vendor == 'sqlite', 'Статистика SQLite')
+    @override_settings(ESTIMATED_COUNT_THRESHOLD=1)
+    def test_page_past_estimate(self):
+        """Страница, которая есть только по оценке, открывается."""
+        self.create_posts(5)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        Post.objects.filter(pk__in=Post.objects.values('pk')[:4]).delete()
+        with mock.patch.object(PostAdmin, 'list_per_page', 2):
+            response = self.client.get(
+                reverse('admin:posts_post_changelist') + '?p=2'
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['cl'].paginator.num_pages, 1)
+
+    def test_group_choices_not_rendered(self):
+        Post.objects.create(author=self.admin, text='Пост',
+                            group=self.groups[0])
+        response, _ = self.changelist()
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertContains(
+            response,
+            f'<option value="{self.groups[0].pk}" selected>'
+            f'{self.groups[0].title}</option>',
+            html=True,
+        )
+        self.assertNotContains(response, self.groups[1].title)
+
+    def test_group_edited_in_list(self):
+        post = Post.objects.create(author=self.admin, text='Пост',
+                                   group=self.groups[0])
+        response = self.client.post(reverse('admin:posts_post_changelist'), {
+            'form-TOTAL_FORMS': 1,
+            'form-INITIAL_FORMS': 1,
+            'form-0-id': post.pk,
+            'form-0-group': self.groups[2].pk,
+            '_save': 'Сохранить',
+        })
+        self.assertEqual(response.status_code, 302)
+        post.refresh_from_db()
+        self.assertEqual(post.group, self.groups[2])
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, MEDIA_CONTENT_ADDRESSED=True,
+                   MODERATION_CHUNK_SIZE=2)
+class ModerationActionTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        cls.spammer = User.objects.create(username='spammer')
+        cls.reader = User.objects.create(username='reader')
+        cls.groups = [
+            Group.objects.create(
+                title=f'Группа {number}', slug=f'group{number}',
+                description='Описание',
+            )
+            for number in range(2)
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+        self.posts = [
+            Post.objects.create(
+                author=self.spammer, text=f'Спам {number}',
+                group=self.groups[0],
+            )
+            for number in range(5)
+        ]
+        self.kept = Post.objects.create(
+            author=self.reader, text='Нормальный пост', group=self.groups[0]
+        )
+
+    def act(self, action, posts, **data):
+        return self.client.post(reverse('admin:posts_post_changelist'), {
+            'action': action,
+            helpers.ACTION_CHECKBOX_NAME: [post.pk for post in posts],
+            **data,
+        })
+
+    def test_confirmation_required(self):
+        response = self.act('delete_with_media', self.posts)
+        self.assertContains(response, 'Будет обработано строк: 5')
+        self.assertEqual(Post.objects.count(), 6)
+
+    def test_move_to_group(self):
+        self.act('move_to_group', self.posts[:3],
+                 apply=1, group=self.groups[1].pk)
+        self.assertEqual(
+            Post.objects.filter(group=self.groups[1]).count(), 3
+        )
+        group = Group.objects.get(pk=self.groups[1].pk)
+        self.assertEqual(group.posts_count, 3)
+        self.assertEqual(
+            Group.objects.get(pk=self.groups[0].pk).posts_count, 3
+        )
+        self.act('move_to_group', [self.kept], apply=1, group='')
+        self.assertIsNone(Post.objects.get(pk=self.kept.pk).group)
+
+    def test_delete_with_media(self):
+        shared = Post.objects.create(
+            author=self.reader, text='С той же картинкой', image=upload()
+        )
+        doomed = self.posts[0]
+        doomed.image = upload()
+        doomed.save()
+        own = self.posts[1]
+        own.image = upload('own.gif', SMALL_GIF + b'\x00')
+        own.save()
+        Comment.objects.create(post=doomed, author=self.reader, text='Ок')
+        Reaction.objects.create(post=own, user=self.reader, kind='like')
+        path, own_path = shared.image.path, own.image.path
+        self.act('delete_with_media', self.posts, apply=1)
+        self.assertEqual(list(Post.objects.all()), [shared, self.kept])
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(Reaction.objects.exists())
+        self.assertTrue(os.path.exists(path))
+        self.assertFalse(os.path.exists(own_path))
+        self.assertEqual(MediaBlob.objects.get(name=shared.image.name).refs,
+                         1)
+        self.assertEqual(
+            Group.objects.get(pk=self.groups[0].pk).posts_count, 1
+        )
+
+    def test_purge_authors(self):
+        Comment.objects.create(
+            post=self.kept, author=self.spammer, text='Спам'
+        )
+        Comment.objects.create(
+            post=self.kept, author=self.reader, text='Ответ'
+        )
+        Post.objects.filter(pk=self.kept.pk).update(comments_count=2)
+        self.act('purge_authors', self.posts[:1], apply=1)
+        self.assertEqual(list(Post.objects.all()), [self.kept])
+        self.assertEqual(
+            Comment.objects.get().author, self.reader
+        )
+        self.assertEqual(Post.objects.get().comments_count, 1)
+
+    def start_large_delete(self):
+        response = self.act('delete_with_media', self.posts, apply=1)
+        message = str(list(get_messages(response.wsgi_request))[0])
+        job_id = re.search(r'moderation/(\w+)/', message).group(1)
+        return reverse('admin:posts_post_moderation', args=(job_id,))
+
+    @override_settings(MODERATION_BACKGROUND_THRESHOLD=2)
+    def test_large_selection_in_background(self):
+        url = self.start_large_delete()
+        self.assertEqual(self.client.get(url).json()['state'], 'queued')
+        self.assertEqual(Post.objects.count(), 6)
+        tasks.work('test', threading.Event(), once=True)
+        progress = self.client.get(url).json()
+        del progress['task']
+        self.assertEqual(
+            progress,
+            {'title': 'Удаление постов', 'total': 5, 'done': 5,
+             'state': 'finished'},
+        )
+        self.assertEqual(list(Post.objects.all()), [self.kept])
+
+    @override_settings(MODERATION_BACKGROUND_THRESHOLD=2)
+    def test_select_across_stores_filter(self):
+        """При «выбрать все» задача хранит фильтр списка, а не id."""
+        url = reverse('admin:posts_post_changelist') + '?q=Спам'
+        self.client.post(url, {
+            'action': 'delete_with_media', 'select_across': '1',
+            helpers.ACTION_CHECKBOX_NAME: [self.posts[0].pk], 'apply': 1,
+        })
+        job = Job.objects.get(name='posts.tasks.run_moderation')
+        selection = json.loads(job.payload)['args'][1]
+        self.assertEqual(selection['selected'], None)
+        self.assertEqual(selection['query'], 'q=%D0%A1%D0%BF%D0%B0%D0%BC')
+        tasks.work('test', threading.Event(), once=True)
+        self.assertEqual(list(Post.objects.all()), [self.kept])
+
+    @override_settings(MODERATION_BACKGROUND_THRESHOLD=2,
+                       TASKS_LOCK_TIMEOUT=60)
+    def test_stalled_job_reported_failed(self):
+        """Задача упавшего исполнителя не висит в статусе «running»."""
+        url = self.start_large_delete()
+        job = tasks.claim('gone')
+        self.assertEqual(self.client.get(url).json()['state'], 'running')
+        long_ago = timezone.now() - datetime.timedelta(minutes=5)
+        Job.objects.filter(pk=job.pk).update(heartbeat_at=long_ago)
+        self.assertEqual(self.client.get(url).json()['state'], 'failed')
+
+
+class CommentFollowAdminTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        cls.post = Post.objects.create(author=cls.admin, text='Пост')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def add_rows(self, count):
+        start = User.objects.count()
+        for number in range(start, start + count):
+            user = User.objects.create(username=f'user{number}')
+            post = Post.objects.create(author=user, text='Пост')
+            Comment.objects.create(post=post, author=user, text='Привет')
+            Follow.objects.create(user=user, author=self.admin)
+
+    def test_changelist_queries_pinned(self):
+        # Сессия, пользователь, оценка и COUNT, строки; для комментариев
+        # ещё две выборки дат для date_hierarchy.
+        for name, queries in (('comment', 7), ('follow', 5)):
+            url = reverse(f'admin:posts_{name}_changelist')
+            with self.subTest(name=name):
+                self.add_rows(2)
+                with self.assertNumQueries(queries):
+                    self.client.get(url)
+                self.add_rows(10)
+                with self.assertNumQueries(queries):
+                    self.client.get(url)
+
+    def test_comment_search(self):
+        Comment.objects.create(
+            post=self.post, author=self.admin, text='Про котиков'
+        )
+        Comment.objects.create(post=self.post, author=self.admin, text='Нет')
+        response = self.client.get(
+            reverse('admin:posts_comment_changelist'), {'q': 'котиков'}
+        )
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+    def test_full_text_condition_matches_index(self):
+        sql = str(Comment.objects.annotate(
+            search_document=TSVector('text')
+        ).filter(
+            search_document=SearchQuery('кот', config=SEARCH_CONFIG)
+        ).query)
+        self.assertIn(
+            f"to_tsvector('{SEARCH_CONFIG}'::regconfig, "
+            '"posts_comment"."text") @@',
+            sql,
+        )
+        self.assertIn(
+            f"to_tsvector('{SEARCH_CONFIG}'::regconfig, text)",
+            text_index_sql(Comment, 'text', 'comment_text_search'),
+        )
+
+    def test_follow_search_exact(self):
+        self.add_rows(2)
+        response = self.client.get(
+            reverse('admin:posts_follow_changelist'), {'q': 'user1'}
+        )
+        result = response.context['cl'].result_list
+        self.assertEqual([follow.user.username for follow in result],
+                         ['user1'])
@@ -0,0 +1,174 @@
+import io
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from ..blobs import collect, iter_orphans
+from ..images import generate_variants
+from ..models import MediaBlob, Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+def upload(name='meme.gif', content=SMALL_GIF):
+    return SimpleUploadedFile(name, content, content_type='image/gif')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, MEDIA_CONTENT_ADDRESSED=True)
+class ContentAddressedMediaTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='reposter')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def create(self, image):
+        return Post.objects.create(author=self.user, text='Мем', image=image)
+
+    def refs(self, name):
+        return MediaBlob.objects.get(name=name).refs
+
+    def test_same_content_stored_once(self):
+        first = self.create(upload('one.gif'))
+        second = self.create(upload('two.GIF'))
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertRegex(
+            first.image.name, r'^posts/[0-9a-f]{2}/[0-9a-f]{64}\.gif$'
+        )
+        self.assertEqual(self.refs(first.image.name), 2)
+        directory = os.path.dirname(first.image.path)
+        self.assertEqual(len(os.listdir(directory)), 1)
+
+    def test_replace_and_delete_release(self):
+        post = self.create(upload())
+        old_name = post.image.name
+        post.image = upload('other.gif', SMALL_GIF + b'\x00')
+        post.save()
+        self.assertEqual(self.refs(old_name), 0)
+        self.assertEqual(self.refs(post.image.name), 1)
+        new_name = post.image.name
+        post.delete()
+        self.assertEqual(self.refs(new_name), 0)
+
+    def test_user_cascade_releases(self):
+        user = User.objects.create(username='leaving')
+        post = Post.objects.create(author=user, text='Мем', image=upload())
+        user.delete()
+        self.assertEqual(self.refs(post.image.name), 0)
+
+    def test_collect_removes_orphans(self):
+        post = self.create(upload())
+        name, path = post.image.name, post.image.path
+        post.delete()
+        self.assertEqual(list(collect(0, dry_run=True)), [name])
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(list(collect(3600)), [])
+        self.assertEqual(list(collect(0)), [name])
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(MediaBlob.objects.filter(name=name).exists())
+
+    def test_collect_keeps_referenced(self):
+        """Счётчик, сбитый массовым update(), исправляется, файл остаётся."""
+        post = self.create(upload())
+        MediaBlob.objects.filter(name=post.image.name).update(refs=0)
+        self.assertEqual(list(collect(0)), [])
+        self.assertEqual(self.refs(post.image.name), 1)
+        self.assertTrue(os.path.exists(post.image.path))
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class OrphanMediaTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='editor')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.kept = Post.objects.create(
+            author=self.user, text='Остаётся', image=upload('kept.gif')
+        )
+        self.replaced = Post.objects.create(
+            author=self.user, text='Заменят', image=upload('old.gif')
+        )
+        self.old_path = self.replaced.image.path
+        self.replaced.image = upload('new.gif')
+        self.replaced.save()
+
+    def tearDown(self):
+        shutil.rmtree(
+            os.path.join(TEMP_MEDIA_ROOT, 'posts'), ignore_errors=True
+        )
+
+    def gc(self, *args):
+        out = io.StringIO()
+        call_command('gc_orphan_media', '--grace=0', *args, stdout=out)
+        return out.getvalue()
+
+    def test_chunks_find_only_orphans(self):
+        chunks = list(iter_orphans('posts', 0, 1))
+        self.assertEqual(len(chunks), 3)
+        orphans = [name for _, names in chunks for name, _ in names]
+        self.assertEqual(
+            [os.path.join(TEMP_MEDIA_ROOT, name) for name in orphans],
+            [self.old_path],
+        )
+
+    def test_dry_run_keeps_files(self):
+        output = self.gc('--dry-run')
+        self.assertIn('Будет удалено файлов: 1', output)
+        self.assertTrue(os.path.exists(self.old_path))
+
+    def test_orphans_deleted(self):
+        output = self.gc('--chunk-size=2')
+        self.assertIn('Удалено файлов: 1', output)
+        self.assertIn('Проверено файлов: 3', output)
+        self.assertFalse(os.path.exists(self.old_path))
+        self.assertTrue(os.path.exists(self.kept.image.path))
+        self.assertTrue(os.path.exists(self.replaced.image.path))
+
+    def test_recent_files_kept(self):
+        output = self.gc('--grace=3600')
+        self.assertIn('Удалено файлов: 0', output)
+        self.assertTrue(os.path.exists(self.old_path))
+
+    def test_same_stem_variants_kept(self):
+        """Сборка kept.png не удаляет размеры живой kept.gif."""
+        orphan = Post.objects.create(
+            author=self.user, text='Осиротеет', image=upload('kept.png')
+        )
+        generate_variants(self.kept.pk, self.kept.image.name)
+        generate_variants(orphan.pk, orphan.image.name)
+        kept_files = Post.objects.get(pk=self.kept.pk).variants_data['files']
+        orphan_files = Post.objects.get(pk=orphan.pk).variants_data['files']
+        Post.objects.filter(pk=orphan.pk).update(image='')
+        self.gc()
+        for name in kept_files:
+            self.assertTrue(
+                os.path.exists(os.path.join(TEMP_MEDIA_ROOT, name))
+            )
+        for name in orphan_files:
+            self.assertFalse(
+                os.path.exists(os.path.join(TEMP_MEDIA_ROOT, name))
+            )
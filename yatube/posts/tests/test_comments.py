@@ -0,0 +1,95 @@
+import io
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TransactionTestCase
+from django.test import override_settings
+from django.urls import reverse
+
+from core.counters import flush_all
+from ..comments import comments_counter, post_exists
+from ..models import Comment, Post, User
+
+
+class PostExistsTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='reader')
+
+    def test_result_cached(self):
+        post = Post.objects.create(author=self.user, text='Пост')
+        self.assertTrue(post_exists(post.pk))
+        with self.assertNumQueries(0):
+            self.assertTrue(post_exists(post.pk))
+
+    def test_missing_forgotten_on_create(self):
+        missing_id = 1000
+        self.assertFalse(post_exists(missing_id))
+        Post.objects.create(id=missing_id, author=self.user, text='Пост')
+        self.assertTrue(post_exists(missing_id))
+
+    def test_deleted_forgotten(self):
+        post = Post.objects.create(author=self.user, text='Пост')
+        self.assertTrue(post_exists(post.pk))
+        post.delete()
+        self.assertFalse(post_exists(post.pk))
+
+
+@override_settings(COMMENT_RATE_BURST=2, COMMENT_RATE_PER_MINUTE=1)
+class AddCommentTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='commenter')
+        self.post = Post.objects.create(author=self.user, text='Пост')
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.url = reverse('posts:add_comment', args=(self.post.pk,))
+
+    def tearDown(self):
+        flush_all()
+
+    def comment(self, url=None):
+        return self.client.post(url or self.url, {'text': 'Комментарий'})
+
+    def count(self):
+        return Post.objects.get(pk=self.post.pk).comments_count
+
+    def test_counter_updated(self):
+        self.comment()
+        self.assertEqual(self.count(), 1)
+        Comment.objects.get().delete()
+        self.assertEqual(self.count(), 0)
+
+    def test_rate_limited(self):
+        self.comment()
+        self.comment()
+        response = self.comment()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '60')
+        self.assertEqual(Comment.objects.count(), 2)
+
+    def test_missing_post(self):
+        url = reverse('posts:add_comment', args=(self.post.pk + 1,))
+        self.assertEqual(self.comment(url).status_code, 404)
+
+    @override_settings(COUNTER_FLUSH_INTERVAL=60)
+    def test_increments_coalesced(self):
+        other = Post.objects.create(author=self.user, text='Другой')
+        Comment.objects.create(post=self.post, author=self.user, text='1')
+        Comment.objects.create(post=self.post, author=self.user, text='2')
+        Comment.objects.create(post=other, author=self.user, text='3')
+        self.assertEqual(self.count(), 0)
+        self.assertEqual(comments_counter.pending(self.post.pk), 2)
+        with self.assertNumQueries(2):
+            comments_counter.flush()
+        self.assertEqual(self.count(), 2)
+        self.assertEqual(Post.objects.get(pk=other.pk).comments_count, 1)
+
+    def test_recount_command(self):
+        """Потерянные приращения восстанавливает пересчёт."""
+        Comment.objects.create(post=self.post, author=self.user, text='1')
+        Post.objects.update(comments_count=5)
+        out = io.StringIO()
+        call_command('recount_post_counters', stdout=out)
+        self.assertEqual(self.count(), 1)
+        self.assertIn('Пересчитано постов: 1', out.getvalue())
@@ -1,11 +1,17 @@
 import shutil
 import tempfile
+from django.contrib.auth.forms import UserCreationForm
+from django.core.cache import cache
+from django.db import connection
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from django.conf import settings
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test.utils import CaptureQueriesContext
 
+from posts.forms import PostForm
 from posts.models import Group, Post, User, Comment
+from users.forms import CreationForm
 
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 
@@ -205,3 +211,90 @@ class CommentFormTests(TestCase):
             response, reverse("users:login") + "?next=" + url
         )
         self.assertEqual(Comment.objects.count(), comments_count)
+
+
+class WidgetClassTests(TestCase):
+    def test_pages_render_form_control(self):
+        """Класс виджетов задан на формах, а не фильтром в шаблоне."""
+        user = User.objects.create_user(username='styled')
+        client = Client()
+        client.force_login(user)
+        pages = {
+            reverse('posts:post_create'): ('id_text', 'id_group'),
+            reverse('users:login'): ('id_username', 'id_password'),
+        }
+        for url, ids in pages.items():
+            response = client.get(url)
+            for field_id in ids:
+                with self.subTest(url=url, field=field_id):
+                    self.assertRegex(
+                        response.content.decode(),
+                        rf'<[^>]*class="form-control"[^>]*id="{field_id}"',
+                    )
+
+    def test_parent_form_unchanged(self):
+        self.assertIn(
+            'form-control',
+            CreationForm.base_fields['password1'].widget.attrs['class'],
+        )
+        self.assertNotIn(
+            'class', UserCreationForm.base_fields['password1'].widget.attrs
+        )
+
+
+class GroupChoiceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='chooser')
+        cls.group = Group.objects.create(
+            title='Бета', slug='beta', description='Описание'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def group_queries(self, queries):
+        return [
+            query['sql'] for query in queries
+            if 'FROM "posts_group"' in query['sql']
+        ]
+
+    def test_choices_cached(self):
+        self.client.get(reverse('posts:post_create'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('posts:post_create'))
+            self.client.post(
+                reverse('posts:post_create'),
+                {'text': '', 'group': self.group.pk},
+            )
+        self.assertEqual(self.group_queries(queries), [])
+        self.assertContains(
+            response, f'<option value="{self.group.pk}">Бета</option>'
+        )
+
+    def test_valid_group_saved(self):
+        self.client.post(
+            reverse('posts:post_create'),
+            {'text': 'В группе', 'group': self.group.pk},
+        )
+        post = Post.objects.get(text='В группе')
+        self.assertEqual(post.group, self.group)
+
+    def test_unknown_group_rejected(self):
+        for value in (self.group.pk + 100, 'abc'):
+            with self.subTest(value=value):
+                form = PostForm({'text': 'Текст', 'group': value})
+                self.assertIn('group', form.errors)
+
+    def test_group_changes_reset_choices(self):
+        len(PostForm().fields['group'].choices)
+        alpha = Group.objects.create(
+            title='Альфа', slug='alpha', description='Описание'
+        )
+        choices = list(PostForm().fields['group'].choices)
+        self.assertEqual(
+            choices[1:], [(alpha.pk, 'Альфа'), (self.group.pk, 'Бета')]
+        )
+        alpha.delete()
+        self.assertEqual(len(PostForm().fields['group'].choices), 2)
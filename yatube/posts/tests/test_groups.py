@@ -0,0 +1,140 @@
+import io
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from ..groups import recount
+from ..models import Group, GroupAuthor, Post, User
+
+
+class GroupStatsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.leo = User.objects.create(username='leo')
+        cls.mia = User.objects.create(username='mia')
+        cls.group = Group.objects.create(
+            title='Коты', slug='cats', description='Про котов'
+        )
+        cls.other = Group.objects.create(
+            title='Собаки', slug='dogs', description='Про собак'
+        )
+
+    def create(self, author, group=None):
+        return Post.objects.create(
+            author=author, text='Пост', group=group or self.group
+        )
+
+    def stats(self, group=None):
+        group = Group.objects.get(pk=(group or self.group).pk)
+        authors = dict(GroupAuthor.objects.filter(group=group).values_list(
+            'author__username', 'posts_count'
+        ))
+        return group.posts_count, group.last_post_at, authors
+
+    def assertMatchesRecount(self):
+        before = [self.stats(group) for group in (self.group, self.other)]
+        recount()
+        after = [self.stats(group) for group in (self.group, self.other)]
+        self.assertEqual(before, after)
+
+    def test_create_and_delete(self):
+        first = self.create(self.leo)
+        last = self.create(self.mia)
+        self.create(self.leo)
+        self.assertEqual(self.stats()[0], 3)
+        self.assertEqual(self.stats()[2], {'leo': 2, 'mia': 1})
+        self.assertMatchesRecount()
+        last.delete()
+        first.delete()
+        self.assertEqual(self.stats()[2], {'leo': 1})
+        self.assertMatchesRecount()
+
+    def test_latest_post_deleted(self):
+        first = self.create(self.leo)
+        last = self.create(self.mia)
+        self.assertEqual(self.stats()[1], last.pub_date)
+        last.delete()
+        self.assertEqual(self.stats()[1], first.pub_date)
+        first.delete()
+        self.assertEqual(self.stats(), (0, None, {}))
+
+    def test_moved_between_groups(self):
+        post = self.create(self.leo)
+        post.group = self.other
+        post.save()
+        self.assertEqual(self.stats(), (0, None, {}))
+        self.assertEqual(self.stats(self.other)[2], {'leo': 1})
+        post.group = None
+        post.save()
+        self.assertEqual(self.stats(self.other)[0], 0)
+        post.text = 'Без группы'
+        post.save()
+        self.assertMatchesRecount()
+
+    def test_author_deleted(self):
+        self.create(self.leo)
+        self.create(self.mia)
+        User.objects.filter(username='mia').delete()
+        self.assertEqual(self.stats()[0], 1)
+        self.assertMatchesRecount()
+
+    def test_group_deleted(self):
+        post = self.create(self.leo)
+        Group.objects.all().delete()
+        self.assertFalse(GroupAuthor.objects.exists())
+        post.refresh_from_db()
+        self.assertIsNone(post.group)
+        post.save()
+        self.assertFalse(GroupAuthor.objects.exists())
+
+    def test_recount_command(self):
+        self.create(self.leo)
+        Group.objects.update(posts_count=10)
+        GroupAuthor.objects.all().delete()
+        out = io.StringIO()
+        call_command('recount_group_stats', stdout=out)
+        self.assertIn('Пересчитано групп: 2', out.getvalue())
+        self.assertEqual(self.stats()[:1] + self.stats()[2:], (1, {'leo': 1}))
+
+
+class GroupIndexTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.authors = [
+            User.objects.create(username=f'author{number}')
+            for number in range(5)
+        ]
+        cls.groups = [
+            Group.objects.create(
+                title=f'Группа {number}', slug=f'group{number}',
+                description='Описание',
+            )
+            for number in range(4)
+        ]
+        for number, author in enumerate(cls.authors):
+            for _ in range(number + 1):
+                Post.objects.create(
+                    author=author, text='Пост', group=cls.groups[1]
+                )
+        Post.objects.create(
+            author=cls.authors[0], text='Пост', group=cls.groups[2]
+        )
+
+    def test_directory(self):
+        url = reverse('posts:group_index')
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        groups = list(response.context['page_obj'])
+        self.assertEqual(
+            groups[:2], [self.groups[2], self.groups[1]]
+        )
+        self.assertEqual(
+            [stats.author.username for stats in groups[1].active_authors],
+            ['author4', 'author3', 'author2'],
+        )
+        self.assertEqual(groups[1].posts_count, 15)
+        self.assertEqual(groups[0].active_authors[0].posts_count, 1)
+        self.assertEqual(groups[2].active_authors, [])
+        self.assertContains(response, reverse('posts:group_list',
+                                              args=('group3',)))
@@ -0,0 +1,92 @@
+from django.core.cache import cache
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from core.counters import flush_all
+from ..hot import get_ranking, hot_scores, record_event
+from ..models import Comment, Follow, Group, Post, User
+
+
+class HotFeedTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create(username='author')
+        self.reader = User.objects.create(username='reader')
+        self.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        self.posts = [
+            Post.objects.create(
+                author=self.author, text=f'Пост {number}',
+                group=self.group if number % 2 else None,
+            )
+            for number in range(4)
+        ]
+        self.client = Client()
+
+    def tearDown(self):
+        flush_all()
+
+    def feed(self, url):
+        response = self.client.get(url)
+        return [post.pk for post in response.context['page_obj']]
+
+    def test_new_posts_first(self):
+        self.assertEqual(
+            self.feed(reverse('posts:hot')),
+            [post.pk for post in reversed(self.posts)],
+        )
+
+    def test_activity_raises_post(self):
+        oldest = self.posts[0]
+        for _ in range(3):
+            Comment.objects.create(
+                post=oldest, author=self.reader, text='Комментарий'
+            )
+        self.assertEqual(self.feed(reverse('posts:hot'))[0], oldest.pk)
+
+    def test_follow_raises_latest_post(self):
+        other = User.objects.create(username='other')
+        post = Post.objects.create(author=other, text='Новый автор')
+        for number in range(3):
+            follower = User.objects.create(username=f'follower{number}')
+            Follow.objects.create(user=follower, author=self.author)
+        self.assertEqual(
+            self.feed(reverse('posts:hot'))[:2],
+            [self.posts[-1].pk, post.pk],
+        )
+
+    def test_group_ranking(self):
+        url = reverse('posts:group_hot', args=(self.group.slug,))
+        self.assertEqual(self.feed(url), [self.posts[3].pk, self.posts[1].pk])
+        record_event(self.posts[1].pk, 'follow')
+        self.assertEqual(self.feed(url), [self.posts[1].pk, self.posts[3].pk])
+        post = self.posts[3]
+        post.group = None
+        post.save()
+        self.assertEqual(self.feed(url), [self.posts[1].pk])
+
+    def test_updated_without_rebuild(self):
+        get_ranking().get()
+        get_ranking(self.group.pk).get()
+        with self.assertNumQueries(3):
+            # SELECT и UPDATE счёта, затем SELECT для рейтингов.
+            record_event(self.posts[0].pk, 'comment')
+        with self.assertNumQueries(0):
+            self.assertEqual(get_ranking().ids()[0], self.posts[0].pk)
+
+    def test_deleted_post_leaves_ranking(self):
+        get_ranking().get()
+        self.posts[3].delete()
+        self.assertNotIn(self.posts[3].pk, self.feed(reverse('posts:hot')))
+
+    @override_settings(COUNTER_FLUSH_INTERVAL=60)
+    def test_events_buffered(self):
+        post = self.posts[0]
+        for _ in range(5):
+            record_event(post.pk, 'reaction')
+        self.assertEqual(Post.objects.get(pk=post.pk).hot_score,
+                         post.hot_score)
+        with self.assertNumQueries(3):
+            hot_scores.flush()
+        self.assertEqual(get_ranking().ids()[0], post.pk)
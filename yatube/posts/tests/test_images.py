@@ -0,0 +1,155 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from core.models import Job
+from core.tasks import work
+from ..images import available_formats, generate_variants
+from ..models import Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def make_jpeg(name, size=(500, 300), color=(200, 40, 40)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'JPEG')
+    return SimpleUploadedFile(name, buffer.getvalue(), 'image/jpeg')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ImageVariantsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='photographer')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            author=self.user, text='С картинкой', image=make_jpeg('red.jpg')
+        )
+
+    def reload(self):
+        return Post.objects.get(pk=self.post.pk)
+
+    def test_variants_recorded(self):
+        """Размеры создаются без увеличения и для всех доступных форматов."""
+        generate_variants(self.post.pk, self.post.image.name)
+        variants = self.reload().variants
+        self.assertEqual(set(variants), {'card', 'detail'})
+        card = variants['card']
+        self.assertEqual((card['width'], card['height']), (100, 100))
+        self.assertEqual(
+            [source['type'] for source in card['sources']],
+            [mime for _, mime, _ in available_formats()] + ['image/jpeg'],
+        )
+        self.assertEqual(card['sources'][-1]['srcset'].count('w,'), 2)
+        self.assertNotIn(',', variants['detail']['sources'][-1]['srcset'])
+        for name in self.reload().variants_data['files']:
+            self.assertTrue(
+                os.path.exists(os.path.join(TEMP_MEDIA_ROOT, name))
+            )
+
+    def test_feed_uses_srcset(self):
+        generate_variants(self.post.pk, self.post.image.name)
+        response = self.client.get(reverse('posts:index'))
+        card = self.reload().variants['card']
+        self.assertContains(response, card['sources'][0]['srcset'])
+        self.assertIsNone(response.context['post'].card_thumbnail)
+
+    def test_stale_variants_ignored(self):
+        """После смены картинки старые размеры не выводятся и удаляются."""
+        generate_variants(self.post.pk, self.post.image.name)
+        old_files = self.reload().variants_data['files']
+        post = self.reload()
+        post.image = make_jpeg('blue.jpg')
+        post.save()
+        self.assertEqual(self.reload().variants, {})
+        generate_variants(post.pk, post.image.name)
+        self.assertTrue(self.reload().variants)
+        for name in old_files:
+            self.assertFalse(
+                os.path.exists(os.path.join(TEMP_MEDIA_ROOT, name))
+            )
+
+    def test_replaced_image_not_overwritten(self):
+        """Результат для уже заменённой картинки не записывается."""
+        name = self.post.image.name
+        Post.objects.filter(pk=self.post.pk).update(image='posts/other.jpg')
+        generate_variants(self.post.pk, name)
+        self.assertEqual(self.reload().image_variants, '')
+
+    def test_delete_removes_files(self):
+        generate_variants(self.post.pk, self.post.image.name)
+        post = self.reload()
+        files = json.loads(post.image_variants)['files']
+        post.delete()
+        for name in files:
+            self.assertFalse(
+                os.path.exists(os.path.join(TEMP_MEDIA_ROOT, name))
+            )
+
+    def test_same_stem_kept_apart(self):
+        """У cat.jpg и cat.png свои размеры, удаляются они порознь."""
+        red = Post.objects.create(
+            author=self.user, text='Красный', image=make_jpeg('cat.jpg')
+        )
+        blue = Post.objects.create(
+            author=self.user, text='Синий',
+            image=make_jpeg('cat.png', color=(40, 40, 200)),
+        )
+        self.assertEqual(blue.variants_data, {})
+        generate_variants(red.pk, red.image.name)
+        generate_variants(blue.pk, blue.image.name)
+        red.refresh_from_db()
+        blue.refresh_from_db()
+        blue_files = blue.variants_data['files']
+        self.assertTrue(blue_files)
+        self.assertFalse(set(red.variants_data['files']) & set(blue_files))
+        red.delete()
+        for name in blue_files:
+            self.assertTrue(
+                os.path.exists(os.path.join(TEMP_MEDIA_ROOT, name))
+            )
+
+    @override_settings(IMAGE_VARIANTS_QUEUE=True)
+    def test_queued_variants(self):
+        """Размеры создаются задачей очереди, записанной вместе с постом."""
+        post = Post.objects.create(
+            author=self.user, text='В очередь', image=make_jpeg('q.jpg')
+        )
+        job = Job.objects.get(name='posts.tasks.build_image_variants')
+        self.assertEqual(Job.objects.count(), 1)
+        work('test', threading.Event(), once=True)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertTrue(Post.objects.get(pk=post.pk).variants)
+
+    @override_settings(IMAGE_VARIANTS_QUEUE=True)
+    def test_resave_not_rescheduled(self):
+        """Сохранение без смены картинки не ставит задачу повторно."""
+        post = Post.objects.create(
+            author=self.user, text='Один раз', image=make_jpeg('once.jpg')
+        )
+        post.text = 'Исправлено'
+        post.save()
+        Post.objects.get(pk=post.pk).save()
+        self.assertEqual(
+            Job.objects.filter(name='posts.tasks.build_image_variants')
+            .count(), 1
+        )
@@ -0,0 +1,139 @@
+import io
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from core.counters import flush_all
+from ..models import Post, Reaction, User
+from ..reactions import most_liked, reactions_counter
+
+
+@override_settings(REACTION_RATE_BURST=100)
+class ReactionTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create(username='author')
+        self.users = [
+            User.objects.create(username=f'fan{number}')
+            for number in range(3)
+        ]
+        self.posts = [
+            Post.objects.create(author=self.author, text=f'Пост {number}')
+            for number in range(3)
+        ]
+        self.clients = []
+        for user in self.users:
+            client = Client()
+            client.force_login(user)
+            self.clients.append(client)
+
+    def tearDown(self):
+        flush_all()
+
+    def react(self, client, post, kind='like', **data):
+        return client.post(
+            reverse('posts:post_react', args=(post.pk,)),
+            {'kind': kind, **data},
+        )
+
+    def count(self, post):
+        return Post.objects.get(pk=post.pk).reactions_count
+
+    def test_toggle_and_change(self):
+        client, post = self.clients[0], self.posts[0]
+        self.react(client, post)
+        self.assertEqual(self.count(post), 1)
+        self.react(client, post, 'heart')
+        self.assertEqual(Reaction.objects.get().kind, 'heart')
+        self.assertEqual(self.count(post), 1)
+        self.react(client, post, 'heart')
+        self.assertFalse(Reaction.objects.exists())
+        self.assertEqual(self.count(post), 0)
+
+    def test_bad_requests(self):
+        client = self.clients[0]
+        self.assertEqual(self.react(client, self.posts[0], 'boo').status_code,
+                         400)
+        response = client.get(
+            reverse('posts:post_react', args=(self.posts[0].pk,))
+        )
+        self.assertEqual(response.status_code, 405)
+
+    def test_redirects_only_to_own_site(self):
+        response = self.react(self.clients[0], self.posts[0], next='/follow/')
+        self.assertRedirects(
+            response, '/follow/', fetch_redirect_response=False
+        )
+        response = self.react(
+            self.clients[0], self.posts[0], next='https://evil.example/'
+        )
+        self.assertRedirects(
+            response,
+            reverse('posts:post_detail', args=(self.posts[0].pk,)),
+            fetch_redirect_response=False,
+        )
+
+    @override_settings(REACTION_RATE_BURST=1, REACTION_RATE_PER_MINUTE=1)
+    def test_rate_limited(self):
+        self.react(self.clients[0], self.posts[0])
+        response = self.react(self.clients[0], self.posts[1])
+        self.assertEqual(response.status_code, 429)
+
+    def test_user_state_in_one_query(self):
+        """Свои реакции на всю страницу — один запрос."""
+        client = self.clients[0]
+        self.react(client, self.posts[0])
+        self.react(client, self.posts[2], 'sad')
+        response = client.get(reverse('posts:index'))
+        mine = {
+            post.pk: post.my_reaction
+            for post in response.context['page_obj']
+        }
+        self.assertEqual(mine, {
+            self.posts[0].pk: 'like',
+            self.posts[1].pk: None,
+            self.posts[2].pk: 'sad',
+        })
+
+    def test_popular_ranking(self):
+        for client in self.clients:
+            self.react(client, self.posts[1])
+        for client in self.clients[:2]:
+            self.react(client, self.posts[2])
+        self.assertEqual(
+            most_liked.ids(), [self.posts[1].pk, self.posts[2].pk]
+        )
+        self.react(self.clients[0], self.posts[0])
+        self.assertEqual(
+            most_liked.ids(),
+            [self.posts[1].pk, self.posts[2].pk, self.posts[0].pk],
+        )
+        response = self.clients[0].get(reverse('posts:popular'))
+        self.assertEqual(
+            [post.pk for post in response.context['page_obj']],
+            most_liked.ids(),
+        )
+
+    @override_settings(COUNTER_FLUSH_INTERVAL=60)
+    def test_counts_buffered(self):
+        for client in self.clients:
+            self.react(client, self.posts[0])
+        self.assertEqual(self.count(self.posts[0]), 0)
+        with self.assertNumQueries(2):
+            reactions_counter.flush()
+        self.assertEqual(self.count(self.posts[0]), 3)
+
+    def test_recount_command(self):
+        """Пересчёт восстанавливает число реакций и рейтинг."""
+        for client in self.clients[:2]:
+            self.react(client, self.posts[2])
+        flush_all()
+        Post.objects.update(reactions_count=7)
+        most_liked.invalidate()
+        self.assertEqual(len(most_liked.ids()), 3)
+        call_command('recount_post_counters', stdout=io.StringIO())
+        self.assertEqual(self.count(self.posts[2]), 2)
+        self.assertEqual(self.count(self.posts[0]), 0)
+        self.assertEqual(most_liked.ids(), [self.posts[2].pk])
@@ -6,9 +6,12 @@ from django.conf import settings
 from django import forms
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from posts.models import Post, Group, User, Comment, Follow
 from posts.forms import PostForm, CommentForm
+from users.lookup import get_user_id
 from yatube.settings import PAGE_SIZE
 
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
@@ -326,6 +329,65 @@ class FollowTest(TestCase):
         self.assertNotIn(author_post, response.context['page_obj'])
 
 
+class UsernameLookupTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username='visitor')
+        self.author = User.objects.create(username='writer')
+        self.client.force_login(self.user)
+
+    def test_id_cached(self):
+        self.assertEqual(get_user_id('writer'), self.author.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_user_id('writer'), self.author.pk)
+
+    def test_missing_cached_until_signup(self):
+        response = self.client.get(
+            reverse('posts:profile', args=('newcomer',))
+        )
+        self.assertEqual(response.status_code, 404)
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_user_id('newcomer'))
+        newcomer = User.objects.create(username='newcomer')
+        self.assertEqual(get_user_id('newcomer'), newcomer.pk)
+
+    def test_rename_and_delete_forgotten(self):
+        get_user_id('writer')
+        self.author.username = 'novelist'
+        self.author.save()
+        self.assertIsNone(get_user_id('writer'))
+        self.assertEqual(get_user_id('novelist'), self.author.pk)
+        User.objects.filter(pk=self.author.pk).delete()
+        self.assertIsNone(get_user_id('novelist'))
+
+    def test_follow_without_loading_author(self):
+        get_user_id('writer')
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('posts:profile_follow',
+                                    args=('writer',)))
+        self.assertTrue(Follow.objects.filter(
+            user=self.user, author=self.author
+        ).exists())
+        self.assertFalse([
+            query for query in queries
+            if 'FROM "auth_user" WHERE "auth_user"."username"'
+            in query['sql']
+        ])
+
+    def test_following_flag_for_visitor(self):
+        other = User.objects.create(username='other')
+        Follow.objects.create(user=other, author=self.author)
+        response = self.client.get(
+            reverse('posts:profile', args=('writer',))
+        )
+        self.assertFalse(response.context['following'])
+        Follow.objects.create(user=self.user, author=self.author)
+        response = self.client.get(
+            reverse('posts:profile', args=('writer',))
+        )
+        self.assertTrue(response.context['following'])
+
+
 class PaginatorTest(TestCase):
     SECOND_PAGE_AMOUNT = PAGE_SIZE // 2
 
@@ -368,3 +430,56 @@ class PaginatorTest(TestCase):
                 response = self.guest_client.get(url + '?page=2')
                 self.assertEqual(len(response.context['page_obj']),
                                  self.SECOND_PAGE_AMOUNT)
+
+
+class FeedQueryCountTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='writer')
+        cls.commenter = User.objects.create(username='commenter')
+        cls.group = Group.objects.create(
+            title='Группа', slug='feed-group', description='Описание'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.commenter)
+        Follow.objects.create(user=self.commenter, author=self.user)
+
+    def add_posts(self, count):
+        for number in range(count):
+            post = Post.objects.create(
+                author=self.user, group=self.group, text=f'Пост {number}'
+            )
+            Comment.objects.create(
+                post=post, author=self.commenter, text='Старый'
+            )
+            Comment.objects.create(
+                post=post, author=self.commenter, text=f'Новый {number}'
+            )
+
+    def count_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.authorized_client.get(url)
+        return len(context), response
+
+    def test_page_cost_is_constant(self):
+        """Число запросов не зависит от числа постов на странице."""
+        urls = [
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user}),
+            reverse('posts:follow_index'),
+        ]
+        self.add_posts(1)
+        single = {url: self.count_queries(url)[0] for url in urls}
+        self.add_posts(PAGE_SIZE)
+        for url in urls:
+            with self.subTest(url=url):
+                queries, response = self.count_queries(url)
+                self.assertEqual(queries, single[url])
+                self.assertContains(response, 'commenter</a>:', PAGE_SIZE)
+                self.assertNotContains(response, 'Старый')
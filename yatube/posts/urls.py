@@ -9,12 +9,19 @@ urlpatterns = [
     path('', views.index, name='index'),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path('group/', views.group_index, name='group_index'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path('posts/<int:post_id>/comment/',
          views.add_comment, name='add_comment'
          ),
+    path('posts/<int:post_id>/react/',
+         views.post_react, name='post_react'
+         ),
+    path('popular/', views.popular, name='popular'),
+    path('hot/', views.hot, name='hot'),
+    path('group/<slug:slug>/hot/', views.group_hot, name='group_hot'),
     path('follow/', views.follow_index, name='follow_index'),
     path('profile/<str:username>/follow/',
          views.profile_follow, name='profile_follow'
@@ -1,5 +1,15 @@
 from django.core.paginator import Paginator
 from django.conf import settings
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Substr
+from sorl.thumbnail import default
+
+from .models import Comment, Post
+from .reactions import attach_reactions
+
+CARD_THUMBNAIL = '100x100'
+CARD_THUMBNAIL_OPTIONS = {'crop': 'center'}
+COMMENT_PREVIEW_LENGTH = 100
 
 
 def get_page_obj(request, objects):
@@ -7,3 +17,73 @@ def get_page_obj(request, objects):
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     return page_obj
+
+
+def get_feed_page(request, posts):
+    """Страница ленты с готовыми данными для карточек постов."""
+    page_obj = get_page_obj(request, posts)
+    # Количество считается по исходному запросу, подзапросы нужны
+    # только для строк текущей страницы.
+    per_page = page_obj.paginator.per_page
+    offset = (page_obj.number - 1) * per_page
+    page_obj.object_list = list(
+        with_card_data(posts)[offset:offset + per_page]
+    )
+    prepare_cards(request, page_obj.object_list)
+    return page_obj
+
+
+def get_ranked_page(request, ids, **filters):
+    """Страница ленты по готовому списку id постов.
+
+    Посты, которые уже не подходят под ``filters``, пропускаются.
+    """
+    page_obj = get_page_obj(request, ids)
+    posts = {
+        post.pk: post for post in with_card_data(
+            Post.objects.filter(pk__in=page_obj.object_list, **filters)
+        )
+    }
+    page_obj.object_list = [
+        posts[pk] for pk in page_obj.object_list if pk in posts
+    ]
+    prepare_cards(request, page_obj.object_list)
+    return page_obj
+
+
+def prepare_cards(request, posts):
+    attach_thumbnails(posts)
+    attach_reactions(request.user, posts)
+
+
+def with_card_data(posts):
+    """Автор, группа и последний комментарий в том же запросе, что и посты.
+
+    Число комментариев хранится в ``Post.comments_count``.
+    """
+    latest = Comment.objects.filter(
+        post=OuterRef('pk')
+    ).order_by('-pub_date', '-pk')
+    return posts.select_related('author', 'group').annotate(
+        latest_comment_text=Subquery(latest.annotate(
+            preview=Substr('text', 1, COMMENT_PREVIEW_LENGTH + 1)
+        ).values('preview')[:1]),
+        latest_comment_author=Subquery(
+            latest.values('author__username')[:1]
+        ),
+    )
+
+
+def attach_thumbnails(posts):
+    """Миниатюры карточек, для которых ещё нет готовых размеров."""
+    images = [
+        post.image for post in posts
+        if post.image and 'card' not in post.variants
+    ]
+    thumbnails = default.backend.get_thumbnails(
+        images, CARD_THUMBNAIL, **CARD_THUMBNAIL_OPTIONS
+    ) if images else {}
+    for post in posts:
+        post.card_thumbnail = (
+            thumbnails.get(post.image.name) if post.image else None
+        )
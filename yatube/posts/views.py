@@ -1,27 +1,52 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.urls import reverse
 from django.contrib.auth.decorators import login_required
-
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.http import Http404, HttpResponseBadRequest
+from django.utils.http import is_safe_url
+from django.views.decorators.http import require_POST
+
+from core.views import too_many_requests
+from users.lookup import forget_username, get_user_id_or_404
+from .comments import comment_wait_time, forget_post, post_exists
 from .forms import PostForm, CommentForm
+from .groups import attach_active_authors
 from .models import Post, Group, User, Follow
-from .utils import get_page_obj
+from .hot import get_ranking
+from .reactions import (REACTION_KINDS, most_liked, reaction_wait_time,
+                        toggle_reaction)
+from .utils import get_feed_page, get_page_obj, get_ranked_page
 
 
 def index(request):
     """Все посты от всех пользователей."""
     post_list = Post.objects.all()
-    page_obj = get_page_obj(request, post_list)
+    page_obj = get_feed_page(request, post_list)
     context = {
         'page_obj': page_obj,
     }
     return render(request, 'posts/index.html', context)
 
 
+def group_index(request):
+    """Каталог групп: сначала те, где недавно писали."""
+    groups = Group.objects.order_by(
+        F('last_post_at').desc(nulls_last=True), 'title'
+    )
+    page_obj = get_page_obj(request, groups)
+    attach_active_authors(page_obj.object_list)
+    context = {
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/group_index.html', context)
+
+
 def group_posts(request, slug):
     """Посты по группам."""
     group = get_object_or_404(Group, slug=slug)
     post_list = group.posts.all()
-    page_obj = get_page_obj(request, post_list)
+    page_obj = get_feed_page(request, post_list)
     context = {
         'group': group,
         'page_obj': page_obj,
@@ -31,13 +56,21 @@ def group_posts(request, slug):
 
 def profile(request, username):
     """Профиль пользователя."""
-    author = get_object_or_404(User, username=username)
-    posts = Post.objects.filter(author=author)
-    page_obj = get_page_obj(request, posts)
+    author_id = get_user_id_or_404(username)
+    author = User.objects.only(
+        'username', 'first_name', 'last_name'
+    ).filter(pk=author_id).first()
+    if author is None:
+        # Пользователь удалён в обход сигналов.
+        forget_username(username)
+        raise Http404
+    posts = Post.objects.filter(author_id=author_id)
+    page_obj = get_feed_page(request, posts)
     following = False
     if request.user.is_authenticated:
-        if Follow.objects.filter(author=author).exists():
-            following = True
+        following = Follow.objects.filter(
+            user=request.user, author_id=author_id
+        ).exists()
     context = {
         'page_obj': page_obj,
         'author': author,
@@ -68,8 +101,11 @@ def post_create(request):
                       {'form': form})
     post = form.save(commit=False)
     post.author = request.user
-    post.save()
-    return redirect('posts:profile', post.author)
+    # Пост, картинка и сводки группы пишутся одной транзакцией,
+    # остальное выполняется после коммита (core.pipeline).
+    with transaction.atomic():
+        post.save()
+    return redirect('posts:profile', request.user.username)
 
 
 @login_required
@@ -86,20 +122,85 @@ def post_edit(request, post_id):
     if not form.is_valid():
         return render(request, 'posts/create_post.html',
                       {'form': form, "is_edit": True})
-    form.save()
+    with transaction.atomic():
+        form.save()
     return redirect('posts:post_detail', post.id)
 
 
 @login_required
 def add_comment(request, post_id):
     """Добавление комментария."""
-    post = get_object_or_404(Post, pk=post_id)
+    if not post_exists(post_id):
+        raise Http404
     form = CommentForm(request.POST or None)
     if form.is_valid():
+        wait_time = comment_wait_time(request.user)
+        if wait_time:
+            return too_many_requests(request, wait_time)
         comment = form.save(commit=False)
         comment.author = request.user
-        comment.post = post
-        comment.save()
+        comment.post_id = post_id
+        try:
+            comment.save()
+        except IntegrityError:
+            forget_post(post_id)
+            raise Http404
+    return redirect('posts:post_detail', post_id=post_id)
+
+
+def popular(request):
+    """Посты с наибольшим числом реакций."""
+    page_obj = get_ranked_page(request, most_liked.ids())
+    context = {
+        'page_obj': page_obj,
+        'title': 'Популярное',
+    }
+    return render(request, 'posts/ranked.html', context)
+
+
+def hot(request):
+    """Посты с наибольшей недавней активностью."""
+    page_obj = get_ranked_page(request, get_ranking().ids())
+    context = {
+        'page_obj': page_obj,
+        'title': 'Горячее',
+    }
+    return render(request, 'posts/ranked.html', context)
+
+
+def group_hot(request, slug):
+    """Горячие посты группы."""
+    group = get_object_or_404(Group, slug=slug)
+    page_obj = get_ranked_page(
+        request, get_ranking(group.pk).ids(), group=group
+    )
+    context = {
+        'group': group,
+        'page_obj': page_obj,
+        'title': f'Горячее в группе {group.title}',
+    }
+    return render(request, 'posts/ranked.html', context)
+
+
+@login_required
+@require_POST
+def post_react(request, post_id):
+    """Поставить или снять реакцию."""
+    if not post_exists(post_id):
+        raise Http404
+    kind = request.POST.get('kind')
+    if kind not in REACTION_KINDS:
+        return HttpResponseBadRequest()
+    wait_time = reaction_wait_time(request.user)
+    if wait_time:
+        return too_many_requests(request, wait_time)
+    toggle_reaction(request.user, post_id, kind)
+    next_url = request.POST.get('next')
+    if next_url and is_safe_url(
+        next_url, allowed_hosts={request.get_host()},
+        require_https=request.is_secure(),
+    ):
+        return redirect(next_url)
     return redirect('posts:post_detail', post_id=post_id)
 
 
@@ -107,7 +208,7 @@ def add_comment(request, post_id):
 def follow_index(request):
     """Вывести посты авторов, на которых подписан пользователь."""
     posts = Post.objects.filter(author__following__user=request.user)
-    page_obj = get_page_obj(request, posts)
+    page_obj = get_feed_page(request, posts)
     context = {
         "page_obj": page_obj,
         "title": "Избранные посты",
@@ -119,16 +220,19 @@ def follow_index(request):
 def profile_follow(request, username):
     """Подписаться на автора."""
     user = request.user
-    author = get_object_or_404(User, username=username)
-    is_follower = Follow.objects.filter(user=user, author=author)
-    if user != author and not is_follower.exists():
-        Follow.objects.create(user=user, author=author)
+    author_id = get_user_id_or_404(username)
+    if user.pk != author_id:
+        try:
+            Follow.objects.get_or_create(user=user, author_id=author_id)
+        except IntegrityError:
+            forget_username(username)
+            raise Http404
     return redirect(reverse('posts:profile', args=[username]))
 
 
 @login_required
 def profile_unfollow(request, username):
     """Отписаться от автора."""
-    author = get_object_or_404(User, username=username)
-    Follow.objects.filter(user=request.user, author=author).delete()
+    author_id = get_user_id_or_404(username)
+    Follow.objects.filter(user=request.user, author_id=author_id).delete()
     return redirect("posts:follow_index")
@@ -1,11 +1,18 @@
-from django.contrib.auth.forms import UserCreationForm
+from django.contrib.auth.forms import AuthenticationForm, UserCreationForm
 from django.contrib.auth import get_user_model
 
+from core.forms import widget_class
 
 User = get_user_model()
 
 
+@widget_class('form-control')
 class CreationForm(UserCreationForm):
     class Meta(UserCreationForm.Meta):
         model = User
         fields = ('first_name', 'last_name', 'username', 'email')
+
+
+@widget_class('form-control')
+class LoginForm(AuthenticationForm):
+    pass
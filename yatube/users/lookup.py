@@ -0,0 +1,55 @@
+"""Кеш соответствия имени пользователя и его id.
+
+Страницы профиля и подписки знают автора только по имени из адреса.
+Id кешируется, поэтому повторные запросы не ищут пользователя в БД,
+а для подписки и отписки строка пользователя не нужна вовсе.
+Несуществующие имена тоже кешируются, ненадолго: боты перебирают
+случайные профили. Записи сбрасываются сигналами при создании,
+переименовании и удалении пользователя.
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import Http404
+
+User = get_user_model()
+
+USER_ID_KEY = 'user_id:{}'
+# Имя может появиться при регистрации, но это и так сбрасывает запись.
+MISSING_USER_TIMEOUT = 60
+MISSING = 0
+
+
+def get_key(username):
+    # Имя может содержать символы, недопустимые в ключах memcached.
+    digest = hashlib.md5(username.encode()).hexdigest()
+    return USER_ID_KEY.format(digest)
+
+
+def get_user_id(username):
+    """Id пользователя с именем ``username`` или ``None``."""
+    key = get_key(username)
+    user_id = cache.get(key)
+    if user_id is None:
+        user_id = User.objects.filter(username=username).values_list(
+            'pk', flat=True
+        ).first() or MISSING
+        cache.set(
+            key, user_id,
+            settings.USER_ID_TIMEOUT if user_id else MISSING_USER_TIMEOUT,
+        )
+    return user_id or None
+
+
+def get_user_id_or_404(username):
+    user_id = get_user_id(username)
+    if user_id is None:
+        raise Http404('Пользователь не найден.')
+    return user_id
+
+
+def forget_username(username):
+    if username:
+        cache.delete(get_key(username))
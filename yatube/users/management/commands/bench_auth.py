@@ -0,0 +1,80 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import get_hashers
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+
+User = get_user_model()
+PASSWORD = 'Xq7-bench-Pw!'
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ('Замеряет, сколько регистраций и входов в секунду выдерживает '
+            'одно ядро с каждым доступным хешером паролей. Созданные '
+            'пользователи удаляются откатом транзакции.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=20,
+            help='Сколько регистраций и входов выполнить для хешера.',
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        for hasher in get_hashers():
+            if not self.is_available(hasher):
+                self.stdout.write(f'{hasher.algorithm}: не установлен')
+                continue
+            path = f'{type(hasher).__module__}.{type(hasher).__name__}'
+            with override_settings(PASSWORD_HASHERS=[path]):
+                signup, login = self.measure(options['requests'])
+            self.stdout.write(
+                f'{hasher.algorithm}: регистраций {signup:.1f}/с, '
+                f'входов {login:.1f}/с'
+            )
+
+    def is_available(self, hasher):
+        try:
+            if getattr(hasher, 'library', None) is not None:
+                hasher._load_library()
+        except ValueError:
+            return False
+        return True
+
+    def measure(self, count):
+        client = Client()
+        try:
+            with transaction.atomic():
+                started = time.perf_counter()
+                for number in range(count):
+                    client.post(reverse('users:signup'), {
+                        'username': f'bench{number}',
+                        'password1': PASSWORD,
+                        'password2': PASSWORD,
+                    })
+                signup = count / (time.perf_counter() - started)
+                created = User.objects.filter(
+                    username__startswith='bench'
+                ).count()
+                if created != count:
+                    self.stderr.write('Не все регистрации прошли.')
+                started = time.perf_counter()
+                for number in range(count):
+                    client.post(reverse(settings.LOGIN_URL), {
+                        'username': f'bench{number}',
+                        'password': PASSWORD,
+                    })
+                login = count / (time.perf_counter() - started)
+                raise Rollback
+        except Rollback:
+            pass
+        return signup, login
@@ -0,0 +1,26 @@
+from django.db.models.signals import post_delete, post_init, post_save
+
+from .lookup import User, forget_username
+
+
+def remember_username(sender, instance, **kwargs):
+    instance._saved_username = instance.__dict__.get('username')
+
+
+def user_saved(sender, instance, created, **kwargs):
+    if 'username' not in instance.__dict__:
+        return
+    if created or instance.username != instance._saved_username:
+        forget_username(instance._saved_username)
+        forget_username(instance.username)
+        instance._saved_username = instance.username
+
+
+def user_deleted(sender, instance, **kwargs):
+    forget_username(instance._saved_username)
+    forget_username(instance.__dict__.get('username'))
+
+
+post_init.connect(remember_username, sender=User)
+post_save.connect(user_saved, sender=User)
+post_delete.connect(user_deleted, sender=User)
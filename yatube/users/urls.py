@@ -2,6 +2,7 @@ from django.urls import path
 from django.contrib.auth.views import LogoutView, LoginView
 
 from . import views
+from .forms import LoginForm
 
 app_name = 'users'
 
@@ -13,7 +14,9 @@ urlpatterns = [
     ),
     path(
         'login/',
-        LoginView.as_view(template_name='users/login.html'),
+        LoginView.as_view(
+            template_name='users/login.html', authentication_form=LoginForm
+        ),
         name='login'
     ),
     path('signup/', views.SignUp.as_view(), name='signup'),
@@ -0,0 +1,11 @@
+"""Настройки проекта.
+
+Профиль выбирается переменной окружения DJANGO_ENV:
+``dev`` (по умолчанию) или ``prod``.
+"""
+import os
+
+if os.getenv('DJANGO_ENV', 'dev') == 'prod':
+    from .prod import *  # noqa: F401,F403
+else:
+    from .dev import *  # noqa: F401,F403
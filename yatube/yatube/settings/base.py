@@ -0,0 +1,320 @@
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from . import env
+
+# Build paths inside the project like this: os.path.join(BASE_DIR, ...)
+BASE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+# Профиль настроек: dev или prod (см. yatube/settings/__init__.py).
+ENVIRONMENT = 'base'
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = env.get_str('SECRET_KEY')
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = env.get_bool('DEBUG', False)
+
+ALLOWED_HOSTS = env.get_list('ALLOWED_HOSTS', [
+    'localhost',
+    '127.0.0.1',
+    '[::1]',
+    'testserver',
+])
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'posts.apps.PostsConfig',
+    'users.apps.UsersConfig',
+    'core.apps.CoreConfig',
+    'about',
+    'sorl.thumbnail',
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'core.static.StaticFilesMiddleware',
+    'core.media.MediaFilesMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'core.middleware.LazyAuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.AnonymousPageCacheMiddleware',
+]
+
+ROOT_URLCONF = 'yatube.urls'
+
+STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'core.context_processors.site.site_globals',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/2.2/ref/settings/#databases
+
+DATABASES = {
+    'default': {
+        'ENGINE': env.get_str('DB_ENGINE', 'django.db.backends.sqlite3'),
+        'NAME': env.get_str('DB_NAME', os.path.join(BASE_DIR, 'db.sqlite3')),
+        'USER': env.get_str('DB_USER', ''),
+        'PASSWORD': env.get_str('DB_PASSWORD', ''),
+        'HOST': env.get_str('DB_HOST', ''),
+        'PORT': env.get_str('DB_PORT', ''),
+        'CONN_MAX_AGE': env.get_int('DB_CONN_MAX_AGE', 0),
+    }
+}
+
+
+# Password validation
+# https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME':
+        'django.contrib.auth.password_validation.'
+        'UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME':
+        'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME':
+        'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME':
+        'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Хеширование паролей (core.passwords): алгоритм для новых хешей
+# и его стоимость. Хеши других алгоритмов и с другой стоимостью
+# пересчитываются при входе пользователя.
+PASSWORD_HASHER = env.get_str('PASSWORD_HASHER', 'pbkdf2_sha256')
+_PASSWORD_HASHERS = {
+    'pbkdf2_sha256': 'core.passwords.PBKDF2PasswordHasher',
+    'scrypt': 'core.passwords.ScryptPasswordHasher',
+    # Нужен пакет argon2-cffi.
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+    # Нужен пакет bcrypt.
+    'bcrypt_sha256': 'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+}
+if PASSWORD_HASHER not in _PASSWORD_HASHERS:
+    raise ImproperlyConfigured(
+        f'PASSWORD_HASHER должен быть одним из: {", ".join(_PASSWORD_HASHERS)}.'
+    )
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    path for name, path in _PASSWORD_HASHERS.items()
+    if name != PASSWORD_HASHER
+]
+PASSWORD_PBKDF2_ITERATIONS = env.get_int('PASSWORD_PBKDF2_ITERATIONS', 150000)
+PASSWORD_SCRYPT_WORK_FACTOR = env.get_int(
+    'PASSWORD_SCRYPT_WORK_FACTOR', 2 ** 14
+)
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/2.2/topics/i18n/
+
+LANGUAGE_CODE = 'ru'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/2.2/howto/static-files/
+
+STATIC_URL = '/static/'
+STATIC_ROOT = env.get_str(
+    'STATIC_ROOT', os.path.join(BASE_DIR, 'static_root')
+)
+# Раздавать собранную статику самим приложением (см. core/static.py).
+STATIC_SERVE = env.get_bool('STATIC_SERVE', False)
+
+LOGIN_URL = 'users:login'
+
+LOGIN_REDIRECT_URL = 'posts:index'
+
+#  подключаем движок filebased.EmailBackend
+EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# указываем директорию, в которую будут складываться файлы писем
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+PAGE_SIZE = 10
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = env.get_str('MEDIA_ROOT', os.path.join(BASE_DIR, 'media'))
+# Картинки постов под именем из хеша содержимого (core.storage),
+# файлы без ссылок удаляет python manage.py gc_media_blobs.
+MEDIA_CONTENT_ADDRESSED = env.get_bool('MEDIA_CONTENT_ADDRESSED', False)
+MEDIA_BLOB_GRACE = env.get_int('MEDIA_BLOB_GRACE', 3600)
+# Раздача медиа приложением (см. core/media.py): только картинки постов
+# и миниатюры sorl-thumbnail.
+MEDIA_SERVE = env.get_bool('MEDIA_SERVE', False)
+MEDIA_SERVE_DIRS = ['posts/', 'cache/', 'variants/']
+# Передать отдачу файла веб-серверу: x-sendfile (Apache, lighttpd)
+# или x-accel-redirect (nginx, internal-location MEDIA_ACCEL_PREFIX).
+MEDIA_SENDFILE = env.get_str('MEDIA_SENDFILE', '')
+MEDIA_ACCEL_PREFIX = env.get_str('MEDIA_ACCEL_PREFIX', '/protected-media/')
+MEDIA_CACHE_CONTROL = 'public, max-age=86400'
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sessions',
+    },
+}
+
+# Хранилище сессий: db, cache (только кеш) или cached_db (кеш с записью
+# в БД). Сессии лежат в отдельном кеше, чтобы сброс кеша страниц
+# не разлогинивал пользователей.
+SESSION_STORE = env.get_str('SESSION_STORE', 'db')
+SESSION_ENGINE = f'django.contrib.sessions.backends.{SESSION_STORE}'
+SESSION_CACHE_ALIAS = 'sessions'
+
+# Кеш целых страниц для анонимных посетителей.
+PAGE_CACHE_ENABLED = env.get_bool('PAGE_CACHE_ENABLED', False)
+PAGE_CACHE_VIEWS = [
+    'posts:index',
+    'posts:group_list',
+    'posts:profile',
+    'posts:post_detail',
+    'about:author',
+    'about:tech',
+]
+# Сколько секунд страница свежая и сколько ещё её можно отдавать
+# устаревшей, пока один из запросов её пересчитывает.
+PAGE_CACHE_TIMEOUT = env.get_int('PAGE_CACHE_TIMEOUT', 60)
+PAGE_CACHE_STALE_TIMEOUT = env.get_int('PAGE_CACHE_STALE_TIMEOUT', 300)
+PAGE_CACHE_LOCK_TIMEOUT = 10
+
+# Статические страницы, которые команда prerender_pages рендерит при
+# деплое: (шаблон, имя URL или None).
+PRERENDER_ROOT = os.path.join(BASE_DIR, 'prerendered')
+PRERENDER_PAGES = [
+    ('about/author.html', 'about:author'),
+    ('about/tech.html', 'about:tech'),
+    ('core/403.html', None),
+    ('core/404.html', None),
+]
+SERVE_PRERENDERED = env.get_bool('SERVE_PRERENDERED', False)
+
+# sorl-thumbnail: пакетное получение миниатюр для страниц лент.
+THUMBNAIL_BACKEND = 'core.thumbnails.ThumbnailBackend'
+THUMBNAIL_KVSTORE = env.get_str(
+    'THUMBNAIL_KVSTORE', 'core.thumbnails.CachedDBKVStore'
+)
+THUMBNAIL_CACHE = 'default'
+
+# Размеры картинок постов (posts.images) создаются после коммита:
+# в фоновом пуле (в prod) или сразу в потоке запроса.
+IMAGE_VARIANTS_ASYNC = env.get_bool('IMAGE_VARIANTS_ASYNC', False)
+IMAGE_VARIANT_WORKERS = env.get_int('IMAGE_VARIANT_WORKERS', 2)
+# Создавать размеры задачей очереди (core.tasks) вместо пула процесса.
+IMAGE_VARIANTS_QUEUE = env.get_bool('IMAGE_VARIANTS_QUEUE', False)
+
+# Побочные эффекты публикации (core.pipeline) выполняются после
+# коммита: в ограниченном пуле потоков (в prod) или сразу в потоке
+# запроса. Упавшая задача повторяется PIPELINE_RETRIES раз.
+PIPELINE_ASYNC = env.get_bool('PIPELINE_ASYNC', False)
+PIPELINE_WORKERS = env.get_int('PIPELINE_WORKERS', 2)
+PIPELINE_QUEUE_SIZE = env.get_int('PIPELINE_QUEUE_SIZE', 100)
+PIPELINE_RETRIES = env.get_int('PIPELINE_RETRIES', 3)
+
+# Фоновые задачи (core.tasks) в таблице Job, выполняются командой
+# run_workers. Паузы между повторами растут вдвое от
+# TASKS_RETRY_BACKOFF; процесс отмечает свои задачи живыми раз
+# в TASKS_HEARTBEAT_INTERVAL, задачи без отметки дольше
+# TASKS_LOCK_TIMEOUT возвращаются в очередь; выполненные хранятся
+# TASKS_KEEP_DONE (всё в с).
+TASKS_RETRIES = env.get_int('TASKS_RETRIES', 3)
+TASKS_RETRY_BACKOFF = env.get_int('TASKS_RETRY_BACKOFF', 10)
+TASKS_HEARTBEAT_INTERVAL = 60
+TASKS_LOCK_TIMEOUT = env.get_int('TASKS_LOCK_TIMEOUT', 5 * 60)
+TASKS_KEEP_DONE = env.get_int('TASKS_KEEP_DONE', 7 * 24 * 60 * 60)
+TASKS_POLL_INTERVAL = 1
+TASKS_THREADS = env.get_int('TASKS_THREADS', 2)
+TASKS_PROCESSES = env.get_int('TASKS_PROCESSES', 1)
+
+# Комментарии и реакции: лимит на пользователя и отложенная запись
+# счётчиков (core.counters; 0 — писать сразу).
+COMMENT_RATE_BURST = env.get_int('COMMENT_RATE_BURST', 5)
+COMMENT_RATE_PER_MINUTE = env.get_int('COMMENT_RATE_PER_MINUTE', 10)
+REACTION_RATE_BURST = env.get_int('REACTION_RATE_BURST', 10)
+REACTION_RATE_PER_MINUTE = env.get_int('REACTION_RATE_PER_MINUTE', 30)
+COUNTER_FLUSH_INTERVAL = env.get_int('COUNTER_FLUSH_INTERVAL', 0)
+POST_EXISTS_TIMEOUT = 60 * 60
+# Кеш id пользователя по имени для профилей и подписок (users.lookup).
+USER_ID_TIMEOUT = 24 * 60 * 60
+# Кеш списка групп для формы поста; сбрасывается при изменении групп.
+GROUP_CHOICES_TIMEOUT = 24 * 60 * 60
+# Сколько секунд процесс помнит общие значения страниц
+# (core.context_processors.site).
+SITE_GLOBALS_TIMEOUT = env.get_int('SITE_GLOBALS_TIMEOUT', 5 * 60)
+
+# Лента «горячего» (core.hot): период полураспада веса событий, с,
+# и веса событий. Период не настраивается из окружения: накопленные
+# счета посчитаны с ним, и после смены старые и новые события
+# затухали бы с разной скоростью.
+HOT_HALF_LIFE = 12 * 60 * 60
+HOT_WEIGHTS = {
+    'post': 1,
+    'comment': 2,
+    'reaction': 1,
+    'follow': 3,
+}
+HOT_RANKING_SIZE = 100
+
+# С какого числа строк по статистике БД админка не считает их точно.
+ESTIMATED_COUNT_THRESHOLD = env.get_int('ESTIMATED_COUNT_THRESHOLD', 100000)
+
+# Массовая модерация (posts.moderation): строк в пачке и с какого
+# размера выборки работа уходит в очередь задач (run_workers).
+MODERATION_CHUNK_SIZE = env.get_int('MODERATION_CHUNK_SIZE', 500)
+MODERATION_BACKGROUND_THRESHOLD = env.get_int(
+    'MODERATION_BACKGROUND_THRESHOLD', 2000
+)
+
+CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
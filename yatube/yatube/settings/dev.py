@@ -0,0 +1,13 @@
+"""Настройки для локальной разработки и тестов."""
+from .base import *  # noqa: F401,F403
+from . import env
+
+ENVIRONMENT = 'dev'
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
+SECRET_KEY = env.get_str(
+    'SECRET_KEY', '&-9=wmx9fj5tf-kda-b9#gu*r7kt4&l!=f2gy2f^q0hlajyn$v'
+)
+
+DEBUG = env.get_bool('DEBUG', True)
@@ -0,0 +1,30 @@
+"""Чтение настроек из переменных окружения."""
+import os
+
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+
+
+def get_str(name, default=None):
+    return os.getenv(name, default)
+
+
+def get_bool(name, default=False):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in TRUE_VALUES
+
+
+def get_int(name, default=0):
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    return int(value)
+
+
+def get_list(name, default=None):
+    """Список из строки вида ``a,b,c``."""
+    value = os.getenv(name)
+    if value is None:
+        return list(default or [])
+    return [item.strip() for item in value.split(',') if item.strip()]
@@ -0,0 +1,135 @@
+"""Боевые настройки: всё читается из переменных окружения."""
+import copy
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+from .base import DATABASES, MIDDLEWARE, TEMPLATES
+from . import env
+
+ENVIRONMENT = 'prod'
+
+SECRET_KEY = env.get_str('SECRET_KEY')
+if not SECRET_KEY:
+    raise ImproperlyConfigured('Задайте переменную окружения SECRET_KEY.')
+
+# При DEBUG = True Django запоминает каждый SQL-запрос в памяти процесса.
+DEBUG = env.get_bool('DEBUG', False)
+
+# Сжатие ответов должно идти раньше всех, кто читает тело ответа,
+# но после раздачи статики и медиа: у статики уже есть сжатые копии,
+# а сжатие медиа сломало бы ответы на Range.
+MIDDLEWARE = list(MIDDLEWARE)
+MIDDLEWARE.insert(
+    MIDDLEWARE.index('core.media.MediaFilesMiddleware') + 1,
+    'django.middleware.gzip.GZipMiddleware',
+)
+
+# Статика с хешем в имени и сжатыми копиями: python manage.py collectstatic
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+STATIC_SERVE = env.get_bool('STATIC_SERVE', True)
+MEDIA_SERVE = env.get_bool('MEDIA_SERVE', True)
+MEDIA_CONTENT_ADDRESSED = env.get_bool('MEDIA_CONTENT_ADDRESSED', True)
+
+# Шаблоны компилируются один раз на процесс.
+TEMPLATES = copy.deepcopy(TEMPLATES)
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+# Постоянные соединения с БД вместо нового подключения на каждый запрос.
+DATABASES = copy.deepcopy(DATABASES)
+DATABASES['default']['CONN_MAX_AGE'] = env.get_int('DB_CONN_MAX_AGE', 60)
+
+# Кешам, которые вытесняют записи сами (файлы, БД), Django по умолчанию
+# разрешает 300 записей и при переполнении удаляет треть случайных:
+# страницы, миниатюры, рейтинги и лимиты частоты вытесняли бы друг
+# друга. memcached и redis следят за памятью сами и этих параметров
+# не принимают.
+CULLED_CACHES = ('FileBasedCache', 'DatabaseCache', 'LocMemCache')
+
+
+def cache_options(backend, max_entries):
+    if not backend.endswith(CULLED_CACHES):
+        return {}
+    return {
+        'MAX_ENTRIES': max_entries,
+        'CULL_FREQUENCY': env.get_int('CACHE_CULL_FREQUENCY', 10),
+    }
+
+
+# Кеш общий для всех процессов. По умолчанию файловый, чтобы не требовать
+# внешних сервисов; для нескольких машин укажите memcached.
+CACHE_BACKEND = env.get_str(
+    'CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'
+)
+SESSION_CACHE_BACKEND = env.get_str(
+    'SESSION_CACHE_BACKEND',
+    'django.core.cache.backends.filebased.FileBasedCache'
+)
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': env.get_str('CACHE_LOCATION', '/var/tmp/yatube_cache'),
+        'TIMEOUT': env.get_int('CACHE_TIMEOUT', 300),
+        'OPTIONS': cache_options(
+            CACHE_BACKEND, env.get_int('CACHE_MAX_ENTRIES', 50000)
+        ),
+    },
+    'sessions': {
+        'BACKEND': SESSION_CACHE_BACKEND,
+        'LOCATION': env.get_str(
+            'SESSION_CACHE_LOCATION', '/var/tmp/yatube_sessions'
+        ),
+        'TIMEOUT': None,
+        'OPTIONS': cache_options(
+            SESSION_CACHE_BACKEND,
+            env.get_int('SESSION_CACHE_MAX_ENTRIES', 100000)
+        ),
+    },
+}
+
+THUMBNAIL_KVSTORE = env.get_str(
+    'THUMBNAIL_KVSTORE', 'core.thumbnails.CacheKVStore'
+)
+IMAGE_VARIANTS_ASYNC = env.get_bool('IMAGE_VARIANTS_ASYNC', True)
+PIPELINE_ASYNC = env.get_bool('PIPELINE_ASYNC', True)
+
+COUNTER_FLUSH_INTERVAL = env.get_int('COUNTER_FLUSH_INTERVAL', 5)
+
+SESSION_STORE = env.get_str('SESSION_STORE', 'cached_db')
+SESSION_ENGINE = f'django.contrib.sessions.backends.{SESSION_STORE}'
+
+PAGE_CACHE_ENABLED = env.get_bool('PAGE_CACHE_ENABLED', True)
+SERVE_PRERENDERED = env.get_bool('SERVE_PRERENDERED', True)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'loggers': {
+        'django.db.backends': {
+            'level': 'INFO',
+            'handlers': [],
+            'propagate': False,
+        },
+    },
+}
+
+# Заголовки безопасности.
+SECURE_SSL_REDIRECT = env.get_bool('SECURE_SSL_REDIRECT', False)
+SECURE_HSTS_SECONDS = env.get_int('SECURE_HSTS_SECONDS', 0)
+SECURE_HSTS_INCLUDE_SUBDOMAINS = env.get_bool(
+    'SECURE_HSTS_INCLUDE_SUBDOMAINS', False
+)
+SECURE_CONTENT_TYPE_NOSNIFF = True
+SECURE_BROWSER_XSS_FILTER = True
+X_FRAME_OPTIONS = 'DENY'
+SESSION_COOKIE_SECURE = env.get_bool('SESSION_COOKIE_SECURE', True)
+CSRF_COOKIE_SECURE = env.get_bool('CSRF_COOKIE_SECURE', True)
+SESSION_COOKIE_HTTPONLY = True
+if env.get_bool('USE_X_FORWARDED_PROTO', False):
+    SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')